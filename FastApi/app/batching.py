@@ -0,0 +1,167 @@
+# app/batching.py
+# 게시물 단건 생성 요청을 모아서 한 트랜잭션으로 저장하는 그룹 커밋(group commit) 큐입니다.
+#
+# SQLite는 한 번에 하나의 쓰기 트랜잭션만 실행하고, 커밋마다 디스크에 기록(fsync)하므로
+# 요청마다 커밋하면 동시 요청이 몰릴 때 쓰기 잠금 앞에 줄을 서게 되어 초당 몇백 건에서 처리량이 막힙니다.
+# 그룹 커밋 모드(POST_WRITE_BATCHING=1)에서는 POST /posts/ 요청을 큐에 넣고, 전용 스레드 하나가
+# 첫 요청이 들어온 뒤 최대 POST_BATCH_MAX_DELAY_MS 동안 또는 POST_BATCH_MAX_ROWS개가 모일 때까지 기다렸다가
+# 소유자 확인 IN 조회 + 여러 행 INSERT ... RETURNING + COMMIT 한 번으로 저장합니다.
+# 각 요청은 자기 게시물의 post_no(또는 에러)를 따로 돌려받으므로 응답 형식은 바뀌지 않습니다.
+#
+# 큐가 가득 차면(POST_BATCH_QUEUE_SIZE) 더 기다리게 하지 않고 바로 503 Service Unavailable을 응답하여,
+# 클라이언트가 잠시 후 다시 시도하도록 합니다. (back-pressure)
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from . import models
+from .bulk import insert_returning_in_order
+from .config import settings
+from .database import get_engine
+from .metrics import Counter, Histogram
+
+POST_BATCH_ROWS = Histogram(
+    "post_write_batch_rows", "Posts written per group commit.", buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+POST_BATCH_REJECTED = Counter("post_write_rejected_total", "Post creates rejected because the write queue was full.")
+
+# 전용 스레드에 종료를 알리는 값입니다.
+_STOP = object()
+
+
+# 게시물 생성 요청을 받는 큐와, 큐의 요청을 모아서 저장하는 전용 스레드입니다.
+# session_factory는 전용 스레드가 묶음마다 새 DB 세션을 만들 때 사용합니다.
+class PostWriteBatcher:
+    def __init__(self, session_factory, max_rows: int = 100, max_delay_ms: float = 5, queue_size: int = 1000):
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.max_delay = max_delay_ms / 1000
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="post-write-batcher", daemon=True)
+        self._thread.start()
+
+    # 게시물 하나를 큐에 넣고, 저장된 게시물(dict)을 받을 Future를 반환합니다.
+    # 큐가 가득 차 있으면 기다리지 않고 503 에러를 발생시킵니다.
+    def submit(self, post) -> Future:
+        future = Future()
+        try:
+            self._queue.put_nowait((post, future))
+        except queue.Full:
+            POST_BATCH_REJECTED.inc()
+            raise HTTPException(status_code=503, detail="Write queue is full", headers={"Retry-After": "1"})
+        return future
+
+    # 큐에 남은 요청을 모두 저장한 뒤 전용 스레드를 종료합니다. (앱 종료 시 호출)
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            # 첫 요청이 들어온 시점부터 max_delay 동안, 또는 max_rows개가 모일 때까지 요청을 더 모읍니다.
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    # 모은 요청을 한 트랜잭션으로 저장하고, 요청마다 결과 또는 에러를 Future에 전달합니다.
+    def _flush(self, batch: list) -> None:
+        POST_BATCH_ROWS.observe(len(batch))
+        try:
+            with self.session_factory() as db:
+                results = self._write(db, batch)
+        except IntegrityError:
+            # 소유자 확인 후 저장 전에 사용자가 삭제된 경우 등, 묶음 전체가 실패하면
+            # 다른 요청까지 실패하지 않도록 한 건씩 다시 저장하여 문제가 된 요청만 에러를 받게 합니다.
+            results = []
+            for item in batch:
+                try:
+                    with self.session_factory() as db:
+                        results.extend(self._write(db, [item]))
+                except IntegrityError:
+                    results.append(HTTPException(status_code=404, detail="Owner User not found"))
+                except Exception as exc:
+                    results.append(exc)
+        except Exception as exc:
+            results = [exc] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    # 소유자가 있는 게시물만 여러 행 INSERT ... RETURNING으로 저장하고, 요청 순서대로 결과 목록을 반환합니다.
+    # 묶음 전체를 한 문장으로 저장하고 post_no 순서로 요청과 연결합니다. (bulk.py의 insert_returning_in_order 참고)
+    def _write(self, db, batch: list) -> list:
+        owner_nos = {post.user_no for post, _ in batch}
+        existing_owners = {
+            user_no for (user_no,) in db.query(models.User.user_no).filter(models.User.user_no.in_(owner_nos))
+        }
+        to_insert = [post for post, _ in batch if post.user_no in existing_owners]
+
+        created = []
+        if to_insert:
+            rows = insert_returning_in_order(
+                db, models.Post.post_no, [post.model_dump() for post in to_insert], models.Post.reg_date
+            )
+            db.commit()
+            created = iter(rows)
+
+        results = []
+        for post, _ in batch:
+            if post.user_no in existing_owners:
+                row = next(created)
+                results.append({**post.model_dump(), "post_no": row.post_no, "reg_date": row.reg_date})
+            else:
+                results.append(HTTPException(status_code=404, detail="Owner User not found"))
+        return results
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+# API 라우터에서 그룹 커밋 큐를 사용하기 위한 의존성 함수입니다.
+# 그룹 커밋 모드가 꺼져 있으면 None을 반환하고, 켜져 있으면 처음 호출될 때 큐와 전용 스레드를 만듭니다.
+def get_post_batcher():
+    global _batcher
+    if not settings.post_write_batching:
+        return None
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = PostWriteBatcher(
+                    sessionmaker(autocommit=False, autoflush=False, bind=get_engine()),
+                    max_rows=settings.post_batch_max_rows,
+                    max_delay_ms=settings.post_batch_max_delay_ms,
+                    queue_size=settings.post_batch_queue_size,
+                )
+    return _batcher
+
+
+# 그룹 커밋 큐가 만들어졌다면 남은 요청을 저장하고 종료합니다. (앱 종료 시 호출)
+def close_post_batcher() -> None:
+    global _batcher
+    if _batcher is not None:
+        _batcher.close()
+        _batcher = None
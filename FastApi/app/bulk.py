@@ -0,0 +1,85 @@
+# app/bulk.py
+# 대량 생성(bulk) API에서 공통으로 사용하는 요청 본문 파싱 및 유효성 검사 함수들을 정의합니다.
+#
+# 대량 생성 API는 JSON 배열과 NDJSON(한 줄에 JSON 객체 하나) 두 가지 형식을 모두 받습니다.
+#   - JSON 배열:  Content-Type: application/json       [{"title": ...}, {"title": ...}]
+#   - NDJSON:     Content-Type: application/x-ndjson   {"title": ...}\n{"title": ...}\n
+
+import json
+from typing import Iterable, List, Tuple
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+
+from .config import settings
+
+# NDJSON 형식으로 처리할 Content-Type 목록입니다.
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+# SQLite는 SQL 문장 하나에 바인딩할 수 있는 값의 개수에 제한이 있으므로(기본 32766개),
+# IN (...) 조회는 이 크기만큼 나누어 실행합니다.
+IN_CLAUSE_CHUNK_SIZE = 10000
+
+
+# 요청 본문을 읽어 항목(dict) 목록으로 변환하는 의존성 함수입니다.
+# 본문을 읽으려면 await가 필요하므로 async 함수로 만들고, API 함수 자체는 동기(def)로 두어
+# DB 작업이 이벤트 루프를 막지 않고 스레드 풀에서 실행되도록 합니다.
+async def read_bulk_items(request: Request) -> list:
+    body = await request.body()
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if media_type in NDJSON_MEDIA_TYPES:
+        items = []
+        for line_no, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue  # 빈 줄은 무시합니다.
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid JSON at line {line_no}")
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array")
+
+    # 한 번에 너무 많은 항목을 받으면 메모리를 과도하게 사용하므로 최대 개수를 제한합니다.
+    if len(items) > settings.bulk_max_items:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {settings.bulk_max_items})")
+    return items
+
+
+# 각 항목을 Pydantic 모델로 검사합니다.
+# 잘못된 항목이 있어도 요청 전체를 실패시키지 않고, 항목별 에러 메시지를 따로 모아 반환합니다.
+# 반환값: ([(index, 모델 객체), ...], {index: 에러 메시지, ...})
+def validate_items(items: list, model: type) -> Tuple[List[Tuple[int, BaseModel]], dict]:
+    valid, errors = [], {}
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, model.model_validate(item)))
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            location = ".".join(str(part) for part in error["loc"]) or "item"
+            errors[index] = f"{location}: {error['msg']}"
+    return valid, errors
+
+
+# 목록을 size 크기의 조각으로 나눕니다. (IN 조회의 바인딩 값 개수 제한 대응)
+def chunked(values: list, size: int = IN_CLAUSE_CHUNK_SIZE) -> Iterable[list]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+# 여러 행을 INSERT ... RETURNING으로 저장하고, RETURNING 결과를 rows와 같은 순서로 반환합니다.
+# key_column은 AUTOINCREMENT 기본 키(models.py 참고)이며, 결과의 첫 번째 값입니다.
+#
+# returning(..., sort_by_parameter_order=True)를 사용하면 SQLAlchemy는 SQLite에서 결과 순서를 맞출 방법(sentinel)이 없어
+# 행마다 INSERT 문장을 따로 실행하므로, 여기서는 여러 행 INSERT(insertmanyvalues, 최대 1000행씩)로 저장한 뒤 키로 정렬합니다.
+# SQLite는 VALUES의 행을 적힌 순서대로 저장하고, AUTOINCREMENT 키는 이전에 사용한 어떤 값보다 큰 값을 받으며,
+# 여러 문장으로 나뉜 묶음도 한 트랜잭션 안에서 순서대로 실행되므로, 키의 오름차순이 곧 rows의 순서입니다.
+def insert_returning_in_order(db, key_column, rows: list, *columns) -> list:
+    result = db.execute(insert(key_column.table).returning(key_column, *columns), rows)
+    return sorted(result.all(), key=lambda row: row[0])
@@ -0,0 +1,216 @@
+# app/cache.py
+# 자주 조회되는 사용자/게시물의 응답(JSON 바이트)을 저장해 두는 캐시 계층입니다.
+#
+# 조회 API는 캐시에 응답이 있으면 DB 조회와 Pydantic 변환 없이 저장된 JSON을 그대로 돌려주고,
+# 수정/삭제 API는 변경된 데이터의 캐시 항목을 정확히 지웁니다(무효화).
+#
+# 조회 API가 DB를 읽은 뒤 캐시에 저장하기 전에 다른 요청이 데이터를 수정하고 캐시를 지우면,
+# 수정 전 데이터로 만든 응답이 그대로 저장되어 TTL 동안 오래된 응답(과 ETag)을 돌려주게 됩니다.
+# 이를 막기 위해 조회 API는 DB를 읽기 전에 generation(key)로 세대 번호를 받아 두고 set(key, value, generation=...)으로 저장하며,
+# 그 사이에 delete(key)로 무효화되었으면 저장하지 않습니다.
+#
+# 캐시 저장소(backend)는 설정(CACHE_BACKEND)으로 선택합니다.
+#   - memory: 프로세스 내부의 LRU + TTL 캐시 (기본값)
+#   - redis:  Redis(또는 Redis 호환 서버)에 저장하여 여러 프로세스가 캐시를 공유 (redis 패키지 필요)
+#   - none:   캐시를 사용하지 않음
+#
+# blocking 속성은 메서드가 네트워크 I/O로 기다리는지를 나타냅니다.
+# 비동기 API 함수(routers/async_routes.py)는 blocking인 캐시를 이벤트 루프가 아닌 스레드 풀에서 호출합니다.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .config import settings
+
+
+# 캐시 키를 만드는 함수들입니다. 조회 API와 무효화 코드가 같은 키를 사용하도록 한 곳에서 정의합니다.
+def user_key(user_no: int) -> str:
+    return f"user:{user_no}"
+
+
+def post_key(post_no: int) -> str:
+    return f"post:{post_no}"
+
+
+# 프로세스 메모리에 저장하는 LRU(Least Recently Used) + TTL(Time To Live) 캐시입니다.
+# 최대 개수(maxsize)를 넘으면 가장 오래 사용되지 않은 항목부터 지우고(eviction),
+# 저장 후 ttl초가 지난 항목은 만료된 것으로 보고 다시 조회하게 합니다.
+# API 함수들이 스레드 풀에서 동시에 실행되므로 Lock으로 보호합니다.
+#
+# 세대 번호는 무효화할 때마다 1씩 늘어나는 전체 카운터이며, 키마다 마지막으로 무효화된 세대를 기록합니다.
+# 기록도 최대 maxsize개만 유지하고, 밀려난 기록 중 가장 큰 세대(_floor)보다 오래된 세대로는 어떤 키도 저장하지 않습니다.
+# (드물게 저장을 건너뛸 뿐, 오래된 응답을 저장하지는 않습니다)
+class LRUCache:
+    blocking = False
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()  # key -> (만료 시각, 값)
+        self._generation = 0
+        self._invalidated = OrderedDict()  # key -> 마지막으로 무효화된 세대 (오래된 순)
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._items[key]  # 만료된 항목은 지웁니다.
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)  # 최근에 사용한 항목을 맨 뒤로 옮깁니다.
+            self.hits += 1
+            return item[1]
+
+    def generation(self, key: str) -> int:
+        with self._lock:
+            return self._generation
+
+    # generation을 지정하면, 그 세대 번호를 받은 뒤에 key가 무효화된 경우 저장하지 않습니다.
+    def set(self, key: str, value: bytes, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and self._invalidated.get(key, self._floor) > generation:
+                return
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)  # 가장 오래 사용되지 않은 항목을 지웁니다.
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._items.pop(key, None)
+                self._invalidated[key] = self._generation
+                self._invalidated.move_to_end(key)
+            while len(self._invalidated) > self.maxsize:
+                _, self._floor = self._invalidated.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            # 지우기 전에 세대 번호를 받은 조회도 저장하지 않게 합니다.
+            self._generation += 1
+            self._invalidated.clear()
+            self._floor = self._generation
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Redis 호환 서버에 저장하는 캐시입니다.
+# client는 get/set(ex=)/delete/incr/expire 메서드를 가진 객체면 되므로, 테스트에서는 간단한 대체 객체를 넣을 수 있습니다.
+# 만료와 메모리 한도에 따른 삭제는 Redis 서버가 처리하므로 evictions는 Redis의 INFO 통계에서 확인합니다.
+#
+# 세대 번호는 키마다 별도의 카운터 키("<키>:gen")에 저장하며, 무효화할 때 카운터를 먼저 올리고 항목을 지웁니다.
+# 여러 프로세스가 함께 사용하므로 "세대 확인 후 저장"을 한 번에 실행할 수 없어, 저장한 뒤 세대를 다시 확인하고
+# 그 사이에 무효화되었으면 방금 저장한 항목을 지웁니다. 무효화가 저장보다 늦게 끝나면 무효화 쪽의 삭제가 항목을 지웁니다.
+class RedisCache:
+    # 세대 카운터 키의 유효 시간(초)입니다. 한동안 수정되지 않은 키의 카운터는 Redis가 지웁니다.
+    GENERATION_TTL = 24 * 60 * 60
+    blocking = True
+
+    def __init__(self, client, ttl: float = 60, prefix: str = "fastapi:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _generation_key(self, key: str) -> str:
+        return self.prefix + key + ":gen"
+
+    def generation(self, key: str) -> int:
+        return int(self.client.get(self._generation_key(key)) or 0)
+
+    def set(self, key: str, value: bytes, generation: Optional[int] = None) -> None:
+        if generation is not None and self.generation(key) != generation:
+            return
+        self.client.set(self.prefix + key, value, ex=int(self.ttl))
+        if generation is not None and self.generation(key) != generation:
+            self.client.delete(self.prefix + key)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.client.incr(self._generation_key(key))
+            self.client.expire(self._generation_key(key), self.GENERATION_TTL)
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self) -> None:
+        # 다른 애플리케이션의 키를 지우지 않도록 prefix로 시작하는 키만 지웁니다.
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "hits": self.hits, "misses": self.misses, "evictions": 0}
+
+
+# 캐시를 사용하지 않을 때(CACHE_BACKEND=none) 사용하는, 아무것도 저장하지 않는 캐시입니다.
+class NullCache:
+    blocking = False
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def generation(self, key: str) -> int:
+        return 0
+
+    def set(self, key: str, value: bytes, generation: Optional[int] = None) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "none", "hits": 0, "misses": 0, "evictions": 0}
+
+
+# 설정(CACHE_BACKEND)에 맞는 캐시 객체를 만듭니다.
+def create_cache():
+    if settings.cache_backend == "none":
+        return NullCache()
+    if settings.cache_backend == "redis":
+        # redis 패키지는 Redis 캐시를 사용할 때만 필요하므로, 이때만 import합니다.
+        import redis
+
+        return RedisCache(redis.Redis.from_url(settings.cache_url), ttl=settings.cache_ttl)
+    return LRUCache(maxsize=settings.cache_maxsize, ttl=settings.cache_ttl)
+
+
+_cache = None
+
+
+# API 라우터에서 캐시를 사용하기 위한 의존성 함수입니다.
+# 처음 호출될 때 캐시 객체를 만들고, 이후에는 같은 객체를 공유합니다.
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = create_cache()
+    return _cache
@@ -0,0 +1,188 @@
+# app/compression.py
+# 응답 본문을 gzip 또는 brotli로 압축하는 ASGI 미들웨어입니다.
+#
+# 게시물 본문을 포함하는 목록 응답(GET /users/?limit=100 등)은 수 MB가 될 수 있지만, JSON 텍스트는 압축이 잘 되므로
+# 압축하면 전송량과 느린 네트워크에서의 응답 시간이 크게 줄어듭니다.
+# 클라이언트가 Accept-Encoding 헤더로 허용한 방식 중 설정(RESPONSE_COMPRESSION)의 우선순위가 높은 방식을 사용합니다.
+# brotli는 같은 CPU 비용으로 gzip보다 작게 압축하지만 선택 패키지이므로, 설치되어 있지 않으면 gzip만 사용합니다.
+#
+# 본문이 한 번에 오는 응답은 최소 크기(COMPRESSION_MIN_SIZE) 이상일 때만 압축하고,
+# 스트리밍 응답(내보내기 API)은 조각마다 압축한 뒤 flush하여 클라이언트가 바로 받을 수 있게 합니다.
+#
+# ETag는 압축 전 본문으로 계산하므로(responses.py 참고), 압축한 응답의 ETag는 약한(W/) ETag로 바꿉니다.
+# 강한 ETag는 바이트 단위로 같은 본문을 뜻하므로, 압축 방식이 다른 본문에 같은 강한 ETag를 붙이면 안 됩니다.
+# If-None-Match는 약한 비교를 사용하므로, 클라이언트가 약한 ETag를 보내도 304 응답은 그대로 동작합니다.
+
+import zlib
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli는 선택 패키지입니다.
+    brotli = None
+
+# 압축할 응답의 Content-Type입니다. 이미 압축된 형식(이미지 등)은 다시 압축해도 작아지지 않습니다.
+COMPRESSIBLE_MEDIA_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# 이 크기(byte) 이상의 본문 조각은 이벤트 루프를 막지 않도록 스레드에서 압축합니다.
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+
+# 사용할 수 있는 압축 방식입니다. brotli 패키지가 없으면 br은 제외합니다.
+def available_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+# Accept-Encoding 헤더에서 클라이언트가 허용하는 방식을 찾습니다. (q=0은 허용하지 않는다는 뜻입니다)
+# 예: "gzip, deflate, br;q=0.5" -> {"gzip", "deflate", "br"}
+def accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        q = params.strip().removeprefix("q=")
+        try:
+            if params and float(q) == 0:
+                continue
+        except ValueError:
+            continue
+        if coding:
+            accepted.add(coding)
+    return accepted
+
+
+# 강한 ETag를 약한 ETag로 바꿉니다. ("abc" -> W/"abc")
+def weaken_etag(etag: str) -> str:
+    return etag if etag.startswith("W/") else "W/" + etag
+
+
+# 본문 조각을 이어서 압축하는 객체입니다. final이 False이면 지금까지의 데이터를 flush하여 바로 보낼 수 있게 합니다.
+class GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._compressor.process(data) + (self._compressor.finish() if final else self._compressor.flush())
+
+
+# 요청 하나의 응답 메시지를 받아 압축하여 보내는 객체입니다.
+# http.response.start 메시지는 첫 본문 조각을 보고 압축 여부를 정한 뒤에 헤더를 고쳐서 보냅니다.
+class CompressedResponder:
+    def __init__(self, send, encoding: str, stream_factory, minimum_size: int, if_none_match: str = ""):
+        self.send = send
+        self.if_none_match = if_none_match
+        self.encoding = encoding
+        self.stream_factory = stream_factory
+        self.minimum_size = minimum_size
+        self.start = None
+        self.stream = None
+        self.passthrough = False
+
+    async def __call__(self, message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start = message
+            headers = MutableHeaders(raw=message["headers"])
+            media_type = headers.get("content-type", "").lower()
+            if message["status"] == 304:
+                # 본문이 없는 304 응답은 클라이언트가 저장한 응답과 같은 ETag를 돌려줍니다.
+                # 클라이언트가 약한 ETag를 보냈다면 압축된 응답을 저장하고 있는 것이므로 약한 ETag로 바꿉니다.
+                # (최소 크기보다 작아 압축하지 않은 응답은 강한 ETag 그대로 돌려줍니다)
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers and weaken_etag(headers["etag"]) in self.if_none_match:
+                    headers["ETag"] = weaken_etag(headers["etag"])
+                self.passthrough = True
+            elif (
+                "content-encoding" in headers
+                or message["status"] in (204, 206)
+                or not media_type.startswith(COMPRESSIBLE_MEDIA_TYPES)
+            ):
+                self.passthrough = True
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if self.passthrough or message_type != "http.response.body":
+            if self.start is not None and not self.passthrough:
+                # 본문 없이 다른 메시지가 먼저 오면 압축하지 않고 그대로 보냅니다.
+                self.passthrough = True
+                await self.send(self.start)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.minimum_size:
+                # 작은 응답은 압축하지 않습니다.
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.stream = self.stream_factory()
+            headers["Content-Encoding"] = self.encoding
+            if "etag" in headers:
+                headers["ETag"] = weaken_etag(headers["etag"])
+            body = await self._compress(body, final=not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self.send(self.start)
+        else:
+            body = await self._compress(body, final=not more_body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _compress(self, body: bytes, final: bool) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(self.stream.compress, body, final)
+        return self.stream.compress(body, final)
+
+
+# 요청의 Accept-Encoding에 따라 압축 방식을 고르는 미들웨어입니다.
+# encodings는 우선순위 순서의 압축 방식 목록이며, 사용할 수 없는 방식(설치되지 않은 brotli 등)은 무시합니다.
+class CompressionMiddleware:
+    def __init__(self, app, encodings=("br", "gzip"), minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4):
+        self.app = app
+        self.encodings = tuple(encoding for encoding in encodings if encoding in available_encodings())
+        self.minimum_size = minimum_size
+        self.stream_factories = {
+            "gzip": lambda: GzipStream(gzip_level),
+            "br": lambda: BrotliStream(brotli_quality),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        encoding = next((encoding for encoding in self.encodings if encoding in accepted), None)
+        if encoding is None:
+            # 압축하지 않는 응답에도 Vary를 붙여, 중간 캐시가 압축된 응답을 이 클라이언트에게 돌려주지 않게 합니다.
+            async def send_with_vary(message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                await send(message)
+
+            await self.app(scope, receive, send_with_vary)
+            return
+        responder = CompressedResponder(
+            send, encoding, self.stream_factories[encoding], self.minimum_size,
+            if_none_match=request_headers.get("if-none-match", ""),
+        )
+        await self.app(scope, receive, responder)
@@ -0,0 +1,126 @@
+# app/config.py
+# 환경 변수에서 애플리케이션 설정을 읽어오는 파일입니다.
+# 코드에 값을 직접 적지 않고 환경 변수로 관리하면, 같은 이미지를 개발/운영 환경에서 설정만 바꿔 실행할 수 있습니다.
+# (예: docker run -e DATABASE_URL=sqlite:////data/other.db -e DB_PROFILE=default ...)
+
+import os
+
+
+# 환경 변수 값을 정수로 읽습니다. 값이 없으면 기본값을 사용합니다.
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+class Settings:
+    def __init__(self):
+        # --- 데이터베이스 연결 설정 ---
+        # Docker 컨테이너 내의 SQLite 데이터베이스 파일 경로가 기본값입니다.
+        # docker run 명령어의 볼륨 마운트 설정(-v C:\docker\FastApi\data:/data)에 따라
+        # 로컬의 'C:\docker\FastApi\data' 폴더가 컨테이너의 '/data' 폴더와 연결됩니다.
+        self.database_url = os.getenv("DATABASE_URL", "sqlite:////data/myapp.db")
+
+        # SQLite 연결마다 적용할 PRAGMA 묶음(프로필)의 이름입니다. (database.py의 SQLITE_PROFILES 참고)
+        # production: WAL 모드 등 운영용 튜닝, default: 외래 키 검사만 켜는 SQLite 기본 동작
+        self.db_profile = os.getenv("DB_PROFILE", "production")
+
+        # 앱 시작(lifespan) 시 스키마 버전을 확인하고, 최신이 아니면 테이블/인덱스를 만들거나 갱신합니다. (migrate.py 참고)
+        # 0이면 확인하지 않으며, 배포 단계에서 python -m app.migrate를 따로 실행해야 합니다.
+        self.migrate_on_startup = _env_int("MIGRATE_ON_STARTUP", 1) != 0
+
+        # --- 스레드 풀 / 커넥션 풀 설정 ---
+        # FastAPI는 동기(def) API 함수를 스레드 풀에서 실행합니다. (기본 40개)
+        # 커넥션 풀 크기를 스레드 수와 맞춰, 모든 스레드가 커넥션을 기다리지 않고 바로 얻을 수 있게 합니다.
+        # 이 값은 커넥션 풀 크기의 기본값으로만 쓰이며, 스레드 풀 크기 자체는 바꾸지 않습니다.
+        self.threadpool_size = _env_int("THREADPOOL_SIZE", 40)
+
+        # 1이면 자주 호출되는 API(사용자/게시물 단건 조회, 게시물 작성)를 비동기(async) 함수와
+        # 비동기 엔진(aiosqlite)으로 처리하여, 동시 요청 수가 스레드 풀 크기에 묶이지 않게 합니다.
+        # aiosqlite와 greenlet 패키지가 필요합니다. (routers/async_routes.py 참고)
+        # 로컬 SQLite 파일에서는 쿼리마다 aiosqlite 스레드를 거치는 비용이 더 커서 동기 방식보다 느리므로 기본값은 0입니다.
+        # (benchmarks/async_load.py, 200 동시 요청에서 동기 약 90 req/s, 비동기 약 50 req/s)
+        self.async_db = _env_int("ASYNC_DB", 0) != 0
+        self.db_pool_size = _env_int("DB_POOL_SIZE", self.threadpool_size)
+        self.db_max_overflow = _env_int("DB_MAX_OVERFLOW", 0)
+        # 풀에 남은 커넥션이 없을 때 기다리는 최대 시간(초)입니다.
+        self.db_pool_timeout = _env_int("DB_POOL_TIMEOUT", 30)
+
+        # --- 읽기 전용 DB 설정 (database.py의 get_read_db 참고) ---
+        # 조회(GET) API가 사용할 DB 주소입니다. 비워두면 DATABASE_URL과 같은 DB를 읽기 전용 연결로 엽니다.
+        # 다른 DB 서버의 복제본(replica) 주소를 지정할 수도 있습니다.
+        # 복제가 늦어지는 복제본을 사용하면, 수정 직후 조회한 오래된 응답이 캐시 유효 시간(CACHE_TTL) 동안 남을 수 있습니다.
+        self.read_database_url = os.getenv("READ_DATABASE_URL", "") or self.database_url
+        # 읽기 전용 커넥션 풀의 크기입니다. 쓰기용 풀과 따로 설정합니다.
+        self.db_read_pool_size = _env_int("DB_READ_POOL_SIZE", self.threadpool_size)
+        self.db_read_max_overflow = _env_int("DB_READ_MAX_OVERFLOW", 0)
+
+        # --- SQLite PRAGMA 값 (production 프로필에서 사용) ---
+        # busy_timeout: 다른 연결이 쓰기 잠금을 잡고 있을 때 바로 실패하지 않고 기다리는 시간(ms)
+        self.sqlite_busy_timeout_ms = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+        # cache_size: 음수이면 KiB 단위입니다. (-64000 = 약 64MB 페이지 캐시)
+        self.sqlite_cache_size = _env_int("SQLITE_CACHE_SIZE", -64000)
+        # mmap_size: 메모리 매핑으로 읽을 DB 파일의 최대 크기(byte)입니다. (256MB)
+        self.sqlite_mmap_size = _env_int("SQLITE_MMAP_SIZE", 268435456)
+
+        # --- 웹 서버 설정 (serve.py 참고) ---
+        self.host = os.getenv("HOST", "0.0.0.0")
+        self.port = _env_int("PORT", 8000)
+        # 워커 프로세스 수입니다. 0이면 CPU 코어 수만큼 실행합니다.
+        self.web_workers = _env_int("WEB_WORKERS", 0)
+        # 아직 accept하지 못한 연결을 OS가 대기시킬 수 있는 최대 개수입니다.
+        self.web_backlog = _env_int("WEB_BACKLOG", 2048)
+        # 요청이 끝난 뒤 다음 요청을 기다리며 연결(keep-alive)을 유지하는 시간(초)입니다.
+        self.web_keep_alive = _env_int("WEB_KEEP_ALIVE", 5)
+        # 종료 신호를 받은 뒤 처리 중인 요청이 끝나기를 기다리는 최대 시간(초)입니다.
+        self.web_graceful_timeout = _env_int("WEB_GRACEFUL_TIMEOUT", 30)
+
+        # --- API 설정 ---
+        # 조회 API의 JSON 변환 방식입니다. (responses.py 참고)
+        # pydantic: Pydantic 모델로 검증 후 변환 (기본값), orjson: ORM 객체를 바로 orjson으로 변환하는 빠른 경로
+        self.json_renderer = os.getenv("JSON_RENDERER", "pydantic")
+        # 응답 압축에 사용할 방식의 우선순위입니다. (compression.py 참고)
+        # 클라이언트의 Accept-Encoding이 허용하는 방식 중 앞에 있는 것을 사용하며, 비워두면 압축하지 않습니다.
+        # br은 brotli 패키지가 설치되어 있을 때만 사용합니다.
+        self.response_compression = os.getenv("RESPONSE_COMPRESSION", "br,gzip")
+        # 본문이 이 크기(byte)보다 작은 응답은 압축하지 않습니다. 작은 응답은 압축해도 줄어드는 양보다 CPU 비용이 큽니다.
+        self.compression_min_size = _env_int("COMPRESSION_MIN_SIZE", 1024)
+        # 압축 수준입니다. gzip은 1~9, brotli는 0~11이며, 높을수록 더 작게 압축하지만 CPU를 더 사용합니다.
+        self.gzip_level = _env_int("GZIP_LEVEL", 6)
+        self.brotli_quality = _env_int("BROTLI_QUALITY", 4)
+        # 대량 생성 API(POST /users/bulk, /posts/bulk)가 한 번에 받을 수 있는 최대 항목 수입니다.
+        self.bulk_max_items = _env_int("BULK_MAX_ITEMS", 50000)
+        # 게시물 수가 이 값을 넘는 사용자는 삭제 요청 시 202 Accepted를 응답하고 백그라운드에서 삭제합니다.
+        self.user_delete_background_threshold = _env_int("USER_DELETE_BACKGROUND_THRESHOLD", 10000)
+        # 백그라운드 삭제 시 한 트랜잭션에서 지울 게시물 수입니다.
+        self.user_delete_batch_size = _env_int("USER_DELETE_BATCH_SIZE", 5000)
+
+        # --- 게시물 그룹 커밋 설정 (batching.py 참고) ---
+        # 1이면 동시에 들어온 게시물 생성 요청을 모아 한 트랜잭션으로 저장합니다. (기본값 0: 요청마다 커밋)
+        self.post_write_batching = _env_int("POST_WRITE_BATCHING", 0) != 0
+        # 한 번에 저장할 최대 게시물 수와, 첫 요청 후 다른 요청을 기다리는 최대 시간(ms)입니다.
+        self.post_batch_max_rows = _env_int("POST_BATCH_MAX_ROWS", 100)
+        self.post_batch_max_delay_ms = _env_int("POST_BATCH_MAX_DELAY_MS", 5)
+        # 저장을 기다리는 요청의 최대 개수입니다. 가득 차면 503으로 응답합니다.
+        self.post_batch_queue_size = _env_int("POST_BATCH_QUEUE_SIZE", 1000)
+        # 요청이 저장 결과를 기다리는 최대 시간(초)입니다.
+        self.post_batch_timeout = _env_int("POST_BATCH_TIMEOUT", 30)
+
+        # --- 모니터링 설정 (metrics.py 참고) ---
+        # 요청 지연 시간, DB 쿼리 수/시간 등을 수집하여 /metrics로 제공합니다. 0이면 수집하지 않습니다.
+        self.metrics_enabled = _env_int("METRICS_ENABLED", 1) != 0
+        # 실행 시간이 이 값(ms) 이상인 SQL 문장을 느린 쿼리로 로그에 남깁니다.
+        self.slow_query_ms = _env_int("SLOW_QUERY_MS", 100)
+
+        # --- 응답 캐시 설정 (cache.py 참고) ---
+        # memory: 프로세스 내부 LRU 캐시, redis: Redis 호환 서버, none: 캐시 사용 안 함
+        self.cache_backend = os.getenv("CACHE_BACKEND", "memory")
+        self.cache_url = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+        # memory 캐시에 저장할 최대 항목 수와, 항목의 유효 시간(초)입니다.
+        self.cache_maxsize = _env_int("CACHE_MAXSIZE", 10000)
+        self.cache_ttl = _env_int("CACHE_TTL", 60)
+
+
+# 애플리케이션 전체에서 공유하는 설정 객체입니다.
+settings = Settings()
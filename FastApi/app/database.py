@@ -1,29 +1,205 @@
 # app/database.py
 # 데이터베이스 연결 세션을 생성하고 관리하는 파일입니다.
 
-from sqlalchemy import create_engine
+import threading
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from .config import settings
+from .metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
+
 # --- 데이터베이스 연결 설정 ---
 
-# Docker 컨테이너 내의 SQLite 데이터베이스 파일 경로입니다.
-# docker run 명령어의 볼륨 마운트 설정(-v C:\docker\FastApi\data:/data)에 따라
-# 로컬의 'C:\docker\FastApi\data' 폴더가 컨테이너의 '/data' 폴더와 연결됩니다.
-# 따라서 컨테이너 내부에서는 '/data/myapp.db' 경로를 사용합니다.
-SQLALCHEMY_DATABASE_URL = "sqlite:////data/myapp.db"
+# 데이터베이스 주소는 환경 변수(DATABASE_URL)에서 읽어옵니다. (config.py 참고)
+# 기본값은 Docker 컨테이너 내의 '/data/myapp.db' 파일입니다.
+SQLALCHEMY_DATABASE_URL = settings.database_url
+
+# SQLite 연결이 새로 만들어질 때마다 실행할 PRAGMA 묶음(프로필)입니다.
+# PRAGMA는 연결 단위 설정이므로, 커넥션 풀이 새 연결을 만들 때마다 다시 적용해야 합니다.
+SQLITE_PROFILES = {
+    "production": [
+        # WAL 모드: 쓰기 중에도 읽기가 막히지 않아, 여러 스레드가 동시에 조회할 수 있습니다.
+        ("journal_mode", "WAL"),
+        # WAL 모드에서는 NORMAL로도 DB가 손상되지 않으며, 커밋마다 fsync하는 비용을 줄입니다.
+        ("synchronous", "NORMAL"),
+        # 쓰기 잠금을 만나면 바로 "database is locked" 에러를 내지 않고 지정한 시간만큼 기다립니다.
+        ("busy_timeout", settings.sqlite_busy_timeout_ms),
+        ("cache_size", settings.sqlite_cache_size),
+        ("mmap_size", settings.sqlite_mmap_size),
+        # 정렬 등에 쓰이는 임시 테이블을 디스크 대신 메모리에 만듭니다.
+        ("temp_store", "MEMORY"),
+        # SQLite는 기본적으로 외래 키 검사를 하지 않으므로, ON DELETE CASCADE가 동작하도록 켭니다.
+        ("foreign_keys", "ON"),
+    ],
+    "default": [
+        ("foreign_keys", "ON"),
+    ],
+}
+
 
 # SQLAlchemy '엔진'을 생성합니다. 엔진은 데이터베이스와의 실제 연결을 관리합니다.
-# connect_args={"check_same_thread": False}는 SQLite를 사용할 때만 필요하며,
-# FastAPI가 여러 스레드에서 데이터베이스와 상호작용할 수 있도록 허용하는 설정입니다.
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# 운영 DB와 테스트 DB가 같은 설정(PRAGMA 등)을 사용하도록 엔진 생성은 이 함수로 통일합니다.
+# kwargs로 poolclass 등을 넘기면 기본 커넥션 풀 설정 대신 사용합니다. (예: 테스트용 StaticPool)
+# read_only=True이면 SQLite 연결마다 query_only를 켜서, 실수로 쓰기 쿼리를 실행하면 에러가 나게 합니다.
+def create_db_engine(url: str, profile: str = None, read_only: bool = False, **kwargs):
+    profile = profile or settings.db_profile
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+
+    if is_sqlite:
+        # connect_args={"check_same_thread": False}는 SQLite를 사용할 때만 필요하며,
+        # FastAPI가 여러 스레드에서 데이터베이스와 상호작용할 수 있도록 허용하는 설정입니다.
+        kwargs.setdefault("connect_args", {"check_same_thread": False})
+
+    if "poolclass" not in kwargs:
+        # 커넥션 풀 크기를 스레드 풀 크기에 맞춥니다. (config.py 참고)
+        _set_pool_defaults(kwargs)
+        if settings.metrics_enabled:
+            # 빈 커넥션을 기다린 시간을 기록하는 커넥션 풀을 사용합니다. (metrics.py 참고)
+            kwargs.setdefault("poolclass", InstrumentedQueuePool)
+
+    engine = create_engine(url, **kwargs)
+    _configure_engine(engine, is_sqlite, profile, read_only)
+    return engine
+
+
+# 비동기(async) API 함수가 사용하는 엔진을 만듭니다. (ASYNC_DB=1, routers/async_routes.py 참고)
+# sqlite:/// 주소는 aiosqlite 드라이버(sqlite+aiosqlite:///)로 바꾸며, PRAGMA 프로필과 지표 수집은 동기 엔진과 같습니다.
+# aiosqlite는 DB 연결마다 전용 스레드에서 sqlite3를 실행하고 결과를 이벤트 루프로 돌려주므로,
+# API 함수는 스레드 풀의 스레드를 차지하지 않고 쿼리 결과를 기다립니다.
+def create_async_db_engine(url: str, profile: str = None, read_only: bool = False, **kwargs):
+    profile = profile or settings.db_profile
+    url = make_url(url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    if is_sqlite and url.get_driver_name() != "aiosqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+
+    if "poolclass" not in kwargs:
+        _set_pool_defaults(kwargs)
+        if settings.metrics_enabled:
+            kwargs.setdefault("poolclass", InstrumentedAsyncQueuePool)
+
+    engine = create_async_engine(url, **kwargs)
+    # 이벤트(PRAGMA 적용, 지표 수집)는 비동기 엔진이 감싸고 있는 동기 엔진에 등록합니다.
+    _configure_engine(engine.sync_engine, is_sqlite, profile, read_only)
+    return engine
+
+
+# 커넥션 풀 크기 설정의 기본값을 채웁니다.
+def _set_pool_defaults(kwargs: dict) -> None:
+    kwargs.setdefault("pool_size", settings.db_pool_size)
+    kwargs.setdefault("max_overflow", settings.db_max_overflow)
+    kwargs.setdefault("pool_timeout", settings.db_pool_timeout)
+
+
+# 엔진에 PRAGMA 프로필과 지표 수집 이벤트를 등록합니다.
+def _configure_engine(engine, is_sqlite: bool, profile: str, read_only: bool) -> None:
+    if is_sqlite:
+        pragmas = SQLITE_PROFILES[profile]
+        if read_only:
+            # 프로필의 PRAGMA(WAL 모드 설정 등)를 먼저 적용한 뒤 쓰기를 막습니다.
+            pragmas = pragmas + [("query_only", "ON")]
+
+        # 커넥션 풀이 새 DB 연결을 만들 때마다 프로필의 PRAGMA를 적용합니다.
+        @event.listens_for(engine, "connect")
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    # SQL 실행 시간, 느린 쿼리, 커넥션 풀 사용량을 /metrics와 Server-Timing 헤더로 수집합니다.
+    if settings.metrics_enabled:
+        instrument_engine(engine)
+
+
+# 엔진은 모듈 import 시점이 아니라 처음 필요할 때 만듭니다.
+# 앱을 import만 하는 경우(테스트, CLI, 워커 시작 직후)에는 DB 설정을 읽거나 파일에 접근하지 않습니다.
+_engine = None
+_read_engine = None
+_async_engine = None
+_async_read_engine = None
+_engine_lock = threading.Lock()
+
+
+# 애플리케이션이 사용하는 엔진을 반환합니다. 처음 호출할 때 한 번만 만듭니다.
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+    return _engine
+
+
+# 조회(GET) API가 사용하는 읽기 전용 엔진을 반환합니다. 처음 호출할 때 한 번만 만듭니다.
+# 쓰기용 엔진과 커넥션 풀을 따로 사용하므로, 쓰기 요청이 커넥션을 모두 차지해도 조회 요청은 기다리지 않습니다.
+# SQLite WAL 모드에서는 읽기 연결이 쓰기 잠금을 기다리지 않으며, 커밋된 최신 데이터를 바로 읽습니다.
+def get_read_engine():
+    global _read_engine
+    if _read_engine is None:
+        with _engine_lock:
+            if _read_engine is None:
+                _read_engine = create_db_engine(
+                    settings.read_database_url,
+                    read_only=True,
+                    pool_size=settings.db_read_pool_size,
+                    max_overflow=settings.db_read_max_overflow,
+                )
+    return _read_engine
+
+
+# 비동기 API 함수가 사용하는 엔진(쓰기용, 읽기 전용)을 반환합니다. 동기 엔진과 같이 처음 호출할 때 한 번만 만듭니다.
+# 비동기 엔진은 이벤트 루프 안에서만 호출되므로 잠금 없이 만듭니다.
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL)
+    return _async_engine
+
+
+def get_async_read_engine():
+    global _async_read_engine
+    if _async_read_engine is None:
+        _async_read_engine = create_async_db_engine(
+            settings.read_database_url,
+            read_only=True,
+            pool_size=settings.db_read_pool_size,
+            max_overflow=settings.db_read_max_overflow,
+        )
+    return _async_read_engine
+
+
+# 만들어진 엔진들의 커넥션 풀의 DB 연결을 모두 닫습니다. (앱 종료 시 호출)
+def dispose_engine() -> None:
+    for engine in (_engine, _read_engine):
+        if engine is not None:
+            engine.dispose()
+
+
+# 비동기 엔진들의 DB 연결을 모두 닫습니다. (앱 종료 시 호출)
+async def dispose_async_engine() -> None:
+    for engine in (_async_engine, _async_read_engine):
+        if engine is not None:
+            await engine.dispose()
+
+
+# 예전 코드(from app.database import engine)와의 호환을 위해, engine 속성을 읽으면 get_engine()을 호출합니다.
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # 데이터베이스 세션(Session)을 생성하는 클래스입니다.
 # 세션은 ORM을 통해 데이터베이스와 대화하는 통로 역할을 합니다.
 # autocommit=False, autoflush=False 설정은 트랜잭션을 명시적으로 관리(db.commit())하도록 합니다.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 엔진은 세션을 만들 때 지정합니다. (get_db 참고)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 # SQLAlchemy 모델(models.py의 클래스들)이 상속받을 기본 클래스입니다.
 Base = declarative_base()
@@ -34,8 +210,57 @@ Base = declarative_base()
 # API 라우터에서 데이터베이스 세션을 사용하기 위한 의존성 함수입니다.
 # FastAPI가 API 요청을 처리할 때 이 함수를 호출하여 DB 세션을 얻고, 처리가 끝나면 자동으로 세션을 닫습니다.
 def get_db():
-    db = SessionLocal()  # DB 세션 인스턴스 생성
+    db = SessionLocal(bind=get_engine())  # DB 세션 인스턴스 생성
     try:
         yield db  # API 함수에 DB 세션을 전달(주입)하고, API 함수의 실행이 끝날 때까지 대기
     finally:
         db.close()  # API 함수 실행이 끝나면(성공/실패 무관) 항상 DB 세션을 닫아 연결을 반환
+
+
+# 조회 요청이 방금 자신이 쓴 데이터를 반드시 읽어야 할 때(read-your-writes) 보내는 요청 헤더입니다.
+# 복제본(READ_DATABASE_URL)은 원본보다 늦게 갱신될 수 있으므로, 이 헤더가 있으면 쓰기용 DB에서 읽습니다.
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+
+# 요청에 맞는 조회용 엔진을 고릅니다.
+def read_engine_for(request: Request):
+    if _reads_own_writes(request):
+        return get_engine()
+    return get_read_engine()
+
+
+def _reads_own_writes(request: Request) -> bool:
+    return request.headers.get(READ_YOUR_WRITES_HEADER, "").lower() in ("1", "true", "yes")
+
+
+# 조회(GET) API에서 읽기 전용 DB 세션을 사용하기 위한 의존성 함수입니다.
+def get_read_db(request: Request):
+    db = SessionLocal(bind=read_engine_for(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# 비동기 API 함수에서 사용하는 DB 세션(AsyncSession)을 만드는 클래스입니다. (ASYNC_DB=1)
+# 세션 설정은 SessionLocal과 같고, 엔진은 세션을 만들 때 지정합니다.
+AsyncSessionLocal = async_sessionmaker(autoflush=False)
+
+
+# 비동기 API 함수에서 DB 세션을 사용하기 위한 의존성 함수입니다. (get_db와 같음)
+async def get_async_db():
+    db = AsyncSessionLocal(bind=get_async_engine())
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+# 비동기 조회 API에서 읽기 전용 DB 세션을 사용하기 위한 의존성 함수입니다. (get_read_db와 같음)
+async def get_async_read_db(request: Request):
+    engine = get_async_engine() if _reads_own_writes(request) else get_async_read_engine()
+    db = AsyncSessionLocal(bind=engine)
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -0,0 +1,50 @@
+# app/jobs.py
+# 응답을 먼저 보내고 백그라운드에서 실행하는 작업(job)의 상태를 관리합니다.
+#
+# 오래 걸리는 작업(예: 게시물이 매우 많은 사용자 삭제)은 202 Accepted와 작업 ID를 먼저 응답하고,
+# 클라이언트는 작업 상태 조회 API로 진행 상황을 확인합니다.
+# 작업 상태는 DB의 jobs 테이블(models.Job)에 저장하므로, 여러 워커 프로세스가 같은 작업을 조회할 수 있고
+# 서버를 재시작해도 사라지지 않습니다.
+# 아래 함수들은 커밋하지 않으므로, 호출한 쪽에서 다른 변경(예: 게시물 삭제)과 함께 한 번에 커밋합니다.
+
+import uuid
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, update
+
+from . import models
+
+# 보관할 최대 작업 수입니다. 새 작업을 만들 때 이보다 오래된 작업을 지웁니다.
+MAX_JOBS = 1000
+
+# 작업 정보(dict)에 담는 컬럼입니다. (schemas.Job의 필드와 같습니다)
+JOB_COLUMNS = ["job_id", "kind", "status", "detail", "user_no", "deleted_posts"]
+
+
+# 새 작업을 등록하고 작업 정보(dict)를 반환합니다.
+def create_job(db, kind: str, **fields) -> dict:
+    job = {"job_id": uuid.uuid4().hex, "kind": kind, "status": "pending", "detail": None, **fields}
+    db.execute(insert(models.Job).values(**job))
+    # 최근 MAX_JOBS개보다 오래된 작업을 지웁니다. 작업이 MAX_JOBS개 이하이면 기준 시각이 NULL이라 아무것도 지우지 않습니다.
+    cutoff = (
+        select(models.Job.created_at)
+        .order_by(models.Job.created_at.desc())
+        .offset(MAX_JOBS)
+        .limit(1)
+        .scalar_subquery()
+    )
+    db.execute(delete(models.Job).where(models.Job.created_at < cutoff))
+    return job
+
+
+# 작업의 상태와 결과 값을 갱신합니다.
+def update_job(db, job_id: str, **fields) -> None:
+    db.execute(update(models.Job).where(models.Job.job_id == job_id).values(**fields))
+
+
+# 작업 정보를 조회합니다. 없으면 None을 반환합니다.
+def get_job(db, job_id: str) -> Optional[dict]:
+    row = db.execute(
+        select(*(getattr(models.Job, column) for column in JOB_COLUMNS)).where(models.Job.job_id == job_id)
+    ).first()
+    return dict(row._mapping) if row is not None else None
@@ -1,21 +1,93 @@
 # FastAPI 애플리케이션을 생성하고, 라우터를 포함하며, 앱 시작 시 데이터베이스 테이블을 생성합니다.
 
 # app/main.py
-from fastapi import FastAPI
-from . import models
-from .database import engine
-from .routers import users, posts
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
 
-# SQLAlchemy 모델을 기반으로 데이터베이스 테이블 생성
-# 만약 테이블이 이미 존재하면 생성하지 않음
-models.Base.metadata.create_all(bind=engine)
+import anyio.to_thread
+from fastapi import Depends, FastAPI, Response
+from . import migrate, responses
+from .batching import close_post_batcher
+from .cache import get_cache
+from .compression import CompressionMiddleware
+from .config import settings
+from .database import dispose_async_engine, dispose_engine, get_engine
+from .metrics import PROMETHEUS_MEDIA_TYPE, MetricsMiddleware, render_metrics
+from .responses import FastJSONResponse
+from .routers import async_routes, users, posts
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+# 앱의 시작/종료 시점에 실행할 코드를 정의하는 lifespan 함수입니다.
+# yield 이전은 앱 시작 시, yield 이후는 앱 종료 시 실행됩니다.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ASYNC_DB=1에 필요한 패키지가 없으면 첫 요청에서야 실패하므로, 시작할 때 바로 알려 줍니다.
+    if settings.async_db:
+        missing = [name for name in ("aiosqlite", "greenlet") if importlib.util.find_spec(name) is None]
+        if missing:
+            raise RuntimeError(f"ASYNC_DB=1 requires the {', '.join(missing)} package(s)")
+
+    # JSON_RENDERER=orjson이어도 orjson 패키지가 없으면 빠른 경로가 표준 json 모듈로 조용히 바뀌므로, 시작할 때 알려 줍니다.
+    if settings.json_renderer == "orjson" and responses.orjson is None:
+        logger.warning("JSON_RENDERER=orjson but the orjson package is not installed; falling back to the json module")
+
+    # SQLAlchemy 모델을 기반으로 데이터베이스 테이블과 인덱스 생성
+    # 모듈 import 시점이 아니라 앱 시작 시 실행하므로, 앱을 import만 할 때는 DB에 접근하지 않습니다.
+    # 스키마 버전이 이미 최신이면 PRAGMA user_version만 읽고 끝납니다. (migrate.py 참고)
+    if settings.migrate_on_startup:
+        await anyio.to_thread.run_sync(migrate.upgrade, get_engine())
+    yield
+    # 앱 종료 시: 처리 중인 요청이 모두 끝난 뒤, 그룹 커밋 큐에 남은 게시물을 저장하고
+    # 커넥션 풀의 DB 연결을 모두 닫습니다.
+    await anyio.to_thread.run_sync(close_post_batcher)
+    dispose_engine()
+    await dispose_async_engine()
+
+
+# JSON_RENDERER=orjson이면 모든 API의 기본 응답 클래스를 orjson 기반의 FastJSONResponse로 바꿉니다.
+if settings.json_renderer == "orjson":
+    app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+else:
+    app = FastAPI(lifespan=lifespan)
+
+# 모든 요청의 응답 시간과 SQL 통계를 수집하고, Server-Timing 헤더를 붙입니다. (metrics.py 참고)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+# 응답 본문을 gzip/brotli로 압축합니다. (compression.py 참고)
+# 나중에 추가한 미들웨어가 바깥쪽에서 실행되므로, 압축 시간은 Server-Timing의 app 시간에 포함되지 않습니다.
+encodings = [encoding.strip() for encoding in settings.response_compression.split(",") if encoding.strip()]
+if encodings:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=encodings,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.gzip_level,
+        brotli_quality=settings.brotli_quality,
+    )
 
 # 라우터 포함
+# ASYNC_DB=1이면 자주 호출되는 API의 비동기 버전을 먼저 등록하여, 같은 경로의 동기 API 대신 처리하게 합니다.
+if settings.async_db:
+    app.include_router(async_routes.router)
 app.include_router(users.router)
 app.include_router(posts.router)
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to my FastAPI application!"}
+
+
+# 응답 캐시의 적중(hits)/실패(misses)/삭제(evictions) 횟수를 확인하는 API입니다.
+@app.get("/cache/stats")
+def read_cache_stats(cache=Depends(get_cache)):
+    return cache.stats()
+
+
+# Prometheus가 수집할 지표를 텍스트 형식으로 제공하는 API입니다.
+# 스레드 풀 사용량을 이벤트 루프에서 읽어야 하므로 async 함수로 만듭니다.
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    return Response(content=render_metrics(), media_type=PROMETHEUS_MEDIA_TYPE)
@@ -0,0 +1,312 @@
+# app/metrics.py
+# 요청 지연 시간과 DB 쿼리 통계를 수집하여 Prometheus 텍스트 형식으로 제공(/metrics)합니다.
+#
+# 수집 항목:
+#   - API(경로 템플릿)별 요청 수와 응답 시간 분포(히스토그램), 처리 중인 요청 수
+#   - 스레드 풀 사용량: 동기(def) API를 실행 중인 스레드 수와 최대 스레드 수
+#   - 커넥션 풀: 커넥션을 빌려간 횟수, 현재 빌려간 커넥션 수, 빈 커넥션을 기다린 시간
+#   - SQL 문장 실행 수와 실행 시간, 느린 쿼리 수
+#
+# 요청마다 실행한 SQL 문장 수와 총 실행 시간은 Server-Timing 응답 헤더로도 보내므로,
+# 브라우저 개발자 도구나 curl -i로 요청 하나의 시간이 어디에 쓰였는지 바로 확인할 수 있습니다.
+#   Server-Timing: db;dur=3.21;desc="4 queries", pool;dur=0.01, app;dur=5.40
+#
+# prometheus_client 패키지 없이 필요한 형식만 직접 만듭니다.
+# 통계는 프로세스 메모리에 저장되므로, 워커가 여러 개이면 Prometheus가 워커마다의 값을 따로 수집하게 됩니다.
+
+import contextvars
+import logging
+import threading
+import time
+
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.datastructures import MutableHeaders
+
+from .config import settings
+
+logger = logging.getLogger("app.sql")
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 응답 시간 히스토그램의 구간 경계(초)입니다.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 느린 쿼리 로그에 남길 SQL 문장의 최대 길이와, 바인딩 값 형태를 나열할 최대 개수입니다.
+SLOW_QUERY_MAX_STATEMENT = 2000
+SLOW_QUERY_MAX_PARAMS = 20
+
+
+# 레이블 값의 특수 문자를 Prometheus 형식에 맞게 이스케이프합니다.
+def _format_labels(names, values) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+# 모든 지표의 공통 부분입니다. 레이블 값의 조합마다 값을 따로 저장합니다.
+# 여러 스레드에서 동시에 값을 바꾸므로 잠금(lock)으로 보호합니다.
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_value(labels, value))
+        return lines
+
+    def _render_value(self, labels, value) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+# 증가만 하는 누적 값입니다. (예: 요청 수)
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, labels=()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+
+# 늘거나 줄 수 있는 현재 값입니다. (예: 처리 중인 요청 수)
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, labels=()) -> None:
+        self.inc(-amount, labels)
+
+    def set(self, value: float, labels=()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+# 값의 분포를 구간(bucket)별 개수로 기록합니다. (예: 응답 시간)
+# 값마다 [구간별 개수..., 합계, 개수]를 저장하고, 출력할 때 누적 개수로 바꿉니다.
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, amount: float, labels=()) -> None:
+        with self._lock:
+            data = self._values.get(labels)
+            if data is None:
+                data = self._values[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if amount <= bound:
+                    data[i] += 1
+                    break
+            data[-2] += amount
+            data[-1] += 1
+
+    def count(self, labels=()) -> int:
+        with self._lock:
+            data = self._values.get(labels)
+            return data[-1] if data else 0
+
+    def _render_value(self, labels, data) -> list:
+        names = self.labelnames + ("le",)
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, data):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels(names, labels + (bound,))} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(names, labels + ('+Inf',))} {data[-1]}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {data[-2]}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {data[-1]}")
+        return lines
+
+
+# /metrics로 출력할 지표 목록입니다. 지표를 만들면 자동으로 등록됩니다.
+REGISTRY = []
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests currently being processed.")
+THREADPOOL_BUSY = Gauge("threadpool_threads_busy", "Worker threads currently running sync endpoints.")
+THREADPOOL_SIZE = Gauge("threadpool_threads_total", "Maximum number of worker threads.")
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the SQLAlchemy pool.")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out of the SQLAlchemy pool.")
+DB_POOL_WAIT_SECONDS = Histogram("db_pool_wait_seconds", "Time spent waiting for a pooled connection.")
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed.")
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL statement execution time.")
+DB_SLOW_QUERIES = Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.")
+
+
+# 요청 하나가 실행한 SQL 문장 수와 시간을 모으는 객체입니다.
+# 미들웨어가 요청마다 새로 만들어 컨텍스트 변수에 넣어 두면, 스레드 풀에서 실행되는 API 함수에도
+# 같은 컨텍스트가 복사되어 전달되므로 DB 이벤트 리스너가 이 객체에 값을 더할 수 있습니다.
+class RequestStats:
+    __slots__ = ("queries", "sql_seconds", "pool_wait_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+    # Server-Timing 헤더 값을 만듭니다. 시간 단위는 밀리초입니다.
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f'db;dur={self.sql_seconds * 1000:.2f};desc="{self.queries} queries", '
+            f"pool;dur={self.pool_wait_seconds * 1000:.2f}, "
+            f"app;dur={total_seconds * 1000:.2f}"
+        )
+
+
+_request_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+# 현재 요청의 통계 객체를 반환합니다. 요청 밖(백그라운드 작업, CLI 등)에서는 None입니다.
+def current_request_stats():
+    return _request_stats.get()
+
+
+# 요청마다 응답 시간, 상태 코드, SQL 통계를 기록하는 ASGI 미들웨어입니다.
+# BaseHTTPMiddleware는 응답 본문을 한 번 더 감싸 스트리밍 응답을 느리게 하므로, 순수 ASGI 방식으로 만듭니다.
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        # 응답 헤더를 보내기 직전에 Server-Timing 헤더를 추가합니다.
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - start))
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            elapsed = time.perf_counter() - start
+            # /users/1, /users/2처럼 실제 경로가 아닌 /users/{user_no} 같은 경로 템플릿으로 집계합니다.
+            # 일치하는 경로가 없는 요청(404)은 레이블 값이 무한히 늘어나지 않도록 하나로 묶습니다.
+            route = scope.get("route")
+            template = getattr(route, "path", "<unmatched>")
+            HTTP_REQUESTS.inc(labels=(scope["method"], template, str(status)))
+            HTTP_REQUEST_SECONDS.observe(elapsed, labels=(scope["method"], template))
+            _request_stats.reset(token)
+
+
+# 빈 커넥션을 기다린 시간을 기록하는 커넥션 풀입니다.
+# SQLAlchemy의 checkout 이벤트는 커넥션을 얻은 뒤에만 호출되므로, 풀에서 커넥션을 꺼내는 부분을 감싸서 잽니다.
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_POOL_WAIT_SECONDS.observe(elapsed)
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.pool_wait_seconds += elapsed
+
+
+# 비동기 엔진(ASYNC_DB=1, database.py의 create_async_db_engine 참고)에서 사용하는 같은 커넥션 풀입니다.
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
+
+# 바인딩 값의 형태(타입)만 문자열로 만듭니다. 개인정보가 로그에 남지 않도록 값 자체는 기록하지 않습니다.
+#   (int, str, NoneType)            -> 위치 인자
+#   {'user_no': int}                -> 이름 인자
+#   500 x (str, str, int)           -> executemany
+def bind_shape(parameters, executemany: bool = False) -> str:
+    if executemany:
+        if not parameters:
+            return "0 x ()"
+        return f"{len(parameters)} x {bind_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        items = [f"{key!r}: {type(value).__name__}" for key, value in list(parameters.items())[:SLOW_QUERY_MAX_PARAMS]]
+        more = len(parameters) - len(items)
+        return "{" + ", ".join(items) + (f", ... +{more}" if more else "") + "}"
+    parameters = tuple(parameters or ())
+    items = [type(value).__name__ for value in parameters[:SLOW_QUERY_MAX_PARAMS]]
+    more = len(parameters) - len(items)
+    return "(" + ", ".join(items) + (f", ... +{more}" if more else "") + ")"
+
+
+# 엔진에 SQL 실행 시간과 커넥션 풀 사용량을 기록하는 이벤트 리스너를 등록합니다. (database.py에서 호출)
+def instrument_engine(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def end_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_start", time.perf_counter())
+        DB_QUERIES.inc()
+        DB_QUERY_SECONDS.observe(elapsed)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_seconds += elapsed
+
+        if elapsed * 1000 >= settings.slow_query_ms:
+            DB_SLOW_QUERIES.inc()
+            logger.warning(
+                "Slow query (%.1f ms): %s | params: %s",
+                elapsed * 1000, statement[:SLOW_QUERY_MAX_STATEMENT], bind_shape(parameters, executemany),
+            )
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+# 모든 지표를 Prometheus 텍스트 형식으로 만듭니다.
+# 스레드 풀 사용량은 이벤트로 추적하지 않고, 수집 시점의 값을 읽습니다. (이벤트 루프 안에서 호출해야 합니다)
+def render_metrics() -> str:
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_SIZE.set(limiter.total_tokens)
+
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
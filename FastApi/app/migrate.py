@@ -0,0 +1,191 @@
+# app/migrate.py
+# 데이터베이스 스키마를 현재 models.py 정의에 맞게 만들거나 갱신(마이그레이션)합니다.
+#
+# create_all()은 없는 테이블만 만들 뿐, 이미 있는 테이블에 새로 추가된 인덱스는 만들지 않습니다.
+# upgrade()는 테이블 생성 후 모델에 정의된 인덱스가 없으면 추가하고, 불필요한 인덱스를 정리하므로
+# 기존 DB(예: SQLITE3/db/myapp.db)에도 안전하게 여러 번 실행할 수 있습니다.
+#
+# 갱신이 끝나면 SQLite의 user_version(DB 파일 헤더에 저장되는 정수)에 SCHEMA_VERSION을 기록합니다.
+# 이후에는 PRAGMA user_version 한 번만 읽고, 값이 같으면 테이블/인덱스를 하나씩 확인하는 작업을 건너뜁니다.
+# 따라서 앱 시작(main.py의 lifespan)이나 워커 재시작 때마다 호출해도 비용이 거의 없습니다.
+# models.py의 테이블/인덱스를 바꾸면 SCHEMA_VERSION을 1 올려야 기존 DB에도 반영됩니다.
+#
+#   python -m app.migrate                                   # DATABASE_URL 환경 변수의 DB
+#   python -m app.migrate --database-url sqlite:///../SQLITE3/db/myapp.db
+#   python -m app.migrate --force                           # 버전이 같아도 다시 확인
+
+import argparse
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateColumn, CreateTable
+
+from . import models, search, stats
+
+# 다른 인덱스와 기능이 겹쳐 쓰기 비용만 늘리는 인덱스들입니다.
+#   posts_IDX, ix_posts_post_no: posts.post_no는 이미 rowid(기본 키)입니다.
+#   ix_users_user_no: users.user_no는 이미 rowid(기본 키)입니다.
+#   users_IDX: users.id는 UNIQUE 제약으로 이미 인덱스가 있습니다.
+# (이전 models.py로 만든 DB의 ix_users_id는 users.id의 유일성을 보장하는 유일한 인덱스이므로 지우지 않습니다.)
+REDUNDANT_INDEXES = ["posts_IDX", "ix_posts_post_no", "users_IDX", "ix_users_user_no"]
+
+
+# 현재 models.py의 스키마 버전입니다.
+#   1: 인덱스 정리, 게시물 전문 검색(posts_fts)
+#   2: 사용자별 게시물 통계(user_stats)
+#   3: 백그라운드 작업 상태(jobs)
+#   4: users/posts 기본 키의 AUTOINCREMENT
+#   5: ETag 계산용 버전 컬럼(posts.version, user_stats.posts_version)과 트리거
+SCHEMA_VERSION = 5
+
+# 기본 키에 AUTOINCREMENT가 있어야 하는 테이블입니다. (models.py의 sqlite_autoincrement 참고)
+# 부모 테이블(users)을 먼저 다시 만듭니다.
+AUTOINCREMENT_TABLES = ["users", "posts"]
+
+
+# DB에 기록된 스키마 버전을 반환합니다. 한 번도 upgrade()하지 않은 DB는 0입니다.
+def schema_version(conn) -> int:
+    return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+# 모델에 정의되어 있지만 기존 테이블에 없는 컬럼을 ALTER TABLE ADD COLUMN으로 추가합니다. 추가한 컬럼 수를 반환합니다.
+# 새 컬럼은 모두 NOT NULL에 상수 기본값(server_default)이 있으므로, 기존 행은 기본값으로 채워집니다.
+def add_missing_columns(conn) -> int:
+    added = 0
+    for table in models.Base.metadata.sorted_tables:
+        existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name})"))}
+        if not existing:
+            continue
+        for column in table.columns:
+            if column.name not in existing:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {CreateColumn(column).compile(dialect=conn.dialect)}"))
+                added += 1
+    return added
+
+
+# AUTOINCREMENT 없이 만들어진 테이블의 이름 목록을 반환합니다.
+# schema.sql로 만든 DB에는 이미 있지만, 이전 models.py의 create_all()로 만든 DB에는 없습니다.
+def missing_autoincrement(conn) -> list:
+    sql_by_name = dict(conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'table'")).all())
+    return [
+        name for name in AUTOINCREMENT_TABLES
+        if name in sql_by_name and "AUTOINCREMENT" not in sql_by_name[name].upper()
+    ]
+
+
+# 테이블에 AUTOINCREMENT를 추가합니다. SQLite의 ALTER TABLE은 기본 키를 바꿀 수 없으므로,
+# SQLite 문서의 절차대로 새 테이블을 만들어 행을 복사한 뒤 기존 테이블을 지우고 이름을 바꿉니다.
+#   - 기본 키 값을 그대로 복사하므로 posts_fts(rowid)와 user_stats, 클라이언트가 가진 번호가 바뀌지 않습니다.
+#   - 기존 테이블의 인덱스와 트리거는 테이블과 함께 지워지므로, sqlite_master에 저장된 정의로 다시 만듭니다.
+#   - 외래 키 검사는 트랜잭션 안에서 끌 수 없으므로, 트랜잭션을 직접(BEGIN/COMMIT) 관리하는 DB 연결에서 실행합니다.
+#     복사가 끝나면 PRAGMA foreign_key_check로 깨진 참조가 없는지 확인하고, 있으면 전체를 되돌립니다.
+def rebuild_with_autoincrement(engine, names: list) -> None:
+    raw = engine.raw_connection()
+    dbapi_connection = raw.driver_connection
+    isolation_level = dbapi_connection.isolation_level
+    dbapi_connection.isolation_level = None  # 드라이버가 트랜잭션을 자동으로 시작하지 않게 합니다.
+    try:
+        dbapi_connection.execute("PRAGMA foreign_keys = OFF")
+        dbapi_connection.execute("BEGIN IMMEDIATE")
+        try:
+            for name in names:
+                table = models.Base.metadata.tables[name]
+                saved = dbapi_connection.execute(
+                    "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+                    (name,),
+                ).fetchall()
+                create = str(CreateTable(table).compile(dialect=engine.dialect))
+                dbapi_connection.execute(create.replace(f"CREATE TABLE {name} ", f"CREATE TABLE {name}_new ", 1))
+                columns = ", ".join(column.name for column in table.columns)
+                dbapi_connection.execute(f"INSERT INTO {name}_new ({columns}) SELECT {columns} FROM {name}")
+                dbapi_connection.execute(f"DROP TABLE {name}")
+                dbapi_connection.execute(f"ALTER TABLE {name}_new RENAME TO {name}")
+                for (sql,) in saved:
+                    dbapi_connection.execute(sql)
+            if dbapi_connection.execute("PRAGMA foreign_key_check").fetchone() is not None:
+                raise RuntimeError("Foreign key check failed while adding AUTOINCREMENT")
+            dbapi_connection.execute("COMMIT")
+        except Exception:
+            dbapi_connection.execute("ROLLBACK")
+            raise
+    finally:
+        # database.py의 모든 프로필은 외래 키 검사를 켜므로, 풀에 돌려주기 전에 다시 켭니다.
+        dbapi_connection.execute("PRAGMA foreign_keys = ON")
+        dbapi_connection.isolation_level = isolation_level
+        raw.close()
+
+
+# 스키마를 최신으로 만듭니다. 이미 최신이라 건너뛰었으면 False를 반환합니다.
+# user_version은 SQLite에만 있으므로, 다른 DB는 항상 전체 확인을 실행합니다.
+def upgrade(engine, force: bool = False) -> bool:
+    is_sqlite = engine.dialect.name == "sqlite"
+    if is_sqlite and not force:
+        with engine.connect() as conn:
+            if schema_version(conn) >= SCHEMA_VERSION:
+                return False
+
+    # 없는 테이블을 만듭니다. (이미 있는 테이블은 그대로 둡니다)
+    models.Base.metadata.create_all(bind=engine)
+
+    # 이전 models.py로 만든 테이블에 새 컬럼을 추가합니다.
+    # 아래의 테이블 재생성은 모델의 컬럼을 그대로 복사하므로, 컬럼 추가가 먼저 끝나야 합니다.
+    if is_sqlite:
+        with engine.begin() as conn:
+            add_missing_columns(conn)
+
+    # 이전 models.py로 만든 users/posts 테이블에 AUTOINCREMENT를 추가합니다.
+    if is_sqlite:
+        with engine.connect() as conn:
+            names = missing_autoincrement(conn)
+        if names:
+            rebuild_with_autoincrement(engine, names)
+
+    with engine.begin() as conn:
+        # 모델에 정의되어 있지만 DB에 없는 인덱스를 만듭니다.
+        for table in models.Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+        for name in REDUNDANT_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+        # 전문 검색 색인(posts_fts)과 트리거는 posts 테이블의 after_create 이벤트로 만들어지는데,
+        # create_all()은 이미 있는 posts 테이블을 건너뛰므로 기존 DB에는 만들어지지 않습니다.
+        # 색인 테이블이 없으면 직접 만들고 기존 게시물로 색인을 채운 뒤에 스키마 버전을 기록합니다.
+        if is_sqlite and conn.execute(text(
+            "SELECT NOT EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts')"
+        )).scalar():
+            search.rebuild_index(conn)
+
+        # 통계 트리거는 CREATE TRIGGER IF NOT EXISTS이므로, 정의가 바뀐 기존 트리거는 지우고 다시 만듭니다.
+        if is_sqlite:
+            for name in models.USER_STATS_TRIGGERS:
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            for statement in models.USER_STATS_DDL:
+                conn.execute(text(statement))
+
+        # 게시물이 있는 기존 DB에 통계 테이블을 새로 만든 경우, 기존 게시물로 통계를 채웁니다.
+        if is_sqlite and conn.execute(text(
+            "SELECT NOT EXISTS (SELECT 1 FROM user_stats) AND EXISTS (SELECT 1 FROM posts)"
+        )).scalar():
+            stats.rebuild(conn)
+
+        # 새 인덱스를 쿼리 플래너가 잘 활용하도록 통계 정보를 갱신합니다.
+        if is_sqlite:
+            conn.execute(text("PRAGMA optimize"))
+            conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+    return True
+
+
+if __name__ == "__main__":
+    from .config import settings
+    from .database import create_db_engine
+
+    parser = argparse.ArgumentParser(description="데이터베이스 스키마 생성/갱신")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--force", action="store_true", help="스키마 버전이 같아도 테이블/인덱스를 다시 확인합니다")
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.database_url)
+    changed = upgrade(engine, force=args.force)
+    engine.dispose()
+    print(f"Database schema is up to date (version {SCHEMA_VERSION}{'' if changed else ', unchanged'})")
@@ -1,8 +1,8 @@
 # app/models.py
 # schema.sql의 테이블 구조를 파이썬 클래스로 정의합니다. 이 모델을 통해 ORM이 데이터베이스와 상호작용합니다.
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, Column, Index, Integer, String, Text, ForeignKey, DateTime, event, func, text
+from sqlalchemy.orm import query_expression, relationship
 from .database import Base
 
 
@@ -12,8 +12,12 @@ class User(Base):
     __tablename__ = "users"
 
     # 테이블의 컬럼(속성) 정의
-    user_no = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    id = Column(String, unique=True, nullable=False, index=True)
+    # 기본 키(INTEGER PRIMARY KEY)는 SQLite의 rowid 자체이므로 별도의 인덱스를 만들지 않습니다.
+    # AUTOINCREMENT(아래 __table_args__)를 지정하지 않으면 SQLite는 가장 큰 번호의 행이 삭제된 뒤 그 번호를 다시 사용하므로,
+    # 커서 페이지네이션(pagination.py)이 새 행을 건너뛰거나 같은 번호를 두 번 보게 될 수 있습니다.
+    user_no = Column(Integer, primary_key=True, autoincrement=True)
+    # UNIQUE 제약이 자동으로 인덱스를 만들므로 index=True를 따로 지정하지 않습니다.
+    id = Column(String, unique=True, nullable=False)
     email = Column(String, unique=True, nullable=False)
     phone_number = Column(String, unique=True, nullable=True)
     user_sex = Column(String, default='M')
@@ -24,7 +28,27 @@ class User(Base):
     # 다른 테이블과의 관계(Relationship) 설정
     # 'Post' 모델과의 관계를 정의합니다. 한 명의 사용자는 여러 개의 게시물(posts)을 가질 수 있습니다.
     # back_populates="owner"는 Post 모델의 'owner' 속성과 상호 연결되어 양방향 관계를 형성합니다.
-    posts = relationship("Post", back_populates="owner")
+    # passive_deletes=True는 사용자를 삭제할 때 게시물을 메모리로 불러오지 않고 DB의 ON DELETE CASCADE에 맡기는 설정입니다.
+    posts = relationship("Post", back_populates="owner", cascade="all, delete", passive_deletes=True)
+    # 게시물 통계(user_stats)는 트리거가 관리하므로 읽기 전용(viewonly) 관계로 정의합니다.
+    stats = relationship("UserStats", uselist=False, viewonly=True)
+
+    # 게시물이 한 번도 없었던 사용자는 통계 행이 없으므로 0/None으로 봅니다.
+    @property
+    def post_count(self) -> int:
+        return self.stats.post_count if self.stats is not None else 0
+
+    @property
+    def last_post_at(self):
+        return self.stats.last_post_at if self.stats is not None else None
+
+    @property
+    def posts_version(self) -> int:
+        return self.stats.posts_version if self.stats is not None else 0
+
+    # sqlite_autoincrement: CREATE TABLE에 AUTOINCREMENT를 붙여, 한 번 사용한 user_no를 다시 사용하지 않게 합니다.
+    # (schema.sql과 같은 정의이며, 이 설정 없이 만들어진 기존 DB는 migrate.py가 테이블을 다시 만듭니다)
+    __table_args__ = {"sqlite_autoincrement": True}
 
 
 # 'posts' 테이블에 매핑되는 Post 클래스
@@ -33,14 +57,161 @@ class Post(Base):
     __tablename__ = "posts"
 
     # 테이블의 컬럼(속성) 정의
-    post_no = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    post_no = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     reg_date = Column(DateTime, nullable=False, default=func.now())
     # 외래 키(Foreign Key) 설정. 'users' 테이블의 'user_no' 컬럼을 참조합니다.
     # ondelete="CASCADE"는 연결된 User가 삭제될 때, 해당 User가 작성한 Post도 함께 삭제되도록 하는 설정입니다.
     user_no = Column(Integer, ForeignKey("users.user_no", ondelete="CASCADE"), nullable=False)
+    # 게시물이 수정될 때마다 트리거(posts_version_au)가 1씩 올리는 버전 번호입니다.
+    # 조회 API는 본문 대신 (post_no, version)으로 ETag를 만들어, 조건부 요청에 본문을 읽지 않고 304를 응답합니다. (responses.py 참고)
+    version = Column(Integer, nullable=False, server_default=text("1"))
+
+    # 목록 조회의 content_preview 모드에서 본문 대신 읽는 본문 앞부분입니다. (preview.py 참고)
+    # 테이블의 컬럼이 아니며, 쿼리에서 with_expression으로 지정했을 때만 값이 채워집니다.
+    content_preview = query_expression()
 
     # 'User' 모델과의 관계를 정의합니다. 하나의 게시물은 한 명의 소유자(owner)를 가집니다.
     # back_populates="posts"는 User 모델의 'posts' 속성과 상호 연결됩니다.
     owner = relationship("User", back_populates="posts")
+
+    # 인덱스 정의
+    # (user_no, post_no): 특정 사용자의 게시물 조회(User.posts, GET /users/{user_no}/posts)와
+    #   사용자 삭제 시 ON DELETE CASCADE가 posts 전체를 훑지 않고 해당 사용자의 게시물만 찾게 합니다.
+    #   post_no가 함께 들어 있어 "ORDER BY post_no" 정렬과 커서 조건(post_no > ?)도 인덱스로 처리됩니다.
+    # reg_date: 작성일 기간 조회에 사용합니다.
+    # sqlite_autoincrement: users와 같이 한 번 사용한 post_no를 다시 사용하지 않게 합니다.
+    __table_args__ = (
+        Index("ix_posts_user_no_post_no", "user_no", "post_no"),
+        Index("ix_posts_reg_date", "reg_date"),
+        {"sqlite_autoincrement": True},
+    )
+
+
+# --- 게시물 전문 검색(Full-Text Search) 인덱스 ---
+# SQLite FTS5 가상 테이블(posts_fts)에 게시물의 제목과 내용을 색인합니다.
+# content='posts' 옵션(external content)을 사용하여 본문을 중복 저장하지 않고 posts 테이블을 참조하며,
+# posts 테이블에 INSERT/UPDATE/DELETE가 일어날 때 트리거가 색인을 자동으로 갱신합니다.
+# 이미 만들어진 DB에 색인을 추가하거나 다시 만들려면 app/search.py의 reindex 명령을 사용합니다.
+POSTS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts
+    USING fts5(title, content, content='posts', content_rowid='post_no')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, title, content) VALUES (new.post_no, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.post_no, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.post_no, old.title, old.content);
+        INSERT INTO posts_fts(rowid, title, content) VALUES (new.post_no, new.title, new.content);
+    END
+    """,
+]
+
+# create_all()로 posts 테이블이 만들어진 직후 FTS 테이블과 트리거를 함께 만듭니다. (SQLite에서만 실행)
+for statement in POSTS_FTS_DDL:
+    event.listen(Post.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+# drop_all()로 posts 테이블을 삭제할 때 색인도 함께 삭제합니다. (트리거는 테이블과 함께 삭제됩니다)
+event.listen(
+    Post.__table__, "before_drop", DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect="sqlite")
+)
+
+
+# 'user_stats' 테이블에 매핑되는 UserStats 클래스
+# 사용자별 게시물 수와 마지막 게시물의 작성일을 미리 계산해 둔 테이블입니다.
+# 게시물 수를 알기 위해 posts 테이블을 세지(count) 않고 기본 키로 한 행만 읽으면 되므로, 게시물 수와 관계없이 비용이 일정합니다.
+# 값은 아래 USER_STATS_DDL의 트리거가 posts 테이블의 INSERT/DELETE마다 갱신합니다.
+# 값이 어긋난 경우(트리거 없이 DB를 직접 수정한 경우 등) app/stats.py의 rebuild 명령으로 다시 계산합니다.
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_no = Column(Integer, ForeignKey("users.user_no", ondelete="CASCADE"), primary_key=True)
+    post_count = Column(Integer, nullable=False, default=0)
+    # 가장 최근 게시물(post_no가 가장 큰 게시물)의 작성일입니다. 게시물이 없으면 NULL입니다.
+    last_post_at = Column(DateTime, nullable=True)
+    # 사용자의 게시물이 추가/수정/삭제될 때마다 1씩 올라가는 번호입니다.
+    # 사용자 조회 API는 게시물 목록을 읽지 않고 사용자 행과 이 값으로 ETag를 만듭니다.
+    posts_version = Column(Integer, nullable=False, server_default=text("0"))
+
+
+# --- 사용자별 게시물 통계 트리거 ---
+# 게시물이 추가되면 게시물 수를 1 늘리고, 새 게시물의 작성일을 마지막 작성일로 기록합니다. (통계 행이 없으면 만듭니다)
+# 게시물이 삭제되면 게시물 수를 1 줄이고, 남은 게시물 중 가장 최근 게시물의 작성일을
+# (user_no, post_no) 인덱스로 한 행만 찾아 다시 기록합니다.
+# 사용자 삭제 시 ON DELETE CASCADE로 지워지는 게시물에도 트리거가 실행되며, 통계 행도 함께 삭제됩니다.
+# 게시물이 추가/삭제/수정될 때마다 posts_version을 1 올리고, 수정된 게시물의 version도 1 올립니다. (posts_version_au)
+USER_STATS_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS user_stats_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO user_stats(user_no, post_count, last_post_at, posts_version) VALUES (new.user_no, 1, new.reg_date, 1)
+        ON CONFLICT(user_no) DO UPDATE SET
+            post_count = post_count + 1, last_post_at = excluded.last_post_at, posts_version = posts_version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS user_stats_ad AFTER DELETE ON posts BEGIN
+        UPDATE user_stats SET
+            post_count = post_count - 1,
+            last_post_at = (SELECT reg_date FROM posts WHERE user_no = old.user_no ORDER BY post_no DESC LIMIT 1),
+            posts_version = posts_version + 1
+        WHERE user_no = old.user_no;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS user_stats_au AFTER UPDATE OF user_no ON posts BEGIN
+        UPDATE user_stats SET
+            post_count = post_count - 1,
+            last_post_at = (SELECT reg_date FROM posts WHERE user_no = old.user_no ORDER BY post_no DESC LIMIT 1),
+            posts_version = posts_version + 1
+        WHERE user_no = old.user_no;
+        INSERT INTO user_stats(user_no, post_count, last_post_at, posts_version)
+        VALUES (new.user_no, 1, (SELECT reg_date FROM posts WHERE user_no = new.user_no ORDER BY post_no DESC LIMIT 1), 1)
+        ON CONFLICT(user_no) DO UPDATE SET
+            post_count = post_count + 1, last_post_at = excluded.last_post_at, posts_version = posts_version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_version_au AFTER UPDATE OF title, content, reg_date, user_no ON posts BEGIN
+        UPDATE posts SET version = old.version + 1 WHERE post_no = new.post_no;
+        UPDATE user_stats SET posts_version = posts_version + 1 WHERE user_no = new.user_no;
+    END
+    """,
+]
+
+# USER_STATS_DDL이 만드는 트리거의 이름입니다. 정의가 바뀌면 migrate.py가 지우고 다시 만듭니다.
+USER_STATS_TRIGGERS = ["user_stats_ai", "user_stats_ad", "user_stats_au", "posts_version_au"]
+
+# 트리거는 posts와 user_stats 테이블이 모두 있어야 하므로, create_all()이 모든 테이블을 만든 뒤에 만듭니다.
+# (IF NOT EXISTS이므로 기존 DB에 migrate.upgrade()를 실행할 때도 빠진 트리거만 추가됩니다)
+for statement in USER_STATS_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+
+# 'jobs' 테이블에 매핑되는 Job 클래스
+# 백그라운드 작업(예: 게시물이 매우 많은 사용자 삭제)의 상태입니다. (jobs.py 참고)
+# 프로세스 메모리가 아닌 DB에 저장하므로, 작업을 만든 워커와 다른 워커에서도 조회할 수 있고 서버를 재시작해도 남습니다.
+class Job(Base):
+    __tablename__ = "jobs"
+
+    job_id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)
+    # pending, running, done, failed 중 하나입니다.
+    status = Column(String, nullable=False, default="pending")
+    detail = Column(Text, nullable=True)
+    # 작업 대상 사용자입니다. 삭제 작업이 끝나면 사용자가 없어지므로 외래 키를 걸지 않습니다.
+    user_no = Column(Integer, nullable=True)
+    deleted_posts = Column(Integer, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=func.now())
+
+    # 오래된 작업을 정리할 때 작성 시각 순으로 찾기 위한 인덱스입니다.
+    __table_args__ = (Index("ix_jobs_created_at", "created_at"),)
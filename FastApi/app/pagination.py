@@ -0,0 +1,94 @@
+# app/pagination.py
+# 커서(keyset) 기반 페이지네이션을 위한 공통 함수들을 정의합니다.
+#
+# offset(skip) 방식은 SQLite가 skip 개수만큼의 행을 읽고 버려야 하므로 뒤쪽 페이지일수록 느려집니다.
+# 커서 방식은 "마지막으로 받은 기본 키보다 큰 행"부터 조회(WHERE key > :last ORDER BY key)하므로
+# 기본 키 인덱스를 바로 탐색하여 몇 번째 페이지이든 비용이 같습니다.
+# 기본 키(user_no, post_no)는 AUTOINCREMENT로 항상 증가하고 삭제된 번호를 다시 사용하지 않으므로(models.py 참고),
+# 조회 중에 새 행이 추가되어도 이미 지나간 페이지의 순서가 바뀌지 않고 새 행은 항상 마지막 페이지 뒤에 붙습니다.
+
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+from .responses import etag_matches
+
+# 다음 페이지 커서를 전달하는 응답 헤더 이름입니다.
+# 응답 본문(JSON 배열)의 형식을 바꾸지 않기 위해 헤더로 전달합니다.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# 목록 조회 API가 한 페이지에 반환할 수 있는 최대 행 수입니다. (limit 파라미터의 상한)
+MAX_PAGE_SIZE = 1000
+
+
+# 마지막 행의 기본 키를 클라이언트가 해석할 필요 없는 불투명(opaque) 문자열로 인코딩합니다.
+def encode_cursor(key: int) -> str:
+    raw = json.dumps({"k": key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# 커서 문자열을 기본 키로 복원합니다. 빈 문자열은 첫 페이지를 의미합니다.
+# 잘못된 커서는 400 Bad Request 에러로 처리합니다.
+def decode_cursor(cursor: str) -> Optional[int]:
+    if cursor == "":
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))["k"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(key, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+# 쿼리에 커서 조건을 적용하여 한 페이지를 조회하고, (행 목록, 다음 커서)를 반환합니다.
+# limit + 1개를 조회하여 다음 페이지가 있는지 확인하고, 마지막 페이지이면 다음 커서는 None입니다.
+def keyset_page(query, key_column, cursor: str, limit: int):
+    last_key = decode_cursor(cursor)
+    if last_key is not None:
+        query = query.filter(key_column > last_key)
+    rows = query.order_by(key_column).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if rows:
+            next_cursor = encode_cursor(getattr(rows[-1], key_column.key))
+    return rows, next_cursor
+
+
+# skip 방식 또는 커서 방식(cursor가 None이 아니면)으로 한 페이지를 조회하고, (행 목록, 응답 헤더)를 반환합니다.
+# 커서 방식이면 다음 페이지 커서를 X-Next-Cursor 응답 헤더에 넣습니다.
+def fetch_page(query, key_column, skip: int, cursor: Optional[str], limit: int):
+    headers = {}
+    if cursor is not None:
+        rows, next_cursor = keyset_page(query, key_column, cursor, limit)
+        if next_cursor is not None:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+    else:
+        # offset(skip).limit(limit)를 사용하여 페이지네이션(pagination)을 구현합니다.
+        rows = query.order_by(key_column).offset(skip).limit(limit).all()
+    return rows, headers
+
+
+# 목록 조회 API의 한 페이지를 조회하고, (행 목록, 응답 헤더, ETag)를 반환합니다.
+# ETag는 본문 대신 etag_of(행 목록)로 계산합니다. (versions.py 참고)
+# If-None-Match가 있으면 먼저 version_query(기본 키와 버전 컬럼만 읽는 쿼리)로 같은 페이지를 조회하여 ETag를 비교합니다.
+#   - 일치하면 전체 행을 읽지 않고 버전 조회 결과를 그대로 반환합니다. (호출한 쪽은 본문 없이 304를 응답합니다)
+#   - 다르면 그 기본 키들의 전체 행만 다시 조회하고, ETag도 실제로 읽은 행으로 다시 계산하여
+#     두 조회 사이에 행이 수정되어도 본문과 ETag가 어긋나지 않게 합니다.
+def read_page(request: Request, query, version_query, key_column, skip: int, cursor: Optional[str], limit: int, etag_of):
+    if not request.headers.get("if-none-match"):
+        rows, headers = fetch_page(query, key_column, skip, cursor, limit)
+        return rows, headers, etag_of(rows)
+
+    versions, headers = fetch_page(version_query, key_column, skip, cursor, limit)
+    etag = etag_of(versions)
+    if not versions or etag_matches(request, etag):
+        return versions, headers, etag
+    keys = [getattr(row, key_column.key) for row in versions]
+    rows = query.filter(key_column.in_(keys)).order_by(key_column).all()
+    return rows, headers, etag_of(rows)
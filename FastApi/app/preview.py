@@ -0,0 +1,24 @@
+# app/preview.py
+# 목록 조회 API의 content_preview 파라미터를 처리하는 함수입니다.
+#
+# 목록 화면에는 게시물 본문 전체가 필요 없는 경우가 많지만, 기본 응답은 모든 게시물의 본문 전체를 포함합니다.
+# content_preview=N을 보내면 본문 컬럼(content)은 조회하지 않고(defer), SQL의 substr(content, 1, N)으로
+# 본문 앞 N글자만 조회하여 응답의 content에 담습니다. (schemas.PostPreview 참고)
+# 긴 본문을 파이썬 문자열로 가져오거나, Pydantic/JSON으로 변환하고 전송하는 비용이 N글자만큼으로 줄어듭니다.
+# SQLite의 substr은 TEXT를 바이트가 아닌 글자 단위로 자르므로, 한글처럼 여러 바이트인 문자도 중간에 잘리지 않습니다.
+
+from sqlalchemy import func
+from sqlalchemy.orm import defer, with_expression
+
+from . import models
+
+CONTENT_PREVIEW_DESCRIPTION = "게시물 본문(content)을 앞에서부터 이 글자 수만큼만 반환합니다. 생략하면 본문 전체를 반환합니다."
+
+
+# 게시물 조회 쿼리에 적용할 로더 옵션입니다. 본문 대신 본문 앞 length글자를 content_preview 속성으로 읽습니다.
+# query.options(*content_preview_options(100)) 또는 selectinload(...).options(*content_preview_options(100))로 사용합니다.
+def content_preview_options(length: int) -> tuple:
+    return (
+        defer(models.Post.content),
+        with_expression(models.Post.content_preview, func.substr(models.Post.content, 1, length)),
+    )
@@ -0,0 +1,146 @@
+# app/responses.py
+# 조회 API의 JSON 응답을 만들고, ETag를 이용한 조건부 요청(If-None-Match)을 처리하는 함수들입니다.
+#
+# 응답의 ETag 헤더를 받은 클라이언트는 다음 요청에 If-None-Match 헤더로 그 값을 돌려보냅니다.
+# 내용이 바뀌지 않았다면 서버는 본문 없이 304 Not Modified만 응답하여 전송량을 줄입니다.
+# 사용자/게시물 조회 API의 ETag는 본문의 해시가 아니라 행의 버전 정보로 계산하므로(versions.py 참고),
+# 게시물 목록을 읽거나 JSON으로 변환하기 전에 ETag를 비교하여 304를 응답할 수 있습니다.
+# 단건 조회는 캐시(cache.py)에 ETag와 JSON을 함께 저장하므로, 캐시 적중 시에는 DB 조회 없이 응답합니다.
+#
+# JSON 변환 방식은 설정(JSON_RENDERER)으로 선택합니다.
+#   - pydantic: ORM 객체를 Pydantic 모델로 검증한 뒤 JSON으로 변환 (기본값)
+#   - orjson:   Pydantic 모델을 만들지 않고 ORM 객체의 속성을 바로 읽어 orjson으로 변환 (빠른 경로)
+# DB에서 읽은 데이터는 이미 스키마를 만족하므로, 빠른 경로는 검증을 생략하고 응답 모델의 필드만 골라 변환합니다.
+# orjson 패키지가 없으면 빠른 경로도 표준 json 모듈을 사용합니다.
+
+import datetime
+import functools
+import hashlib
+import json
+import typing
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from .config import settings
+
+try:
+    import orjson
+except ImportError:  # orjson은 선택 패키지입니다.
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+# orjson이 없을 때 날짜를 Pydantic과 같은 ISO 8601 형식의 문자열로 바꿉니다.
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# 파이썬 객체(dict, list)를 JSON 바이트로 변환합니다. Pydantic과 같이 공백 없는 형식으로 만듭니다.
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+# orjson으로 JSON을 만드는 응답 클래스입니다.
+# JSON_RENDERER=orjson이면 FastAPI 앱의 기본 응답 클래스로 사용합니다. (main.py 참고)
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# 응답 모델의 필드 목록을 (필드 이름, 읽을 속성 이름, 중첩 모델) 형태로 만들어 둡니다.
+# 읽을 속성 이름은 보통 필드 이름과 같고, validation_alias가 있으면 그 이름입니다. (schemas.PostPreview 참고)
+# 중첩 모델은 List[schemas.Post]처럼 다른 응답 모델의 목록인 필드에만 지정되고, 나머지는 None입니다.
+@functools.lru_cache(maxsize=None)
+def _field_plan(model) -> tuple:
+    plan = []
+    for name, field in model.model_fields.items():
+        nested = None
+        args = typing.get_args(field.annotation)
+        if typing.get_origin(field.annotation) is list and args and issubclass(args[0], BaseModel):
+            nested = args[0]
+        attribute = field.validation_alias if isinstance(field.validation_alias, str) else name
+        plan.append((name, attribute, nested))
+    return tuple(plan)
+
+
+# ORM 객체에서 응답 모델의 필드만 읽어 dict로 만듭니다. (Pydantic 모델을 만들지 않음)
+def _to_dict(model, obj) -> dict:
+    data = {}
+    for name, attribute, nested in _field_plan(model):
+        value = getattr(obj, attribute)
+        if nested is not None:
+            value = [_to_dict(nested, item) for item in value]
+        data[name] = value
+    return data
+
+
+# ORM 객체 하나를 응답 모델(model)의 형식에 맞는 JSON 바이트로 만듭니다.
+def render_json(model, obj) -> bytes:
+    if settings.json_renderer == "orjson":
+        return dumps(_to_dict(model, obj))
+    return model.model_validate(obj).model_dump_json().encode()
+
+
+# ORM 객체 목록을 JSON 배열 바이트로 만듭니다.
+def render_json_list(model, objs) -> bytes:
+    if settings.json_renderer == "orjson":
+        return dumps([_to_dict(model, obj) for obj in objs])
+    return b"[" + b",".join(render_json(model, obj) for obj in objs) + b"]"
+
+
+# 응답 본문으로 강한(strong) ETag를 만듭니다. 본문이 1바이트라도 다르면 값이 달라집니다.
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+# 행의 버전 정보(기본 키, 버전 번호 등 JSON으로 변환할 수 있는 값)로 ETag를 만듭니다.
+# 같은 값이면 같은 ETag가 되므로, 버전 정보가 같은 응답은 본문도 같아야 합니다.
+def version_etag(*values) -> str:
+    return make_etag(dumps(values))
+
+
+# 요청의 If-None-Match 헤더에 현재 ETag가 포함되어 있는지 확인합니다.
+# 헤더에는 여러 ETag가 쉼표로 구분되어 올 수 있고, "*"는 모든 ETag와 일치합니다.
+# If-None-Match는 약한 비교를 사용하므로 W/ 접두사는 무시합니다.
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+# 본문 없는 304 Not Modified 응답을 만듭니다.
+def not_modified(etag: str, headers: dict = None) -> Response:
+    return Response(status_code=304, headers={**(headers or {}), "ETag": etag})
+
+
+# JSON 본문으로 ETag를 붙인 응답을 만듭니다. 클라이언트의 ETag와 같으면 본문 없이 304를 반환합니다.
+# etag를 지정하지 않으면 본문의 해시로 계산합니다.
+def json_response(request: Request, body: bytes, headers: dict = None, etag: str = None) -> Response:
+    etag = etag or make_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag, headers)
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers={**(headers or {}), "ETag": etag})
+
+
+# 캐시에는 ETag와 JSON 본문을 한 값으로 저장합니다. ('"ETag"\n본문')
+# ETag는 큰따옴표로 시작하고 줄바꿈을 포함하지 않으므로 첫 줄바꿈에서 나눌 수 있습니다.
+def pack_cache_entry(etag: str, body: bytes) -> bytes:
+    return etag.encode() + b"\n" + body
+
+
+# 캐시 값을 (ETag, 본문)으로 나눕니다.
+# ETag 없이 본문만 저장하던 이전 버전의 값(JSON 객체이므로 "{"로 시작)은 본문의 해시로 ETag를 계산합니다.
+def unpack_cache_entry(entry: bytes) -> tuple:
+    if not entry.startswith(b'"'):
+        return make_etag(entry), entry
+    etag, _, body = entry.partition(b"\n")
+    return etag.decode(), body
@@ -0,0 +1,127 @@
+# app/routers/async_routes.py
+# 자주 호출되는 API의 비동기(async) 버전입니다. ASYNC_DB=1이면 main.py가 users/posts 라우터보다 먼저 등록합니다.
+#
+# 동기(def) API 함수는 요청마다 스레드 풀(기본 40개)의 스레드 하나를 차지하고, DB 응답을 기다리는 동안에도 놓지 않으므로
+# 동시 요청이 스레드 수보다 많으면 CPU가 한가해도 대기열에서 기다립니다.
+# 여기의 함수들은 이벤트 루프에서 실행되고 비동기 세션(AsyncSession)으로 DB 결과를 기다리므로 스레드를 차지하지 않습니다.
+# (aiosqlite는 DB 연결마다 전용 스레드에서 sqlite3를 실행하므로, 커넥션 풀 크기만큼의 쿼리가 동시에 실행됩니다)
+#
+# 응답 형식, ETag, 캐시 동작은 users/posts 라우터의 같은 API와 같습니다.
+# 같은 경로는 먼저 등록한 라우트가 처리하므로 나머지 API는 기존 동기 함수가 그대로 처리하며,
+# 경로 변수에 :int를 붙여 /users/export 같은 경로는 숫자가 아니므로 기존 라우트로 넘어가게 합니다.
+# API 문서에는 기존 라우트가 이미 표시되므로 여기의 라우트는 문서에서 뺍니다.
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from starlette.concurrency import run_in_threadpool
+
+from .. import models, schemas
+from ..batching import get_post_batcher
+from ..cache import get_cache, post_key, user_key
+from ..config import settings
+from ..database import get_async_db, get_async_read_db
+from ..responses import (
+    etag_matches, json_response, not_modified, pack_cache_entry, render_json, unpack_cache_entry, version_etag,
+)
+from ..versions import post_version, user_version
+
+router = APIRouter(include_in_schema=False)
+
+# SQLite는 한 번에 하나의 연결만 쓸 수 있고, 쓰기 잠금을 기다리는 연결은 busy_timeout 동안 잠금을 반복해서 확인(polling)합니다.
+# 비동기 API는 스레드 수 제한 없이 많은 쓰기 요청을 동시에 DB로 보내므로, 확인 순서가 공정하지 않은 잠금 경쟁에서
+# 일부 요청이 busy_timeout을 넘겨 "database is locked"로 실패할 수 있습니다.
+# 프로세스 안의 쓰기 요청은 이 잠금에서 도착 순서대로 기다리게 합니다. (기다리는 동안 스레드를 차지하지 않습니다)
+_write_lock = asyncio.Lock()
+
+
+# 캐시 메서드를 호출합니다. 네트워크로 기다리는 캐시(Redis)는 이벤트 루프를 막지 않도록 스레드 풀에서 호출합니다.
+async def _cache_call(cache, method: str, *args, **kwargs):
+    function = getattr(cache, method)
+    if cache.blocking:
+        return await run_in_threadpool(function, *args, **kwargs)
+    return function(*args, **kwargs)
+
+
+# GET /users/{user_no} (users.read_user의 비동기 버전)
+@router.get("/users/{user_no:int}", response_model=schemas.User)
+async def read_user(
+    user_no: int, request: Request, db: AsyncSession = Depends(get_async_read_db), cache=Depends(get_cache)
+):
+    entry = await _cache_call(cache, "get", user_key(user_no))
+    if entry is not None:
+        etag, body = unpack_cache_entry(entry)
+        return json_response(request, body, etag=etag)
+
+    generation = await _cache_call(cache, "generation", user_key(user_no))
+    db_user = await db.scalar(
+        select(models.User).options(joinedload(models.User.stats)).where(models.User.user_no == user_no)
+    )
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    etag = version_etag("User", user_version(db_user, with_posts=True))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    # 비동기 세션은 관계를 지연 로딩(lazy load)할 수 없으므로, 본문을 만들기 전에 게시물 목록을 불러옵니다.
+    await db.refresh(db_user, ["posts"])
+    body = render_json(schemas.User, db_user)
+    await _cache_call(cache, "set", user_key(user_no), pack_cache_entry(etag, body), generation=generation)
+    return json_response(request, body, etag=etag)
+
+
+# GET /posts/{post_no} (posts.read_post의 비동기 버전)
+@router.get("/posts/{post_no:int}", response_model=schemas.Post)
+async def read_post(
+    post_no: int, request: Request, db: AsyncSession = Depends(get_async_read_db), cache=Depends(get_cache)
+):
+    entry = await _cache_call(cache, "get", post_key(post_no))
+    if entry is not None:
+        etag, body = unpack_cache_entry(entry)
+        return json_response(request, body, etag=etag)
+
+    generation = await _cache_call(cache, "generation", post_key(post_no))
+    db_post = await db.scalar(select(models.Post).where(models.Post.post_no == post_no))
+    if db_post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    etag = version_etag("Post", post_version(db_post))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    body = render_json(schemas.Post, db_post)
+    await _cache_call(cache, "set", post_key(post_no), pack_cache_entry(etag, body), generation=generation)
+    return json_response(request, body, etag=etag)
+
+
+# POST /posts/ (posts.create_post의 비동기 버전)
+# 그룹 커밋 모드에서는 저장 결과를 스레드에서 기다리지 않고 이벤트 루프에서 기다립니다.
+@router.post("/posts/", response_model=schemas.Post)
+async def create_post(
+    post: schemas.PostCreate,
+    db: AsyncSession = Depends(get_async_db),
+    cache=Depends(get_cache),
+    batcher=Depends(get_post_batcher),
+):
+    if batcher is not None:
+        future = batcher.submit(post)
+        try:
+            # 시간이 초과되어도 큐에 들어간 게시물은 저장되므로, 결과(future)를 취소하지 않도록 shield로 감쌉니다.
+            created = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), settings.post_batch_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Write queue timed out", headers={"Retry-After": "1"})
+        await _cache_call(cache, "delete", user_key(post.user_no))
+        return created
+
+    owner = await db.scalar(select(models.User.user_no).where(models.User.user_no == post.user_no))
+    if owner is None:
+        raise HTTPException(status_code=404, detail="Owner User not found")
+
+    db_post = models.Post(**post.model_dump())
+    db.add(db_post)
+    async with _write_lock:
+        await db.commit()
+    await db.refresh(db_post)
+    # 사용자 조회 응답에는 게시물 목록이 포함되므로, 소유자의 캐시 항목을 지웁니다.
+    await _cache_call(cache, "delete", user_key(post.user_no))
+    return db_post
@@ -2,12 +2,30 @@
 # Post API 라우터
 # 게시물 생성 및 관리를 위한 API 엔드포인트입니다.
 
-from fastapi import APIRouter, Depends, HTTPException
+import concurrent.futures
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
 from .. import models, schemas
-from ..database import get_db
+from ..batching import get_post_batcher
+from ..bulk import chunked, insert_returning_in_order, read_bulk_items, validate_items
+from ..cache import get_cache, post_key, user_key
+from ..config import settings
+from ..database import get_db, get_read_db
+from ..export import export_response
+from ..pagination import MAX_PAGE_SIZE, read_page
+from ..preview import CONTENT_PREVIEW_DESCRIPTION, content_preview_options
+from ..responses import (
+    etag_matches, json_response, not_modified, pack_cache_entry, render_json, render_json_list, unpack_cache_entry,
+    version_etag,
+)
+from ..search import search_posts
+from ..versions import POST_VERSION_COLUMNS, post_version, posts_etag
 
 # APIRouter 인스턴스를 생성합니다.
 # prefix="/posts": 이 라우터의 모든 경로는 "/posts"로 시작합니다. (예: /posts/, /posts/1)
@@ -19,8 +37,24 @@ router = APIRouter(
 
 # 게시물 생성 API 엔드포인트
 # POST /posts/
+# 그룹 커밋 모드(POST_WRITE_BATCHING=1)에서는 다른 요청들과 함께 한 트랜잭션으로 저장됩니다. (batching.py 참고)
 @router.post("/", response_model=schemas.Post)
-def create_post(post: schemas.PostCreate, db: Session = Depends(get_db)):
+def create_post(
+    post: schemas.PostCreate,
+    db: Session = Depends(get_db),
+    cache=Depends(get_cache),
+    batcher=Depends(get_post_batcher),
+):
+    if batcher is not None:
+        # 큐에 넣고 저장 결과를 기다립니다. 소유자가 없으면 404 에러가 그대로 전달됩니다.
+        future = batcher.submit(post)
+        try:
+            created = future.result(timeout=settings.post_batch_timeout)
+        except concurrent.futures.TimeoutError:
+            raise HTTPException(status_code=503, detail="Write queue timed out", headers={"Retry-After": "1"})
+        cache.delete(user_key(post.user_no))
+        return created
+
     # 게시물을 생성하기 전에, 게시물의 소유자(owner)가 될 사용자가 DB에 실제로 존재하는지 확인합니다.
     db_user = db.query(models.User).filter(models.User.user_no == post.user_no).first()
     if db_user is None:
@@ -28,52 +62,194 @@ def create_post(post: schemas.PostCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Owner User not found")
 
     # schemas.PostCreate(Pydantic 모델)를 models.Post(SQLAlchemy 모델)로 변환하여 DB에 저장할 객체를 만듭니다.
-    db_post = models.Post(**post.dict())
+    db_post = models.Post(**post.model_dump())
     db.add(db_post)  # DB 세션에 새 게시물 객체를 추가합니다. (아직 DB에 저장된 것은 아님)
     db.commit()     # 세션의 변경사항(새 게시물 추가)을 DB에 최종 반영(저장)합니다.
     db.refresh(db_post)  # DB에 저장된 후의 최신 정보(예: 자동 생성된 post_no, reg_date)를 객체에 다시 로드합니다.
+    # 사용자 조회 응답에는 게시물 목록이 포함되므로, 소유자의 캐시 항목을 지웁니다.
+    cache.delete(user_key(post.user_no))
     return db_post
 
+# 게시물 대량 생성 API 엔드포인트
+# POST /posts/bulk
+# JSON 배열 또는 NDJSON으로 여러 게시물을 받아 하나의 트랜잭션으로 저장하고, 항목별 결과를 반환합니다.
+# 단건 API를 여러 번 호출하면 게시물마다 소유자 조회, INSERT, COMMIT(fsync), refresh 조회가 반복되지만,
+# 여기서는 소유자 확인 IN 조회 + 여러 행 INSERT + COMMIT 한 번으로 처리합니다.
+@router.post("/bulk", response_model=List[schemas.PostBulkResult])
+def create_posts_bulk(
+    items: list = Depends(read_bulk_items), db: Session = Depends(get_db), cache=Depends(get_cache)
+):
+    valid, errors = validate_items(items, schemas.PostCreate)
+
+    # 요청에 등장한 모든 소유자(user_no)가 존재하는지 IN 조회로 한 번에 확인합니다.
+    owner_nos = list({post.user_no for _, post in valid})
+    existing_owners = set()
+    for chunk in chunked(owner_nos):
+        existing_owners.update(
+            user_no for (user_no,) in db.query(models.User.user_no).filter(models.User.user_no.in_(chunk))
+        )
+
+    to_insert = []
+    for index, post in valid:
+        if post.user_no in existing_owners:
+            to_insert.append((index, post))
+        else:
+            errors[index] = "Owner User not found"
+
+    # 여러 행 INSERT ... RETURNING(최대 1000행씩 한 문장)으로 저장하고, 요청 순서대로 생성된 post_no를 돌려받습니다.
+    post_nos = []
+    if to_insert:
+        try:
+            rows = insert_returning_in_order(db, models.Post.post_no, [post.model_dump() for _, post in to_insert])
+            post_nos = [row.post_no for row in rows]
+            db.commit()  # 모든 게시물을 한 번의 커밋으로 저장합니다.
+        except IntegrityError as exc:
+            # 소유자 확인 이후 다른 요청이 소유자를 삭제한 경우입니다(외래 키 위반). 전체를 취소하고 재시도를 요청합니다.
+            db.rollback()
+            if "FOREIGN KEY" not in str(exc.orig):
+                raise
+            raise HTTPException(status_code=409, detail="Owner User deleted concurrently, please retry")
+        cache.delete(*{user_key(post.user_no) for _, post in to_insert})
+
+    results = [
+        schemas.PostBulkResult(index=index, status_code=201, post_no=post_no)
+        for (index, _), post_no in zip(to_insert, post_nos)
+    ]
+    for index, detail in errors.items():
+        status_code = 404 if detail == "Owner User not found" else 422
+        results.append(schemas.PostBulkResult(index=index, status_code=status_code, detail=detail))
+    results.sort(key=lambda result: result.index)
+    return results
+
 # 전체 게시물 목록 조회 API 엔드포인트
 # GET /posts/
+# cursor 파라미터를 보내면(첫 페이지는 cursor=) skip 대신 커서 방식으로 조회하고,
+# 다음 페이지 커서를 X-Next-Cursor 응답 헤더로 돌려줍니다.
+# 응답에는 게시물의 버전으로 계산한 ETag가 붙으며, 내용이 바뀌지 않았으면
+# 게시물 본문을 읽지 않고 304 Not Modified를 반환합니다. (pagination.read_page 참고)
+# content_preview=N을 보내면 본문은 앞 N글자만 SQL에서 잘라 반환합니다. (preview.py 참고)
 @router.get("/", response_model=List[schemas.Post])
-def read_posts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    # offset(skip).limit(limit)를 사용하여 페이지네이션(pagination)을 구현합니다.
-    posts = db.query(models.Post).offset(skip).limit(limit).all()
-    return posts
+def read_posts(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값. 첫 페이지는 빈 값으로 요청합니다."),
+    content_preview: Optional[int] = Query(None, ge=0, description=CONTENT_PREVIEW_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+):
+    query = db.query(models.Post)
+    model = schemas.Post
+    if content_preview is not None:
+        query = query.options(*content_preview_options(content_preview))
+        model = schemas.PostPreview
+    # 커서 방식은 post_no 인덱스를 바로 탐색하므로 페이지 깊이와 무관하게 비용이 일정합니다.
+    posts, headers, etag = read_page(
+        request, query, db.query(*POST_VERSION_COLUMNS), models.Post.post_no, skip, cursor, limit,
+        lambda rows: posts_etag(rows, content_preview),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag, headers)
+    return json_response(request, render_json_list(model, posts), headers, etag=etag)
+
+# 게시물 전체 내보내기 API 엔드포인트
+# GET /posts/export?format=ndjson|csv
+# 모든 게시물을 NDJSON 또는 CSV로 스트리밍하며, 행 수와 관계없이 메모리 사용량이 일정합니다. (export.py 참고)
+@router.get("/export", response_class=StreamingResponse)
+def export_posts(format: Literal["ndjson", "csv"] = "ndjson", db: Session = Depends(get_read_db)):
+    columns = [
+        models.Post.post_no,
+        models.Post.title,
+        models.Post.content,
+        models.Post.reg_date,
+        models.Post.user_no,
+    ]
+    return export_response(db, columns, models.Post.post_no, format, "posts")
+
+# 게시물 전문 검색 API 엔드포인트
+# GET /posts/search?q=검색어
+# FTS5 색인으로 제목과 내용을 검색하여 관련도 순으로 반환하고, 검색어가 강조된 본문 발췌를 함께 돌려줍니다.
+# "/{post_no}" 경로보다 먼저 등록해야 "search"가 게시물 번호로 해석되지 않습니다.
+@router.get("/search", response_model=List[schemas.PostSearchResult])
+def search(
+    q: str = Query(..., min_length=1, description="검색어 (공백으로 구분된 모든 단어를 포함하는 게시물을 찾습니다)"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    return search_posts(db, q, skip, limit)
 
 # 특정 게시물 한 개 조회 API 엔드포인트
 # GET /posts/{post_no}
+# 캐시에 저장된 응답(ETag와 JSON)이 있으면 DB 조회 없이 그대로 반환합니다.
+# 클라이언트가 보낸 If-None-Match가 현재 ETag와 같으면 본문 없이 304를 반환합니다.
+# 캐시에 없으면 (post_no, version)으로 ETag를 계산하여, 일치하면 JSON으로 변환하지 않고 304를 반환합니다.
+# 읽는 동안 수정/삭제 API가 캐시를 지웠다면 읽은 응답을 저장하지 않습니다. (read_user와 같음)
 @router.get("/{post_no}", response_model=schemas.Post)
-def read_post(post_no: int, db: Session = Depends(get_db)):
+def read_post(post_no: int, request: Request, db: Session = Depends(get_read_db), cache=Depends(get_cache)):
+    entry = cache.get(post_key(post_no))
+    if entry is not None:
+        etag, body = unpack_cache_entry(entry)
+        return json_response(request, body, etag=etag)
+
+    generation = cache.generation(post_key(post_no))
     # post_no를 기준으로 게시물을 조회합니다.
     db_post = db.query(models.Post).filter(models.Post.post_no == post_no).first()
     if db_post is None:
         # 게시물이 없으면 404 Not Found 에러를 발생시킵니다.
         raise HTTPException(status_code=404, detail="Post not found")
-    return db_post
+    etag = version_etag("Post", post_version(db_post))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    body = render_json(schemas.Post, db_post)
+    cache.set(post_key(post_no), pack_cache_entry(etag, body), generation=generation)
+    return json_response(request, body, etag=etag)
 
 # 게시물 수정 API 엔드포인트
 # PUT /posts/{post_no}
 @router.put("/{post_no}", response_model=schemas.Post)
-def update_post(post_no: int, post: schemas.PostBase, db: Session = Depends(get_db)):
+def update_post(post_no: int, post: schemas.PostBase, db: Session = Depends(get_db), cache=Depends(get_cache)):
     # 수정할 게시물을 DB에서 조회합니다.
     db_post = db.query(models.Post).filter(models.Post.post_no == post_no).first()
     if db_post is None:
         raise HTTPException(status_code=404, detail="Post not found")
 
     # 요청으로 받은 데이터(post)의 각 필드를 기존 게시물 객체(db_post)에 업데이트합니다.
-    for key, value in post.dict().items():
+    for key, value in post.model_dump().items():
         setattr(db_post, key, value)
 
     db.commit()  # 변경사항을 DB에 저장합니다.
     db.refresh(db_post)  # DB의 최신 정보로 객체를 갱신합니다.
+    # 이 게시물과, 이 게시물을 목록에 포함하는 소유자의 캐시 항목을 지웁니다.
+    cache.delete(post_key(post_no), user_key(db_post.user_no))
     return db_post
 
+# 게시물 부분 수정 API 엔드포인트
+# PATCH /posts/{post_no}
+# 요청에 포함된 필드(예: 제목만)만 UPDATE ... SET에 넣어 한 문장으로 수정하고, RETURNING으로 수정된 게시물을 돌려받습니다.
+# PUT과 달리 바꾸지 않는 긴 본문(content)을 다시 보내거나 다시 쓰지 않으며, 수정 전 조회와 refresh 조회도 하지 않습니다.
+@router.patch("/{post_no}", response_model=schemas.Post)
+def patch_post(post_no: int, post: schemas.PostUpdate, db: Session = Depends(get_db), cache=Depends(get_cache)):
+    values = post.model_dump(exclude_unset=True)
+    if values:
+        statement = update(models.Post).where(models.Post.post_no == post_no).values(**values).returning(models.Post)
+    else:
+        # 수정할 필드가 없으면 현재 게시물을 그대로 반환합니다.
+        statement = select(models.Post).where(models.Post.post_no == post_no)
+    db_post = db.execute(statement).scalar_one_or_none()
+    if db_post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    # 커밋하면 객체의 속성이 만료되어 다시 조회하게 되므로, 커밋 전에 응답 데이터를 만들어 둡니다.
+    response = schemas.Post.model_validate(db_post)
+    if values:
+        db.commit()
+        cache.delete(post_key(post_no), user_key(response.user_no))
+    return response
+
 # 게시물 삭제 API 엔드포인트
 # DELETE /posts/{post_no}
 @router.delete("/{post_no}", response_model=schemas.Post)
-def delete_post(post_no: int, db: Session = Depends(get_db)):
+def delete_post(post_no: int, db: Session = Depends(get_db), cache=Depends(get_cache)):
     # 삭제할 게시물을 DB에서 조회합니다.
     db_post = db.query(models.Post).filter(models.Post.post_no == post_no).first()
     if db_post is None:
@@ -81,4 +257,5 @@ def delete_post(post_no: int, db: Session = Depends(get_db)):
 
     db.delete(db_post)  # 해당 게시물을 삭제 대상으로 지정합니다.
     db.commit()         # 변경사항(삭제)을 DB에 최종 반영합니다.
+    cache.delete(post_key(post_no), user_key(db_post.user_no))
     return db_post
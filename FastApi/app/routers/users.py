@@ -2,12 +2,28 @@
 # Users API 라우터
 # 회원 가입 및 사용자 정보 관리를 위한 api 엔드포인트
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload, sessionmaker
+import datetime
+from typing import List, Literal, Optional, Union
 
 from .. import models, schemas
-from ..database import get_db
+from ..bulk import chunked, read_bulk_items, validate_items
+from ..cache import get_cache, post_key, user_key
+from ..config import settings
+from ..database import get_db, get_read_db
+from ..export import export_response
+from ..jobs import create_job, get_job, update_job
+from ..pagination import MAX_PAGE_SIZE, read_page
+from ..preview import CONTENT_PREVIEW_DESCRIPTION, content_preview_options
+from ..responses import (
+    etag_matches, json_response, not_modified, pack_cache_entry, render_json, render_json_list, unpack_cache_entry,
+    version_etag,
+)
+from ..versions import POST_VERSION_COLUMNS, posts_etag, user_version, user_version_query, users_etag
 
 # APIRouter 인스턴스를 생성합니다.
 # prefix="/users": 이 라우터의 모든 경로는 "/users"로 시작합니다.
@@ -17,104 +33,482 @@ router = APIRouter(
     tags=["users"],
 )
 
+# 고유(UNIQUE) 제약이 걸린 컬럼과, 값이 중복될 때 반환할 에러 메시지입니다.
+DUPLICATE_DETAILS = {
+    "id": "ID already registered",
+    "email": "Email already registered",
+    "phone_number": "Phone number already registered",
+}
+
+# IntegrityError(UNIQUE 제약 위반)에서 어떤 컬럼이 중복되었는지 찾아 기존 에러 메시지로 변환합니다.
+# SQLite는 "UNIQUE constraint failed: users.email" 형식의 메시지를 돌려줍니다.
+def duplicate_detail(exc: IntegrityError) -> Optional[str]:
+    message = str(exc.orig)
+    for field, detail in DUPLICATE_DETAILS.items():
+        if f"users.{field}" in message:
+            return detail
+    return None
+
+
 # 회원 가입 API 엔드포인트
 # POST /users/
+# 중복 확인을 위해 id, email, phone_number를 각각 SELECT하지 않고, INSERT를 바로 실행한 뒤
+# DB의 UNIQUE 제약 위반(IntegrityError)을 400 에러로 변환합니다.
+# 조회 후 저장하는 방식은 동시에 들어온 두 요청이 모두 확인을 통과할 수 있지만, 제약 조건은 DB가 보장하므로 경쟁 상태가 없습니다.
+# 또한 UNIQUE 제약은 NULL끼리 중복으로 보지 않으므로, 전화번호가 없는 사용자도 여러 명 가입할 수 있습니다.
 @router.post("/", response_model=schemas.User)
 def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    # ID 중복 확인: 요청된 ID가 이미 DB에 존재하는지 확인합니다.
-    db_user_by_id = db.query(models.User).filter(models.User.id == user.id).first()
-    if db_user_by_id:
-        raise HTTPException(status_code=400, detail="동일한 ID가 이미 등록되어 있습니다.")
-
-    # 이메일 중복 확인: 요청된 이메일이 이미 DB에 존재하는지 확인합니다.
-    db_user_by_email = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user_by_email:
-        raise HTTPException(status_code=400, detail="동일한 Email이 이미 등록되어 있습니다.")
-
-    # 휴대폰번호 중복 확인: 요청된 휴대폰번호가 이미 DB에 존재하는지 확인합니다.
-    db_user_by_phone_number = db.query(models.User).filter(models.User.phone_number == user.phone_number).first()
-    if db_user_by_phone_number:
-        raise HTTPException(status_code=400, detail="동일한 휴대폰번호가 이미 등록되어 있습니다.")
-
-    # schemas.UserCreate(Pydantic 모델)를 models.User(SQLAlchemy 모델)로 변환하여 DB에 저장할 객체를 만듭니다.
     # **는 파이썬에서 딕셔너리 언패킹(Dictionary Unpacking) 연산자라고 부릅니다. 이 연산자는 딕셔너리의 키-값 쌍을
     # 풀어서 함수의 키워드 인자(keyword arguments)로 전달하는 역할을 합니다.
-    # 따라서 models.User(**user.dict()) 코드는 아래 코드와 완전히 동일하게 동작합니다.
+    # model_dump()는 Pydantic 모델의 필드를 딕셔너리로 변환합니다. (Pydantic v1의 .dict()를 대신하는 v2 메서드)
+    # 따라서 .values(**user.model_dump()) 코드는 아래 코드와 완전히 동일하게 동작합니다.
     # ** 를 사용하지 않았을 경우
-    # user_data = user.dict()
-    # db_user = models.User(
+    # user_data = user.model_dump()
+    # .values(
     #     id=user_data['id'],
     #     email=user_data['email'],
     #     phone_number=user_data['phone_number'],
     #     user_sex=user_data['user_sex'],
     #     user_name=user_data['user_name']
     # )
-    # ** 연산자는 Pydantic 모델의 데이터를 SQLAlchemy 모델 객체의 속성에 매핑하여 인스턴스를 생성하는 과정을 매우 간결하게
-    # 만들어주는 역할을 합니다.
-    db_user = models.User(**user.dict())
+    # RETURNING: INSERT 문이 자동 생성된 user_no, reg_date를 바로 돌려주므로, 저장 후 다시 조회(db.refresh)할 필요가 없습니다.
+    statement = (
+        insert(models.User)
+        .values(**user.model_dump())
+        .returning(models.User.user_no, models.User.reg_date)
+    )
+    try:
+        created = db.execute(statement).one()
+        db.commit()  # 세션의 변경사항을 DB에 최종 반영(저장)합니다.
+    except IntegrityError as exc:
+        db.rollback()
+        detail = duplicate_detail(exc)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail)
+
+    # 새로 가입한 사용자는 게시물이 없으므로 posts는 빈 목록입니다.
+    return schemas.User(**user.model_dump(), user_no=created.user_no, reg_date=created.reg_date, posts=[])
+
+# 사용자 대량 생성 API 엔드포인트
+# POST /users/bulk
+# JSON 배열 또는 NDJSON으로 여러 사용자를 받아 하나의 트랜잭션으로 저장하고, 항목별 결과를 반환합니다.
+# 중복 확인은 사용자마다 조회하지 않고, 컬럼(id, email, phone_number)별 IN 조회로 한 번에 처리합니다.
+@router.post("/bulk", response_model=List[schemas.UserBulkResult])
+def create_users_bulk(items: list = Depends(read_bulk_items), db: Session = Depends(get_db)):
+    valid, errors = validate_items(items, schemas.UserCreate)
+
+    # 요청 안에서 서로 중복되는 항목은 먼저 나온 항목만 저장합니다.
+    # phone_number가 없는(None) 사용자끼리는 중복이 아닙니다.
+    seen = {field: set() for field in DUPLICATE_DETAILS}
+    candidates = []
+    for index, user in valid:
+        duplicate = next(
+            (field for field in DUPLICATE_DETAILS
+             if getattr(user, field) is not None and getattr(user, field) in seen[field]),
+            None,
+        )
+        if duplicate:
+            errors[index] = DUPLICATE_DETAILS[duplicate]
+            continue
+        for field in DUPLICATE_DETAILS:
+            if getattr(user, field) is not None:
+                seen[field].add(getattr(user, field))
+        candidates.append((index, user))
+
+    # 이미 DB에 등록된 값을 컬럼별 IN 조회로 찾습니다.
+    registered = {field: set() for field in DUPLICATE_DETAILS}
+    for field, values in seen.items():
+        column = getattr(models.User, field)
+        for chunk in chunked(list(values)):
+            registered[field].update(value for (value,) in db.query(column).filter(column.in_(chunk)))
+
+    to_insert = []
+    for index, user in candidates:
+        duplicate = next((field for field in DUPLICATE_DETAILS if getattr(user, field) in registered[field]), None)
+        if duplicate:
+            errors[index] = DUPLICATE_DETAILS[duplicate]
+        else:
+            to_insert.append((index, user))
+
+    # 여러 행 INSERT ... RETURNING(최대 1000행씩 한 문장)으로 저장하고, 생성된 user_no를 고유한 id로 찾아 요청 항목과 연결합니다.
+    # (sort_by_parameter_order=True로 순서를 맞추면 SQLite에서는 행마다 INSERT 문장을 따로 실행합니다. bulk.py 참고)
+    user_nos = []
+    if to_insert:
+        try:
+            result = db.execute(
+                insert(models.User).returning(models.User.id, models.User.user_no),
+                [user.model_dump() for _, user in to_insert],
+            )
+            user_no_by_id = dict(result.all())
+            user_nos = [user_no_by_id[user.id] for _, user in to_insert]
+            db.commit()  # 모든 사용자를 한 번의 커밋으로 저장합니다.
+        except IntegrityError:
+            # 중복 확인 이후 다른 요청이 같은 값을 먼저 저장한 경우입니다. 전체를 취소하고 재시도를 요청합니다.
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Conflicting concurrent insert, please retry")
+
+    results = [
+        schemas.UserBulkResult(index=index, status_code=201, user_no=user_no)
+        for (index, _), user_no in zip(to_insert, user_nos)
+    ]
+    for index, detail in errors.items():
+        status_code = 400 if detail in DUPLICATE_DETAILS.values() else 422
+        results.append(schemas.UserBulkResult(index=index, status_code=status_code, detail=detail))
+    results.sort(key=lambda result: result.index)
+    return results
+
+# include 쿼리 파라미터(쉼표로 구분된 목록)를 집합으로 변환합니다.
+# 파라미터가 없으면 기존 클라이언트와의 호환을 위해 게시물을 포함합니다.
+def parse_include(include: Optional[str]) -> set:
+    if include is None:
+        return {"posts"}
+    return {part.strip() for part in include.split(",") if part.strip()}
+
+
+# include 항목(게시물 포함 여부, 통계 포함 여부)에 따른 목록 조회 응답 모델입니다.
+USER_LIST_MODELS = {
+    (True, False): schemas.User,
+    (False, False): schemas.UserSummary,
+    (True, True): schemas.UserWithStats,
+    (False, True): schemas.UserSummaryWithStats,
+}
+
+# content_preview를 지정하여 게시물 본문을 앞부분만 포함할 때의 응답 모델입니다. (키: 통계 포함 여부)
+USER_PREVIEW_MODELS = {
+    False: schemas.UserWithPostPreviews,
+    True: schemas.UserWithStatsAndPostPreviews,
+}
 
-    db.add(db_user)      # DB 세션에 새 사용자 객체를 추가합니다.
-    db.commit()          # 세션의 변경사항을 DB에 최종 반영(저장)합니다.
-    db.refresh(db_user)  # DB에 저장된 후의 최신 정보(예: user_no, reg_date)를 객체에 다시 로드합니다.
-    return db_user
 
 # 전체 사용자 목록 조회 API 엔드포인트
 # GET /users/
-@router.get("/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    # offset(skip).limit(limit)를 사용하여 페이지네이션(pagination)을 구현합니다.
-    users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
+# include=posts(기본값)이면 게시물 목록을 포함한 schemas.User를,
+# include= 처럼 posts를 빼면 게시물 없이 schemas.UserSummary를 반환합니다.
+# include에 stats를 추가하면(예: include=stats, include=posts,stats) 사용자마다 post_count/last_post_at을 덧붙입니다.
+# 게시물을 포함할 때 content_preview=N을 보내면 게시물 본문은 앞 N글자만 SQL에서 잘라 반환합니다. (preview.py 참고)
+# 반환 모델이 요청마다 달라지므로 response_model 대신 직접 JSON으로 변환하고, 문서에는 responses로 표시합니다.
+# cursor 파라미터를 보내면(첫 페이지는 cursor=) skip 대신 커서 방식으로 조회하고,
+# 다음 페이지 커서를 X-Next-Cursor 응답 헤더로 돌려줍니다.
+# 응답에는 사용자 행과 게시물 버전(user_stats.posts_version)으로 계산한 ETag가 붙으며, 내용이 바뀌지 않았으면
+# 게시물 목록을 읽지 않고 304 Not Modified를 반환합니다. (pagination.read_page 참고)
+@router.get(
+    "/",
+    response_model=None,
+    responses={200: {"model": Union[tuple(
+        List[model] for model in [*USER_LIST_MODELS.values(), *USER_PREVIEW_MODELS.values()]
+    )]}},
+)
+def read_users(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    include: Optional[str] = Query(None, description="쉼표로 구분된 포함 항목 (posts, stats). 비워두면 게시물을 제외합니다."),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값. 첫 페이지는 빈 값으로 요청합니다."),
+    content_preview: Optional[int] = Query(None, ge=0, description=CONTENT_PREVIEW_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+):
+    includes = parse_include(include)
+    query = db.query(models.User)
+    if "posts" in includes:
+        # selectinload: 사용자마다 게시물을 따로 조회(N+1)하지 않고,
+        # 현재 페이지 사용자들의 게시물을 "WHERE user_no IN (...)" 쿼리 한 번으로 모두 가져옵니다.
+        posts_loader = selectinload(models.User.posts)
+        if content_preview is not None:
+            posts_loader = posts_loader.options(*content_preview_options(content_preview))
+        query = query.options(posts_loader)
+    else:
+        # raiseload: 게시물 관계를 로드하지 않아 posts 테이블에 접근하지 않습니다.
+        # 실수로 게시물에 접근하면 사용자마다 조회(N+1)하는 대신 에러가 발생하여 바로 알 수 있습니다.
+        query = query.options(raiseload(models.User.posts))
+    # 게시물이나 통계를 포함하면 ETag에 게시물 버전(posts_version)이 들어가므로 user_stats도 함께 읽습니다.
+    with_posts = bool(includes & {"posts", "stats"})
+    if with_posts:
+        # joinedload: 사용자 조회 쿼리에 user_stats를 LEFT OUTER JOIN하여, 추가 쿼리 없이 통계를 함께 읽습니다.
+        query = query.options(joinedload(models.User.stats))
+    if "posts" in includes and content_preview is not None:
+        model = USER_PREVIEW_MODELS["stats" in includes]
+    else:
+        model = USER_LIST_MODELS["posts" in includes, "stats" in includes]
+    variant = (model.__name__, content_preview)
+
+    # 커서 방식은 user_no 인덱스를 바로 탐색하므로 페이지 깊이와 무관하게 비용이 일정합니다.
+    users, headers, etag = read_page(
+        request, query, user_version_query(db, with_posts), models.User.user_no, skip, cursor, limit,
+        lambda rows: users_etag(rows, variant, with_posts),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag, headers)
+    return json_response(request, render_json_list(model, users), headers, etag=etag)
+
+# 사용자 전체 내보내기 API 엔드포인트
+# GET /users/export?format=ndjson|csv
+# 모든 사용자(게시물 제외)를 NDJSON 또는 CSV로 스트리밍하며, 행 수와 관계없이 메모리 사용량이 일정합니다. (export.py 참고)
+# "/{user_no}" 경로보다 먼저 등록해야 "export"가 사용자 번호로 해석되지 않습니다.
+@router.get("/export", response_class=StreamingResponse)
+def export_users(format: Literal["ndjson", "csv"] = "ndjson", db: Session = Depends(get_read_db)):
+    columns = [
+        models.User.user_no,
+        models.User.id,
+        models.User.email,
+        models.User.phone_number,
+        models.User.user_sex,
+        models.User.user_name,
+        models.User.reg_date,
+    ]
+    return export_response(db, columns, models.User.user_no, format, "users")
 
 # 특정 사용자 한 명 조회 API 엔드포인트
 # GET /users/{user_no}
+# 캐시에 저장된 응답(ETag와 JSON)이 있으면 DB 조회와 게시물 목록 변환 없이 그대로 반환합니다.
+# 캐시에 없으면 사용자 행과 user_stats.posts_version만 한 번에 읽어 ETag를 계산하고,
+# 클라이언트가 보낸 If-None-Match가 같으면 게시물 목록을 불러오지 않고 본문 없이 304를 반환합니다.
+# (워커가 여러 개라 캐시를 끈 배포에서도 조건부 요청은 사용자 한 행만 읽습니다)
+# DB를 읽기 전에 캐시의 세대 번호를 받아 두어, 읽는 동안 수정 API가 캐시를 지웠다면 읽은 응답을 저장하지 않습니다. (cache.py 참고)
 @router.get("/{user_no}", response_model=schemas.User)
-def read_user(user_no: int, db: Session = Depends(get_db)):
-    # user_no를 기준으로 사용자를 조회합니다.
-    db_user = db.query(models.User).filter(models.User.user_no == user_no).first()
+def read_user(user_no: int, request: Request, db: Session = Depends(get_read_db), cache=Depends(get_cache)):
+    entry = cache.get(user_key(user_no))
+    if entry is not None:
+        etag, body = unpack_cache_entry(entry)
+        return json_response(request, body, etag=etag)
+
+    generation = cache.generation(user_key(user_no))
+    # user_no를 기준으로 사용자를 조회합니다. 게시물 목록은 응답 본문을 만들 때 불러옵니다.
+    db_user = (
+        db.query(models.User)
+        .options(joinedload(models.User.stats))
+        .filter(models.User.user_no == user_no)
+        .first()
+    )
     if db_user is None:
         # 사용자가 없으면 404 Not Found 에러를 발생시킵니다.
         raise HTTPException(status_code=404, detail="User not found")
-    return db_user
+    etag = version_etag("User", user_version(db_user, with_posts=True))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    body = render_json(schemas.User, db_user)
+    cache.set(user_key(user_no), pack_cache_entry(etag, body), generation=generation)
+    return json_response(request, body, etag=etag)
+
+# 특정 사용자의 게시물 통계 조회 API 엔드포인트
+# GET /users/{user_no}/stats
+# 게시물 목록을 불러와 세지 않고, 트리거가 미리 계산해 둔 user_stats 행 하나만 읽습니다. (models.py 참고)
+@router.get("/{user_no}/stats", response_model=schemas.UserStats)
+def read_user_stats(user_no: int, request: Request, db: Session = Depends(get_read_db)):
+    row = (
+        db.query(
+            models.User.user_no,
+            func.coalesce(models.UserStats.post_count, 0).label("post_count"),
+            models.UserStats.last_post_at,
+        )
+        .outerjoin(models.UserStats, models.UserStats.user_no == models.User.user_no)
+        .filter(models.User.user_no == user_no)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return json_response(request, render_json(schemas.UserStats, row))
+
+# 특정 사용자의 게시물 목록 조회 API 엔드포인트
+# GET /users/{user_no}/posts
+# (user_no, post_no) 인덱스를 사용하므로 posts 테이블 전체를 훑지 않고 해당 사용자의 게시물만 읽습니다.
+# since/until로 작성일 기간(since 이상, until 미만)을 지정할 수 있고,
+# cursor 파라미터를 보내면 /posts/와 같은 커서 방식으로 페이지를 넘깁니다.
+# content_preview=N을 보내면 본문은 앞 N글자만 SQL에서 잘라 반환합니다. (preview.py 참고)
+@router.get("/{user_no}/posts", response_model=List[schemas.Post])
+def read_user_posts(
+    user_no: int,
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값. 첫 페이지는 빈 값으로 요청합니다."),
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    content_preview: Optional[int] = Query(None, ge=0, description=CONTENT_PREVIEW_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+):
+    conditions = [models.Post.user_no == user_no]
+    if since is not None:
+        conditions.append(models.Post.reg_date >= since)
+    if until is not None:
+        conditions.append(models.Post.reg_date < until)
+    query = db.query(models.Post).filter(*conditions)
+    model = schemas.Post
+    if content_preview is not None:
+        query = query.options(*content_preview_options(content_preview))
+        model = schemas.PostPreview
+
+    # If-None-Match가 있으면 (post_no, version)만 먼저 조회하여 ETag를 비교합니다. (pagination.read_page 참고)
+    posts, headers, etag = read_page(
+        request, query, db.query(*POST_VERSION_COLUMNS).filter(*conditions), models.Post.post_no, skip, cursor, limit,
+        lambda rows: posts_etag(rows, content_preview),
+    )
+
+    # 결과가 비어 있을 때만 사용자가 존재하는지 확인하여, 일반적인 경우에는 조회를 한 번만 실행합니다.
+    if not posts and db.query(models.User.user_no).filter(models.User.user_no == user_no).first() is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if etag_matches(request, etag):
+        return not_modified(etag, headers)
+    return json_response(request, render_json_list(model, posts), headers, etag=etag)
 
 # 사용자 정보 수정 API 엔드포인트
 # PUT /users/{user_no}
+# 회원 가입과 마찬가지로 중복 확인 SELECT 없이 UPDATE ... RETURNING을 바로 실행하고,
+# UNIQUE 제약 위반(IntegrityError)을 400 에러로 변환합니다.
 @router.put("/{user_no}", response_model=schemas.User)
-def update_user(user_no: int, user: schemas.UserCreate, db: Session = Depends(get_db)):
-    # 수정할 사용자를 DB에서 조회합니다.
-    db_user = db.query(models.User).filter(models.User.user_no == user_no).first()
+def update_user(user_no: int, user: schemas.UserCreate, db: Session = Depends(get_db), cache=Depends(get_cache)):
+    statement = (
+        update(models.User)
+        .where(models.User.user_no == user_no)
+        .values(**user.model_dump())
+        .returning(models.User)
+    )
+    try:
+        db_user = db.execute(statement).scalar_one_or_none()
+    except IntegrityError as exc:
+        db.rollback()
+        detail = duplicate_detail(exc)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail)
+
+    # 수정된 행이 없으면 해당 사용자가 존재하지 않는 것입니다.
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # ID 중복 체크: 변경하려는 ID가 현재 사용자의 ID가 아니면서, 다른 사용자가 이미 사용 중인지 확인
-    if user.id != db_user.id:
-        existing_user_id = db.query(models.User).filter(models.User.id == user.id).first()
-        if existing_user_id:
-            raise HTTPException(status_code=400, detail="ID already registered")
+    # 커밋하면 객체의 속성이 만료되어 다시 조회하게 되므로, 커밋 전에 응답 데이터를 만들어 둡니다.
+    response = schemas.User.model_validate(db_user)
+    db.commit()  # 변경사항을 DB에 저장합니다.
+    cache.delete(user_key(user_no))
+    return response
 
-    # 이메일 중복 체크: 변경하려는 이메일이 현재 사용자의 이메일이 아니면서, 다른 사용자가 이미 사용 중인지 확인
-    if user.email != db_user.email:
-        existing_user_email = db.query(models.User).filter(models.User.email == user.email).first()
-        if existing_user_email:
-            raise HTTPException(status_code=400, detail="Email already registered")
+# 사용자 정보 부분 수정 API 엔드포인트
+# PATCH /users/{user_no}
+# 요청에 포함된 필드만 UPDATE ... SET에 넣어 한 문장으로 수정합니다.
+# UNIQUE 제약은 값이 바뀌는 컬럼에 대해서만 검사되므로, 예를 들어 이름만 바꿀 때는 id/email/phone_number 인덱스를 건드리지 않습니다.
+@router.patch("/{user_no}", response_model=schemas.User)
+def patch_user(user_no: int, user: schemas.UserUpdate, db: Session = Depends(get_db), cache=Depends(get_cache)):
+    values = user.model_dump(exclude_unset=True)
+    if values:
+        statement = update(models.User).where(models.User.user_no == user_no).values(**values).returning(models.User)
+    else:
+        # 수정할 필드가 없으면 현재 사용자 정보를 그대로 반환합니다.
+        statement = select(models.User).where(models.User.user_no == user_no)
+    try:
+        db_user = db.execute(statement).scalar_one_or_none()
+    except IntegrityError as exc:
+        db.rollback()
+        detail = duplicate_detail(exc)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail)
 
-    # 요청으로 받은 데이터(user)의 각 필드를 기존 사용자 객체(db_user)에 업데이트합니다.
-    for key, value in user.dict().items():
-        setattr(db_user, key, value)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
 
-    db.commit()  # 변경사항을 DB에 저장합니다.
-    db.refresh(db_user)  # DB의 최신 정보로 객체를 갱신합니다.
-    return db_user
+    response = schemas.User.model_validate(db_user)
+    if values:
+        db.commit()
+        cache.delete(user_key(user_no))
+    return response
+
+# 게시물이 매우 많은 사용자를 백그라운드에서 삭제하는 함수입니다.
+# 게시물을 batch_size개씩 나누어 여러 번의 짧은 트랜잭션으로 지우므로, 한 번에 오래 쓰기 잠금을 잡아
+# 다른 요청의 쓰기를 막지 않습니다. 마지막으로 사용자를 지울 때 남은 게시물은 ON DELETE CASCADE로 함께 삭제됩니다.
+# 진행 상황(삭제된 게시물 수)은 각 묶음의 삭제와 같은 트랜잭션으로 jobs 테이블에 기록합니다.
+def _delete_user_in_batches(job_id: str, session_factory, user_no: int, cache, batch_size: int):
+    deleted_posts = 0
+    db = session_factory()
+    try:
+        update_job(db, job_id, status="running")
+        db.commit()
+        while True:
+            post_nos = [
+                post_no for (post_no,) in db.query(models.Post.post_no)
+                .filter(models.Post.user_no == user_no)
+                .order_by(models.Post.post_no)
+                .limit(batch_size)
+            ]
+            if not post_nos:
+                break
+            db.execute(delete(models.Post).where(models.Post.post_no.in_(post_nos)))
+            deleted_posts += len(post_nos)
+            update_job(db, job_id, deleted_posts=deleted_posts)
+            db.commit()
+            cache.delete(*(post_key(post_no) for post_no in post_nos))
+
+        db.execute(delete(models.User).where(models.User.user_no == user_no))
+        update_job(db, job_id, status="done", deleted_posts=deleted_posts)
+        db.commit()
+        cache.delete(user_key(user_no))
+    except Exception as exc:
+        db.rollback()
+        update_job(db, job_id, status="failed", detail=str(exc))
+        db.commit()
+    finally:
+        db.close()
+
+
+# 백그라운드 작업의 상태 조회 API 엔드포인트
+# GET /users/jobs/{job_id}
+# 작업이 진행 중에 자주 갱신되므로, 복제본이 아닌 쓰기용 DB(get_db)에서 최신 상태를 읽습니다.
+@router.get("/jobs/{job_id}", response_model=schemas.Job)
+def read_job(job_id: str, db: Session = Depends(get_db)):
+    job = get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 # 사용자 삭제 API 엔드포인트
 # DELETE /users/{user_no}
-@router.delete("/{user_no}", response_model=schemas.User)
-def delete_user(user_no: int, db: Session = Depends(get_db)):
-    # 삭제할 사용자를 DB에서 조회합니다.
-    db_user = db.query(models.User).filter(models.User.user_no == user_no).first()
-    if db_user is None:
+# ORM의 db.delete()는 사용자의 게시물을 모두 메모리로 불러와 한 건씩 처리하므로, 게시물이 많으면 느리고 메모리를 많이 씁니다.
+# 여기서는 "DELETE FROM users WHERE user_no = ?" 한 문장만 실행하고, 게시물은 DB의 ON DELETE CASCADE가
+# 같은 트랜잭션 안에서 (user_no, post_no) 인덱스로 찾아 삭제합니다.
+# 응답은 삭제된 사용자 번호와 게시물 수만 담은 요약입니다.
+# 게시물 수가 USER_DELETE_BACKGROUND_THRESHOLD를 넘거나 background=true이면, 202 Accepted와 작업 ID를 먼저 응답하고
+# 백그라운드에서 나누어 삭제합니다. 진행 상황은 GET /users/jobs/{job_id}로 확인합니다.
+@router.delete(
+    "/{user_no}",
+    response_model=schemas.UserDeleteResult,
+    responses={202: {"model": schemas.Job}},
+)
+def delete_user(
+    user_no: int,
+    background_tasks: BackgroundTasks,
+    background: bool = False,
+    db: Session = Depends(get_db),
+    cache=Depends(get_cache),
+):
+    # 캐시에서 지울 게시물 번호를 (user_no, post_no) 인덱스만으로 조회합니다.
+    # 기준 개수보다 하나 더 조회하여, 기준을 넘는 사용자의 게시물 번호를 모두 메모리에 올리지 않습니다.
+    threshold = settings.user_delete_background_threshold
+    post_nos = [
+        post_no for (post_no,) in db.query(models.Post.post_no)
+        .filter(models.Post.user_no == user_no)
+        .limit(threshold + 1)
+    ]
+
+    if background or len(post_nos) > threshold:
+        if db.query(models.User.user_no).filter(models.User.user_no == user_no).first() is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        job = create_job(db, "delete_user", user_no=user_no, deleted_posts=0)
+        db.commit()
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+        background_tasks.add_task(
+            _delete_user_in_batches, job["job_id"], session_factory, user_no, cache,
+            settings.user_delete_batch_size,
+        )
+        return JSONResponse(
+            status_code=202,
+            content=schemas.Job(**job).model_dump(),
+            headers={"Location": f"/users/jobs/{job['job_id']}"},
+        )
+
+    result = db.execute(delete(models.User).where(models.User.user_no == user_no))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    db.commit()  # 사용자와 게시물 삭제를 하나의 트랜잭션으로 반영합니다.
 
-    db.delete(db_user)  # 해당 사용자를 삭제 대상으로 지정합니다.
-    db.commit()         # 변경사항(삭제)을 DB에 최종 반영합니다.
-    return db_user
+    # 사용자와 함께 삭제된 게시물들의 캐시 항목도 지웁니다.
+    cache.delete(user_key(user_no), *(post_key(post_no) for post_no in post_nos))
+    return schemas.UserDeleteResult(user_no=user_no, deleted_posts=len(post_nos))
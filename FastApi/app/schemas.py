@@ -1,7 +1,7 @@
 # app/schemas.py
 # API의 요청(Request) 및 응답(Response) 데이터 형식을 정의하고 유효성을 검사합니다.
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 import datetime
 
@@ -16,13 +16,40 @@ class PostCreate(PostBase):
     user_no: int
 
 
+# 게시물 부분 수정(PATCH) 요청입니다. 보낸 필드만 수정하고, 보내지 않은 필드는 그대로 둡니다.
+class PostUpdate(BaseModel):
+    title: Optional[str] = None
+    content: Optional[str] = None
+
+    # 필드를 생략하는 것은 허용하지만, NOT NULL 컬럼에 null을 보내면 422 에러로 처리합니다.
+    @field_validator("title", "content")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
 class Post(PostBase):
     post_no: int
     reg_date: datetime.datetime
     user_no: int
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+
+# 목록 조회에서 content_preview를 지정했을 때의 게시물 응답 모델입니다.
+# 응답의 content 필드에는 본문 전체 대신 ORM 객체의 content_preview(본문 앞부분)를 담습니다.
+class PostPreview(Post):
+    content: str = Field(validation_alias="content_preview")
+
+
+# 게시물 검색 결과입니다. rank는 bm25 관련도 점수(작을수록 관련도가 높음),
+# snippet은 검색어가 <mark> 태그로 강조된 본문 발췌입니다.
+class PostSearchResult(Post):
+    rank: float
+    snippet: str
 
 
 # --- User Schemas ---
@@ -38,10 +65,100 @@ class UserCreate(UserBase):
     pass
 
 
-class User(UserBase):
+# 사용자 부분 수정(PATCH) 요청입니다. 보낸 필드만 수정하고, 보내지 않은 필드는 그대로 둡니다.
+# phone_number와 user_sex는 null을 보내 값을 지울 수 있습니다.
+class UserUpdate(BaseModel):
+    id: Optional[str] = None
+    email: Optional[str] = None
+    phone_number: Optional[str] = None
+    user_sex: Optional[str] = None
+    user_name: Optional[str] = None
+
+    @field_validator("id", "email", "user_name")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
+# 게시물 목록 없이 사용자 정보만 담는 가벼운 응답 모델입니다.
+# 목록 조회(GET /users/)에서 게시물이 필요 없을 때 사용하여 posts 테이블 조회를 생략합니다.
+class UserSummary(UserBase):
     user_no: int
     reg_date: datetime.datetime
+
+    class Config:
+        from_attributes = True
+
+
+class User(UserSummary):
     posts: List[Post] = []
 
+
+# 사용자별 게시물 통계입니다. last_post_at은 가장 최근 게시물의 작성일이며, 게시물이 없으면 null입니다.
+# user_stats 테이블에서 한 행만 읽어 만들므로 게시물 수와 관계없이 비용이 일정합니다.
+class UserStatsFields(BaseModel):
+    post_count: int = 0
+    last_post_at: Optional[datetime.datetime] = None
+
+
+class UserStats(BaseModel):
+    user_no: int
+    post_count: int = 0
+    last_post_at: Optional[datetime.datetime] = None
+
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+
+# 목록 조회(GET /users/?include=stats)에서 사용자 정보에 통계를 덧붙인 응답 모델입니다.
+class UserSummaryWithStats(UserSummary, UserStatsFields):
+    pass
+
+
+class UserWithStats(User, UserStatsFields):
+    pass
+
+
+# 목록 조회(GET /users/?content_preview=N)에서 게시물 본문을 앞부분만 담는 응답 모델입니다.
+class UserWithPostPreviews(UserSummary):
+    posts: List[PostPreview] = []
+
+
+class UserWithStatsAndPostPreviews(UserWithPostPreviews, UserStatsFields):
+    pass
+
+
+# 사용자 삭제 결과입니다. 삭제된 사용자 전체 정보 대신 사용자 번호와 함께 삭제된 게시물 수만 반환합니다.
+class UserDeleteResult(BaseModel):
+    user_no: int
+    deleted_posts: int
+
+
+# --- Job Schemas ---
+# 백그라운드 작업의 상태입니다. status는 pending, running, done, failed 중 하나입니다.
+class Job(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    detail: Optional[str] = None
+    user_no: Optional[int] = None
+    deleted_posts: Optional[int] = None
+
+
+# --- Bulk Schemas ---
+# 대량 생성 API의 항목별 처리 결과입니다.
+# index는 요청 배열(또는 NDJSON 줄)에서의 순서이고, status_code는 항목 하나를 단건 API로 보냈을 때의 상태 코드입니다.
+class BulkItemResult(BaseModel):
+    index: int
+    status_code: int
+    detail: Optional[str] = None
+
+
+class PostBulkResult(BulkItemResult):
+    post_no: Optional[int] = None
+
+
+class UserBulkResult(BulkItemResult):
+    user_no: Optional[int] = None
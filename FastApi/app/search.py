@@ -0,0 +1,79 @@
+# app/search.py
+# 게시물 전문 검색(SQLite FTS5) 조회 함수와 색인 재생성(reindex) 명령을 정의합니다.
+#
+# 색인 테이블(posts_fts)과 트리거는 models.py에 정의되어 있으며, 새 DB는 create_all() 시 자동으로 만들어집니다.
+# 색인이 없던 기존 DB(예: SQLITE3/db/myapp.db)에는 아래 명령으로 색인을 만들고 기존 게시물을 한 번에 색인합니다.
+#
+#   python -m app.search reindex                                   # DATABASE_URL 환경 변수의 DB
+#   python -m app.search reindex --database-url sqlite:///../SQLITE3/db/myapp.db
+
+import argparse
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .models import POSTS_FTS_DDL
+
+# 검색 결과의 본문 발췌(snippet)에서 검색어를 감싸는 태그와 발췌 길이(토큰 수)입니다.
+SNIPPET_OPEN = "<mark>"
+SNIPPET_CLOSE = "</mark>"
+SNIPPET_TOKENS = 16
+
+# bm25() 값이 작을수록(음수 방향으로 클수록) 관련도가 높으므로 오름차순으로 정렬합니다.
+# snippet()의 -1은 제목과 내용 중 검색어가 가장 잘 맞는 컬럼에서 발췌하라는 의미입니다.
+SEARCH_SQL = text(f"""
+    SELECT p.post_no, p.title, p.content, p.reg_date, p.user_no,
+           bm25(posts_fts) AS rank,
+           snippet(posts_fts, -1, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', '…', {SNIPPET_TOKENS}) AS snippet
+    FROM posts_fts
+    JOIN posts AS p ON p.post_no = posts_fts.rowid
+    WHERE posts_fts MATCH :query
+    ORDER BY rank
+    LIMIT :limit OFFSET :skip
+""")
+
+
+# 사용자가 입력한 검색어를 FTS5 MATCH 구문으로 변환합니다.
+# 단어마다 큰따옴표로 감싸 AND, OR, *, : 같은 FTS5 연산자가 문법 에러를 일으키지 않도록 하고,
+# 모든 단어를 포함하는 게시물을 찾습니다.
+def build_match_query(q: str) -> str:
+    terms = ['"' + term.replace('"', '""') + '"' for term in q.split()]
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query is empty")
+    return " ".join(terms)
+
+
+# 검색어와 일치하는 게시물을 관련도 순으로 조회합니다.
+def search_posts(db: Session, q: str, skip: int, limit: int) -> list:
+    params = {"query": build_match_query(q), "skip": skip, "limit": limit}
+    return db.execute(SEARCH_SQL, params).mappings().all()
+
+
+# 색인 테이블과 트리거가 없으면 만들고, posts 테이블의 모든 게시물로 색인을 다시 만듭니다.
+# 호출한 쪽의 트랜잭션(conn) 안에서 실행합니다. (migrate.upgrade()에서도 사용)
+def rebuild_index(conn) -> int:
+    for statement in POSTS_FTS_DDL:
+        conn.execute(text(statement))
+    conn.execute(text("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"))
+    return conn.execute(text("SELECT count(*) FROM posts")).scalar()
+
+
+def reindex(engine) -> int:
+    with engine.begin() as conn:
+        return rebuild_index(conn)
+
+
+if __name__ == "__main__":
+    from .config import settings
+    from .database import create_db_engine
+
+    parser = argparse.ArgumentParser(description="게시물 전문 검색 색인 관리")
+    parser.add_argument("command", choices=["reindex"])
+    parser.add_argument("--database-url", default=settings.database_url)
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.database_url)
+    count = reindex(engine)
+    engine.dispose()
+    print(f"Reindexed {count} posts")
@@ -0,0 +1,101 @@
+# app/serve.py
+# 운영 환경에서 API 서버를 실행하는 진입점(launcher)입니다.
+#
+#   python -m app.serve                      # 설정(환경 변수)에 따라 실행
+#   python -m app.serve --workers 4 --port 80
+#
+# uvicorn 워커 프로세스를 여러 개 실행하여 CPU 코어를 모두 사용합니다.
+# (프로세스 하나는 GIL 때문에 CPU 코어 하나만 사용할 수 있습니다.)
+# uvloop, httptools가 설치되어 있으면 더 빠른 이벤트 루프와 HTTP 파서를 사용합니다.
+
+import argparse
+import importlib.util
+import logging
+import os
+
+import uvicorn
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# 설치된 패키지에 따라 사용할 이벤트 루프와 HTTP 파서를 고릅니다.
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+# 워커 수를 정합니다. 설정값이 0이면 CPU 코어 수만큼 실행합니다.
+def worker_count(configured: int) -> int:
+    if configured > 0:
+        return configured
+    return os.cpu_count() or 1
+
+
+# uvicorn.run()에 전달할 옵션을 만듭니다.
+def uvicorn_options(workers: int = None, host: str = None, port: int = None) -> dict:
+    return {
+        "host": host or settings.host,
+        "port": port or settings.port,
+        "workers": worker_count(workers or settings.web_workers),
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "backlog": settings.web_backlog,
+        "timeout_keep_alive": settings.web_keep_alive,
+        # 종료 신호(SIGTERM)를 받으면 새 연결을 받지 않고, 처리 중인 요청이 끝날 때까지 이 시간만큼 기다린 뒤
+        # lifespan 종료 코드(커넥션 풀 정리)를 실행합니다. (main.py 참고)
+        "timeout_graceful_shutdown": settings.web_graceful_timeout,
+    }
+
+
+# 여러 워커 프로세스로 실행할 때 워커에 전달할 환경 변수를 정합니다.
+# memory 캐시는 워커마다 따로 있으므로, 한 워커에서 수정한 데이터의 예전 응답(과 ETag)을
+# 다른 워커들이 CACHE_TTL 동안 계속 돌려줍니다. 공유 캐시(redis)가 설정되지 않았으면 캐시를 끕니다.
+# (백그라운드 작업 상태는 DB의 jobs 테이블에 저장하므로 워커끼리 공유됩니다)
+def worker_environment(workers: int) -> dict:
+    if workers > 1 and settings.cache_backend == "memory":
+        return {"CACHE_BACKEND": "none"}
+    return {}
+
+
+# 워커를 띄우기 전에 스키마 생성/갱신을 한 번만 실행합니다.
+# 여러 워커가 동시에 빈 DB에 테이블을 만들면 "table already exists" 에러가 날 수 있기 때문입니다.
+# 여기서 스키마 버전을 기록해 두므로, 각 워커의 lifespan에서는 버전만 확인하고 바로 시작합니다.
+# 이 프로세스에서 연 DB 연결은 워커에게 물려주지 않도록 바로 정리합니다.
+def prepare_database() -> None:
+    from . import migrate
+    from .database import dispose_engine, get_engine
+
+    migrate.upgrade(get_engine())
+    dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="FastAPI 서버 실행")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    options = uvicorn_options(args.workers, args.host, args.port)
+
+    # 여러 워커 프로세스가 같은 SQLite 파일에 쓰면, 쓰기 잠금을 기다리는 시간(busy_timeout)과 WAL 모드가 필요합니다.
+    # production 프로필이 아니면 다른 워커의 쓰기 중에 "database is locked" 에러가 날 수 있으므로 경고합니다.
+    if options["workers"] > 1 and settings.database_url.startswith("sqlite") and settings.db_profile != "production":
+        logger.warning("Running %d workers on SQLite without the production profile (WAL, busy_timeout)", options["workers"])
+
+    # 워커 프로세스는 app.main을 새로 import하며, 이 프로세스의 환경 변수를 물려받아 설정을 읽습니다.
+    overrides = worker_environment(options["workers"])
+    if overrides:
+        logger.warning(
+            "Disabling the per-process memory cache for %d workers; set CACHE_BACKEND=redis to share a cache",
+            options["workers"],
+        )
+        os.environ.update(overrides)
+
+    prepare_database()
+    uvicorn.run("app.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# app/stats.py
+# 사용자별 게시물 통계(user_stats 테이블)를 검사하고 다시 계산하는 명령입니다.
+#
+# 통계는 models.py의 트리거가 게시물 추가/삭제마다 갱신하므로 보통은 실행할 필요가 없습니다.
+# 트리거가 없던 기존 DB에 통계 테이블을 추가했거나, 트리거를 거치지 않고 DB를 수정하여 값이 어긋났을 때 사용합니다.
+#
+#   python -m app.stats check                                    # 어긋난 사용자 수 확인 (있으면 종료 코드 1)
+#   python -m app.stats rebuild                                  # DATABASE_URL 환경 변수의 DB
+#   python -m app.stats rebuild --database-url sqlite:///../SQLITE3/db/myapp.db
+
+import argparse
+import sys
+
+from sqlalchemy import text
+
+from .models import USER_STATS_DDL
+
+# posts 테이블에서 직접 계산한 사용자별 통계입니다. 마지막 작성일은 트리거와 같이 post_no가 가장 큰 게시물의 작성일입니다.
+EXPECTED_SQL = """
+    SELECT p.user_no, count(*) AS post_count,
+           (SELECT reg_date FROM posts WHERE user_no = p.user_no ORDER BY post_no DESC LIMIT 1) AS last_post_at
+    FROM posts AS p
+    GROUP BY p.user_no
+"""
+
+# 게시물을 모두 삭제한 사용자는 post_count가 0인 행이 남으므로, 비교할 때는 게시물이 있는 행만 봅니다.
+ACTUAL_SQL = "SELECT user_no, post_count, last_post_at FROM user_stats WHERE post_count != 0"
+
+
+# 저장된 통계와 실제 게시물이 다른 사용자 수를 반환합니다.
+def drift(conn) -> int:
+    return conn.execute(text(f"""
+        SELECT count(DISTINCT user_no) FROM (
+            SELECT user_no FROM (SELECT * FROM ({EXPECTED_SQL}) EXCEPT {ACTUAL_SQL})
+            UNION ALL
+            SELECT user_no FROM ({ACTUAL_SQL} EXCEPT SELECT * FROM ({EXPECTED_SQL}))
+        )
+    """)).scalar()
+
+
+# 트리거가 없으면 만들고, 모든 사용자의 통계를 posts 테이블에서 다시 계산합니다. 통계가 있는 사용자 수를 반환합니다.
+# posts_version은 ETag 계산에 쓰이므로 행을 지우고 다시 만들지 않고, 값을 고치면서 1씩 올립니다.
+# (0부터 다시 세면 클라이언트가 가진 예전 ETag와 우연히 같아질 수 있습니다)
+def rebuild(conn) -> int:
+    for statement in USER_STATS_DDL:
+        conn.execute(text(statement))
+    conn.execute(text("UPDATE user_stats SET post_count = 0, last_post_at = NULL, posts_version = posts_version + 1"))
+    conn.execute(text(f"""
+        INSERT INTO user_stats(user_no, post_count, last_post_at) SELECT * FROM ({EXPECTED_SQL}) WHERE true
+        ON CONFLICT(user_no) DO UPDATE SET
+            post_count = excluded.post_count, last_post_at = excluded.last_post_at
+    """))
+    return conn.execute(text("SELECT count(*) FROM user_stats WHERE post_count != 0")).scalar()
+
+
+if __name__ == "__main__":
+    from .config import settings
+    from .database import create_db_engine
+
+    parser = argparse.ArgumentParser(description="사용자별 게시물 통계 관리")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--database-url", default=settings.database_url)
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.database_url)
+    with engine.begin() as conn:
+        if args.command == "check":
+            count = drift(conn)
+            print(f"{count} users have stale post statistics")
+        else:
+            count = rebuild(conn)
+            print(f"Rebuilt post statistics for {count} users")
+    engine.dispose()
+    sys.exit(1 if args.command == "check" and count else 0)
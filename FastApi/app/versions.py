@@ -0,0 +1,58 @@
+# app/versions.py
+# 응답 본문 대신 행의 버전 정보로 ETag(검증자)를 계산하는 함수들입니다.
+#
+# 본문의 해시로 ETag를 만들면, 조건부 요청(If-None-Match)에 304를 응답하기 위해서도
+# 사용자와 게시물 목록을 모두 읽고 JSON으로 변환해야 합니다. 대신 아래의 값으로 ETag를 만듭니다.
+#   - 게시물: (post_no, version). version은 게시물이 수정될 때마다 트리거가 1씩 올립니다.
+#   - 사용자: 사용자 행의 컬럼들. 게시물 목록이나 통계를 포함하는 응답이면 user_stats.posts_version을 더합니다.
+#     posts_version은 사용자의 게시물이 추가/수정/삭제될 때마다 트리거가 1씩 올립니다. (models.py 참고)
+# 이 값들은 기본 키와 몇 개의 짧은 컬럼뿐이므로, 본문(content)이나 게시물 목록을 읽지 않고 조회할 수 있습니다.
+# ETag에는 응답 형식(응답 모델, 본문 미리보기 길이)도 함께 넣어, 같은 데이터라도 형식이 다른 응답은 ETag가 다르게 합니다.
+
+from sqlalchemy import func
+
+from . import models
+from .responses import version_etag
+
+# 게시물 목록의 버전 조회에서 읽는 컬럼입니다.
+POST_VERSION_COLUMNS = (models.Post.post_no, models.Post.version)
+
+# 사용자 목록의 버전 조회에서 읽는 컬럼입니다. (응답에 포함되는 사용자 행의 컬럼 전체)
+USER_VERSION_COLUMNS = (
+    models.User.user_no,
+    models.User.id,
+    models.User.email,
+    models.User.phone_number,
+    models.User.user_sex,
+    models.User.user_name,
+    models.User.reg_date,
+)
+
+
+# 사용자 목록의 버전 조회 쿼리입니다. with_posts이면 user_stats를 LEFT OUTER JOIN하여 posts_version을 함께 읽습니다.
+def user_version_query(db, with_posts: bool):
+    if not with_posts:
+        return db.query(*USER_VERSION_COLUMNS)
+    return db.query(
+        *USER_VERSION_COLUMNS, func.coalesce(models.UserStats.posts_version, 0).label("posts_version")
+    ).outerjoin(models.UserStats, models.UserStats.user_no == models.User.user_no)
+
+
+# 게시물 하나의 버전 정보입니다. ORM 객체와 버전 조회 결과(Row) 모두 사용할 수 있습니다.
+def post_version(post) -> tuple:
+    return (post.post_no, post.version)
+
+
+# 사용자 하나의 버전 정보입니다. ORM 객체와 버전 조회 결과(Row) 모두 사용할 수 있습니다.
+# ORM 객체의 posts_version은 stats 관계에서 읽으므로, with_posts이면 stats를 함께 로드해야 합니다.
+def user_version(user, with_posts: bool) -> tuple:
+    values = tuple(getattr(user, column.key) for column in USER_VERSION_COLUMNS)
+    return values + (user.posts_version,) if with_posts else values
+
+
+def posts_etag(posts, variant) -> str:
+    return version_etag(variant, [post_version(post) for post in posts])
+
+
+def users_etag(users, variant, with_posts: bool) -> str:
+    return version_etag(variant, [user_version(user, with_posts) for user in users])
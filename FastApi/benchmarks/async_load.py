@@ -0,0 +1,138 @@
+# benchmarks/async_load.py
+# 동기(def) API + 스레드 풀 방식과 비동기(async) API + aiosqlite 방식(ASYNC_DB=1)의 처리량/지연 시간을 비교하는 부하 테스트입니다.
+#
+# 방식마다 같은 seed DB의 복사본으로 uvicorn 서버(워커 1개)를 따로 실행하고, 이 프로세스에서 같은 부하를 보냅니다.
+# 부하를 만드는 클라이언트가 서버와 이벤트 루프/GIL을 나눠 쓰지 않도록 서버는 별도 프로세스로 실행합니다.
+# 요청은 자주 호출되는 API(routers/async_routes.py)로 구성합니다: 사용자 조회 60%, 게시물 조회 20%, 게시물 작성 20%.
+# 캐시 적중이 DB 경로의 차이를 가리지 않도록 캐시는 끕니다. (CACHE_BACKEND=none, --cache로 켤 수 있음)
+#
+# 실행 방법 (FastApi 폴더에서, aiosqlite와 greenlet 패키지 필요):
+#   python -m benchmarks.async_load
+#   python -m benchmarks.async_load --concurrency 50 200 --requests 4000
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .crud_suite import build_seed_db
+
+MODES = {"sync": "0", "async": "1"}
+
+
+# 지정한 방식(ASYNC_DB)으로 uvicorn 서버를 실행하고, 응답할 때까지 기다립니다.
+async def start_server(db_path: str, mode: str, port: int, cache: bool) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "ASYNC_DB": MODES[mode],
+        "CACHE_BACKEND": "memory" if cache else "none",
+        "METRICS_ENABLED": "0",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"], env=env
+    )
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        for _ in range(100):
+            try:
+                await client.get("/")
+                return server
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+# 동시 요청 수(concurrency)를 유지하면서 요청을 보내고, 처리량과 지연 시간을 계산합니다.
+async def run(client: httpx.AsyncClient, users: int, posts: int, concurrency: int, total: int) -> dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    rng = random.Random(0)
+
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            roll = rng.random()
+            started = time.perf_counter()
+            try:
+                if roll < 0.6:
+                    response = await client.get(f"/users/{rng.randint(1, users)}")
+                elif roll < 0.8:
+                    response = await client.get(f"/posts/{rng.randint(1, posts)}")
+                else:
+                    response = await client.post(
+                        "/posts/", json={"title": "bench", "content": "x" * 200, "user_no": rng.randint(1, users)}
+                    )
+                failed = response.status_code >= 400
+            except httpx.TransportError:
+                # 500 응답 후 서버가 연결을 닫으면 다음 요청이 연결 오류로 끝날 수 있습니다.
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "throughput": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main(args) -> int:
+    os.makedirs(args.data_dir, exist_ok=True)
+    seed_path = os.path.join(args.data_dir, f"seed-{args.users}-{args.posts}.db")
+    if not os.path.exists(seed_path):
+        build_seed_db(seed_path, args.users, args.posts)
+
+    print(f"{'mode':>6} {'clients':>8} {'req/s':>10} {'p50(ms)':>10} {'p95(ms)':>10} {'errors':>7}")
+    for concurrency in args.concurrency:
+        for mode in args.modes:
+            # 방식마다 같은 상태의 DB에서 시작합니다.
+            run_path = os.path.join(args.data_dir, f"run-{mode}.db")
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(run_path + suffix):
+                    os.remove(run_path + suffix)
+            shutil.copyfile(seed_path, run_path)
+
+            server = await start_server(run_path, mode, args.port, args.cache)
+            try:
+                limits = httpx.Limits(max_connections=concurrency)
+                async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=None) as client:
+                    # 커넥션 풀과 페이지 캐시를 채우기 위해 먼저 짧게 실행합니다.
+                    await run(client, args.users, args.posts, concurrency, min(args.requests, 500))
+                    result = await run(client, args.users, args.posts, concurrency, args.requests)
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{mode:>6} {concurrency:>8} {result['throughput']:>10.1f} {result['p50_ms']:>10.2f} "
+                f"{result['p95_ms']:>10.2f} {result['errors']:>7}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="sync vs async request path load comparison")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[40, 200], help="동시 요청 수 목록")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--cache", action="store_true", help="응답 캐시(memory)를 켭니다")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "fastapi-bench"))
+    sys.exit(asyncio.run(main(parser.parse_args())))
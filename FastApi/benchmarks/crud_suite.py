@@ -0,0 +1,452 @@
+# benchmarks/crud_suite.py
+# 모든 API를 같은 조건에서 호출하여 지연 시간/처리량/쿼리 수를 기록하고, 이전 결과(baseline)와 비교하는 벤치마크입니다.
+#
+# 1. 지정한 규모(기본 사용자 1만 명, 게시물 10만 개)의 SQLite 파일 DB를 만들어 둡니다. (seed)
+#    같은 규모의 seed DB가 이미 있으면 다시 만들지 않고, 실행할 때마다 복사본을 사용하므로
+#    쓰기 API가 데이터를 바꾸어도 매번 같은 상태에서 시작합니다.
+# 2. API마다 정해진 동시 요청 수(concurrency)로 요청을 보내고, p50/p95/p99 지연 시간과 처리량(req/s),
+#    요청당 SQL 문장 수(Server-Timing 헤더, metrics.py 참고)를 측정합니다.
+# 3. --save로 결과를 JSON 파일에 저장하고, --compare로 저장한 결과와 비교하여
+#    p95 지연 시간이나 처리량이 --threshold(기본 20%) 이상 나빠졌거나 요청당 SQL 문장 수가 늘었으면
+#    종료 코드 1로 실패합니다.
+#
+# 실행 방법 (FastApi 폴더에서):
+#   python -m benchmarks.crud_suite --save baseline.json
+#   python -m benchmarks.crud_suite --compare baseline.json
+#   python -m benchmarks.crud_suite --users 100000 --posts 1000000 --only posts.read posts.search
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# 검색 API가 결과를 찾을 수 있도록 게시물 내용은 이 단어들로 만듭니다.
+WORDS = [
+    "fastapi", "sqlite", "docker", "python", "index", "cursor", "cache", "query", "thread", "pool",
+    "async", "stream", "export", "bulk", "search", "metrics", "latency", "commit", "schema", "router",
+]
+SEED_BATCH_SIZE = 50000
+SEED_START = datetime.datetime(2024, 1, 1)
+QUERY_TOLERANCE = 1.05
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+# seed 데이터의 사용자 n번 값입니다. 수정(PUT) API도 같은 값을 사용하여 UNIQUE 제약에 걸리지 않게 합니다.
+def seed_user(n: int) -> dict:
+    return {
+        "id": f"user{n}", "email": f"user{n}@example.com", "phone_number": f"010-{n:08d}",
+        "user_sex": "M" if n % 2 else "F", "user_name": f"User {n}",
+    }
+
+
+def seed_post(rng: random.Random, users: int) -> dict:
+    return {
+        "title": " ".join(rng.choices(WORDS, k=4)),
+        "content": " ".join(rng.choices(WORDS, k=40)),
+        "user_no": rng.randint(1, users),
+    }
+
+
+# seed DB를 만듭니다. 같은 난수 시드를 사용하므로 같은 규모이면 항상 같은 데이터가 만들어집니다.
+def build_seed_db(path: str, users: int, posts: int) -> None:
+    from sqlalchemy import insert, text
+
+    from app import migrate, models
+    from app.database import create_db_engine
+
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    engine = create_db_engine(f"sqlite:///{tmp_path}")
+    migrate.upgrade(engine)
+
+    rng = random.Random(0)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for start in range(1, users + 1, SEED_BATCH_SIZE):
+            rows = [
+                {**seed_user(n), "reg_date": SEED_START + datetime.timedelta(minutes=n)}
+                for n in range(start, min(start + SEED_BATCH_SIZE, users + 1))
+            ]
+            conn.execute(insert(models.User), rows)
+    # 게시물은 FTS 트리거가 함께 실행되므로, 묶음마다 커밋하여 WAL 파일이 너무 커지지 않게 합니다.
+    for start in range(1, posts + 1, SEED_BATCH_SIZE):
+        with engine.begin() as conn:
+            rows = [
+                {**seed_post(rng, users), "reg_date": SEED_START + datetime.timedelta(seconds=n * 30)}
+                for n in range(start, min(start + SEED_BATCH_SIZE, posts + 1))
+            ]
+            conn.execute(insert(models.Post), rows)
+        print(f"  seeded {min(start + SEED_BATCH_SIZE - 1, posts)}/{posts} posts", file=sys.stderr)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+        # 파일 하나로 복사할 수 있도록 WAL 파일의 내용을 DB 파일에 반영합니다.
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    engine.dispose()
+    os.replace(tmp_path, path)
+    print(f"Seeded {users} users / {posts} posts in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+# 벤치마크 중 변하는 상태(생성할 ID 번호, 삭제할 대상 목록 등)입니다.
+class State:
+    def __init__(self, users: int, posts: int):
+        self.users = users
+        self.posts = posts
+        self.counter = 0
+        self.delete_users = []
+        self.delete_posts = []
+        self.job_ids = []
+
+    def next_id(self) -> int:
+        self.counter += 1
+        return self.counter
+
+
+# 시나리오마다 (메서드, URL, httpx 요청 인자)를 만드는 함수입니다.
+# scale은 기본 요청 수(--requests)에 곱할 비율입니다. (전체 내보내기처럼 무거운 API는 적게 호출)
+SCENARIOS = {}
+
+
+def scenario(name: str, method: str, route: str, scale: float = 1.0):
+    def register(build):
+        SCENARIOS[name] = {"method": method, "route": route, "scale": scale, "build": build}
+        return build
+    return register
+
+
+@scenario("root", "GET", "/")
+def _root(rng, state):
+    return "/", {}
+
+
+@scenario("cache.stats", "GET", "/cache/stats")
+def _cache_stats(rng, state):
+    return "/cache/stats", {}
+
+
+@scenario("users.create", "POST", "/users/")
+def _users_create(rng, state):
+    n = state.next_id()
+    return "/users/", {"json": {"id": f"bench{n}", "email": f"bench{n}@example.com", "user_name": f"Bench {n}"}}
+
+
+@scenario("users.bulk", "POST", "/users/bulk", scale=0.1)
+def _users_bulk(rng, state):
+    items = []
+    for _ in range(100):
+        n = state.next_id()
+        items.append({"id": f"bulk{n}", "email": f"bulk{n}@example.com", "user_name": f"Bulk {n}"})
+    return "/users/bulk", {"json": items}
+
+
+@scenario("users.list", "GET", "/users/")
+def _users_list(rng, state):
+    return "/users/", {"params": {"skip": rng.randint(0, max(state.users - 100, 0)), "limit": 100}}
+
+
+@scenario("users.list_preview", "GET", "/users/")
+def _users_list_preview(rng, state):
+    params = {"skip": rng.randint(0, max(state.users - 100, 0)), "limit": 100, "content_preview": 80}
+    return "/users/", {"params": params}
+
+
+@scenario("users.list_cursor", "GET", "/users/")
+def _users_list_cursor(rng, state):
+    from app.pagination import encode_cursor
+
+    cursor = encode_cursor(rng.randint(0, max(state.users - 100, 0)))
+    return "/users/", {"params": {"cursor": cursor, "limit": 100, "include": ""}}
+
+
+@scenario("users.export", "GET", "/users/export", scale=0.02)
+def _users_export(rng, state):
+    return "/users/export", {"params": {"format": rng.choice(["ndjson", "csv"])}}
+
+
+@scenario("users.read", "GET", "/users/{user_no}")
+def _users_read(rng, state):
+    return f"/users/{rng.randint(1, state.users)}", {}
+
+
+@scenario("users.posts", "GET", "/users/{user_no}/posts")
+def _users_posts(rng, state):
+    return f"/users/{rng.randint(1, state.users)}/posts", {"params": {"cursor": "", "limit": 20}}
+
+
+@scenario("users.stats", "GET", "/users/{user_no}/stats")
+def _users_stats(rng, state):
+    return f"/users/{rng.randint(1, state.users)}/stats", {}
+
+
+@scenario("users.update", "PUT", "/users/{user_no}")
+def _users_update(rng, state):
+    n = rng.randint(1, state.users)
+    return f"/users/{n}", {"json": {**seed_user(n), "user_name": f"Updated {n}"}}
+
+
+@scenario("users.patch", "PATCH", "/users/{user_no}")
+def _users_patch(rng, state):
+    n = rng.randint(1, state.users)
+    return f"/users/{n}", {"json": {"user_name": f"Patched {n}"}}
+
+
+@scenario("users.delete", "DELETE", "/users/{user_no}")
+def _users_delete(rng, state):
+    return f"/users/{state.delete_users.pop()}", {}
+
+
+@scenario("users.job", "GET", "/users/jobs/{job_id}")
+def _users_job(rng, state):
+    return f"/users/jobs/{rng.choice(state.job_ids)}", {}
+
+
+@scenario("posts.create", "POST", "/posts/")
+def _posts_create(rng, state):
+    return "/posts/", {"json": seed_post(rng, state.users)}
+
+
+@scenario("posts.bulk", "POST", "/posts/bulk", scale=0.1)
+def _posts_bulk(rng, state):
+    return "/posts/bulk", {"json": [seed_post(rng, state.users) for _ in range(100)]}
+
+
+@scenario("posts.list", "GET", "/posts/")
+def _posts_list(rng, state):
+    return "/posts/", {"params": {"skip": rng.randint(0, max(state.posts - 100, 0)), "limit": 100}}
+
+
+@scenario("posts.list_preview", "GET", "/posts/")
+def _posts_list_preview(rng, state):
+    return "/posts/", {"params": {"skip": rng.randint(0, max(state.posts - 100, 0)), "limit": 100, "content_preview": 80}}
+
+
+@scenario("posts.list_cursor", "GET", "/posts/")
+def _posts_list_cursor(rng, state):
+    from app.pagination import encode_cursor
+
+    return "/posts/", {"params": {"cursor": encode_cursor(rng.randint(0, max(state.posts - 100, 0))), "limit": 100}}
+
+
+@scenario("posts.export", "GET", "/posts/export", scale=0.01)
+def _posts_export(rng, state):
+    return "/posts/export", {"params": {"format": rng.choice(["ndjson", "csv"])}}
+
+
+@scenario("posts.search", "GET", "/posts/search")
+def _posts_search(rng, state):
+    return "/posts/search", {"params": {"q": " ".join(rng.sample(WORDS, 2)), "limit": 20}}
+
+
+@scenario("posts.read", "GET", "/posts/{post_no}")
+def _posts_read(rng, state):
+    return f"/posts/{rng.randint(1, state.posts)}", {}
+
+
+@scenario("posts.update", "PUT", "/posts/{post_no}")
+def _posts_update(rng, state):
+    post = seed_post(rng, state.users)
+    return f"/posts/{rng.randint(1, state.posts)}", {"json": {"title": post["title"], "content": post["content"]}}
+
+
+@scenario("posts.patch", "PATCH", "/posts/{post_no}")
+def _posts_patch(rng, state):
+    return f"/posts/{rng.randint(1, state.posts)}", {"json": {"title": seed_post(rng, state.users)["title"]}}
+
+
+@scenario("posts.delete", "DELETE", "/posts/{post_no}")
+def _posts_delete(rng, state):
+    return f"/posts/{state.delete_posts.pop()}", {}
+
+
+# 삭제 API가 지울 대상과 작업 조회 API가 조회할 작업을 미리 만듭니다. (측정 시간에 포함하지 않음)
+async def prepare(client, state: State, names: list, requests: int) -> None:
+    if "users.delete" in names or "users.job" in names:
+        items = []
+        for _ in range(requests + 1):
+            n = state.next_id()
+            items.append({"id": f"delete{n}", "email": f"delete{n}@example.com", "user_name": f"Delete {n}"})
+        results = (await client.post("/users/bulk", json=items)).json()
+        state.delete_users = [result["user_no"] for result in results]
+        if "users.job" in names:
+            response = await client.delete(f"/users/{state.delete_users.pop()}", params={"background": "true"})
+            state.job_ids.append(response.json()["job_id"])
+    if "posts.delete" in names:
+        rng = random.Random("posts.delete")
+        posts = [seed_post(rng, state.users) for _ in range(requests)]
+        results = (await client.post("/posts/bulk", json=posts)).json()
+        state.delete_posts = [result["post_no"] for result in results]
+
+
+# 시나리오 하나를 실행하고 지연 시간 분포, 처리량, 요청당 SQL 문장 수를 반환합니다.
+async def run_scenario(client, state: State, name: str, requests: int, concurrency: int) -> dict:
+    spec = SCENARIOS[name]
+    rng = random.Random(name)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    queries = []
+    errors = 0
+
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            url, kwargs = spec["build"](rng, state)
+            started = time.perf_counter()
+            response = await client.request(spec["method"], url, **kwargs)
+            await response.aread()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+            if match:
+                queries.append(int(match.group(1)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    # 요청이 1개뿐이면 분위수를 계산할 수 없으므로 같은 값을 사용합니다.
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": round(requests / elapsed, 1),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "queries_per_request": round(statistics.mean(queries), 2) if queries else None,
+    }
+
+
+# 현재 결과를 baseline과 비교하여, 기준보다 나빠진 항목의 설명 목록을 반환합니다.
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if current["errors"]:
+            regressions.append(f"{name}: {current['errors']} failed requests")
+        if base is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f}ms -> {current['p95_ms']:.2f}ms")
+        if current["throughput"] < base["throughput"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {base['throughput']:.1f} -> {current['throughput']:.1f} req/s")
+        # 요청당 SQL 문장 수는 실행 환경과 관계없이 거의 일정하므로, 캐시 적중 차이 정도(5%)만 허용합니다.
+        if (current["queries_per_request"] or 0) > (base["queries_per_request"] or 0) * QUERY_TOLERANCE:
+            regressions.append(
+                f"{name}: queries/request {base['queries_per_request']} -> {current['queries_per_request']}"
+            )
+    return regressions
+
+
+# 라우터에 있지만 어떤 시나리오도 호출하지 않는 API 목록입니다. (새 API를 추가하면 시나리오도 추가해야 합니다)
+def uncovered_routes(app) -> list:
+    from fastapi.routing import APIRoute
+
+    covered = {(spec["method"], spec["route"]) for spec in SCENARIOS.values()}
+    missing = []
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.include_in_schema:
+            missing.extend(f"{method} {route.path}" for method in route.methods if (method, route.path) not in covered)
+    return sorted(missing)
+
+
+async def run_suite(args, names: list) -> dict:
+    import httpx
+
+    from app.main import app
+
+    for route in uncovered_routes(app):
+        print(f"warning: no scenario for {route}", file=sys.stderr)
+
+    state = State(args.users, args.posts)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport는 lifespan을 실행하지 않으므로 직접 실행합니다. (종료 시 커넥션 정리)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            await prepare(client, state, names, args.requests)
+            print(f"{'scenario':<20} {'req/s':>9} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'queries':>8} {'errors':>7}")
+            for name in names:
+                requests = max(1, int(args.requests * SCENARIOS[name]["scale"]))
+                concurrency = min(args.concurrency, requests)
+                result = results[name] = await run_scenario(client, state, name, requests, concurrency)
+                print(
+                    f"{name:<20} {result['throughput']:>9.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                    f"{result['p99_ms']:>9.2f} {result['queries_per_request'] or 0:>8.2f} {result['errors']:>7}"
+                )
+    return results
+
+
+def main(args) -> int:
+    names = args.only or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    # 앱을 import하기 전에 벤치마크용 DB 복사본을 사용하도록 설정합니다.
+    os.makedirs(args.data_dir, exist_ok=True)
+    seed_path = os.path.join(args.data_dir, f"seed-{args.users}-{args.posts}.db")
+    run_path = os.path.join(args.data_dir, "run.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{run_path}"
+    os.environ["METRICS_ENABLED"] = "1"  # 요청당 SQL 문장 수를 Server-Timing 헤더에서 읽습니다.
+    os.environ.setdefault("SLOW_QUERY_MS", "60000")
+
+    if args.reseed or not os.path.exists(seed_path):
+        build_seed_db(seed_path, args.users, args.posts)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(run_path + suffix):
+            os.remove(run_path + suffix)
+    shutil.copyfile(seed_path, run_path)
+
+    results = asyncio.run(run_suite(args, names))
+    report = {
+        "meta": {
+            "users": args.users, "posts": args.posts, "requests": args.requests, "concurrency": args.concurrency,
+            "python": platform.python_version(), "sqlite": sqlite3.sqlite_version, "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["users"] != args.users or baseline["meta"]["posts"] != args.posts:
+            print("warning: baseline was recorded at a different scale", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare} (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CRUD API benchmark suite")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=500, help="시나리오당 요청 수")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--only", nargs="+", metavar="SCENARIO", help=f"실행할 시나리오 ({', '.join(SCENARIOS)})")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "fastapi-bench"))
+    parser.add_argument("--reseed", action="store_true", help="seed DB를 다시 만듭니다")
+    parser.add_argument("--save", metavar="PATH", help="결과를 JSON 파일로 저장합니다")
+    parser.add_argument("--compare", metavar="PATH", help="저장한 결과와 비교하여 회귀가 있으면 실패합니다")
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용할 p95/처리량 악화 비율 (기본 0.2 = 20%%)")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,82 @@
+# benchmarks/serialization.py
+# 목록 API 한 페이지(100개)를 JSON으로 변환하는 비용을 방식별로 비교하는 마이크로 벤치마크입니다.
+#
+#   1. fastapi:  기존 방식. response_model로 검증 → jsonable_encoder → 표준 json 모듈
+#   2. pydantic: JSON_RENDERER=pydantic (기본값). Pydantic 모델로 검증 후 model_dump_json
+#   3. orjson:   JSON_RENDERER=orjson. ORM 객체에서 바로 dict를 만들어 orjson으로 변환
+#
+# 실행 방법 (FastApi 폴더에서):
+#   python -m benchmarks.serialization --rounds 200
+
+import argparse
+import datetime
+import json
+import timeit
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app import models, schemas
+from app.config import settings
+from app.responses import render_json_list
+
+
+# DB에 저장하지 않은 ORM 객체로 한 페이지 분량의 테스트 데이터를 만듭니다.
+def make_page(size: int, posts_per_user: int):
+    reg_date = datetime.datetime(2026, 1, 1, 12, 0, 0)
+    posts = [
+        models.Post(post_no=i, title=f"Post {i}", content="content " * 50, reg_date=reg_date, user_no=i)
+        for i in range(size)
+    ]
+    users = []
+    for i in range(size):
+        user = models.User(
+            user_no=i, id=f"user{i}", email=f"user{i}@example.com", phone_number=None,
+            user_sex="M", user_name=f"User {i}", reg_date=reg_date,
+        )
+        user.posts = posts[:posts_per_user]
+        users.append(user)
+    return posts, users
+
+
+# 기존 FastAPI 경로: 응답 모델로 검증한 뒤 jsonable_encoder로 dict로 바꾸고 표준 json으로 변환합니다.
+def fastapi_path(model, objs) -> bytes:
+    validated = TypeAdapter(List[model]).validate_python(objs, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def renderer_path(renderer: str):
+    def render(model, objs) -> bytes:
+        settings.json_renderer = renderer
+        return render_json_list(model, objs)
+    return render
+
+
+def main(args):
+    posts, users = make_page(args.page_size, args.posts_per_user)
+    paths = {
+        "fastapi": fastapi_path,
+        "pydantic": renderer_path("pydantic"),
+        "orjson": renderer_path("orjson"),
+    }
+    cases = {
+        f"posts x{args.page_size}": (schemas.Post, posts),
+        f"users x{args.page_size} (+{args.posts_per_user} posts)": (schemas.User, users),
+    }
+
+    print(f"{'page':<28} {'path':<10} {'us/page':>10} {'speedup':>8}")
+    for case, (model, objs) in cases.items():
+        baseline = None
+        for name, path in paths.items():
+            seconds = min(timeit.repeat(lambda: path(model, objs), number=args.rounds, repeat=3)) / args.rounds
+            baseline = baseline or seconds
+            print(f"{case:<28} {name:<10} {seconds * 1e6:>10.1f} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--posts-per-user", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,94 @@
+# benchmarks/startup.py
+# 워커 프로세스가 앱을 import하고 요청을 받을 준비(lifespan 시작)가 끝나기까지의 시간을 측정합니다.
+#
+# 컨테이너를 늘리거나(scale-out) 워커가 재시작될 때마다 이 시간만큼 요청을 받지 못하므로,
+# 측정값이 --budget-ms를 넘으면 종료 코드 1로 실패하여 시작 시간이 늘어나는 변경을 알 수 있게 합니다.
+#
+#   fresh:    빈 DB 파일로 시작 (처음 배포, 스키마 생성 포함)
+#   existing: 스키마가 이미 최신인 DB로 시작 (일반적인 워커 재시작/scale-out)
+#
+# 측정은 매번 새 파이썬 프로세스에서 실행하며, 각 값은 --runs번 실행한 결과의 중앙값입니다.
+#   import_ms:  app.main import에 걸린 시간
+#   ready_ms:   프로세스 시작(인터프리터 시작 포함)부터 lifespan 시작이 끝날 때까지의 시간
+#
+# 실행 방법 (FastApi 폴더에서):
+#   python -m benchmarks.startup --runs 10 --budget-ms 1500
+#   python -m benchmarks.startup --db /tmp/fastapi-bench/seed-100000-1000000.db
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# 자식 프로세스에서 실행할 코드입니다. 측정값을 JSON 한 줄로 출력합니다.
+CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def start():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        print(json.dumps({"import_ms": (imported - started) * 1000, "ready": ready}))
+
+asyncio.run(start())
+"""
+
+
+# 자식 프로세스를 실행하고, 프로세스 시작부터 준비 완료까지의 시간을 포함한 측정값을 반환합니다.
+def measure(database_url: str) -> dict:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    spawned = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    # perf_counter는 시스템 전체에서 같은 시계를 사용하므로 부모와 자식의 값을 비교할 수 있습니다. (Linux/macOS)
+    return {"import_ms": result["import_ms"], "ready_ms": (result["ready"] - spawned) * 1000}
+
+
+def summarize(samples: list) -> dict:
+    return {key: round(statistics.median(sample[key] for sample in samples), 1) for key in samples[0]}
+
+
+def main(args) -> int:
+    workdir = tempfile.mkdtemp(prefix="fastapi-startup-")
+    results = {}
+    try:
+        fresh = []
+        for i in range(args.runs):
+            fresh.append(measure(f"sqlite:///{workdir}/fresh-{i}.db"))
+        results["fresh"] = summarize(fresh)
+
+        # 기존 DB는 복사본을 사용하여 원본을 바꾸지 않습니다.
+        existing_path = f"{workdir}/existing.db"
+        if args.db:
+            shutil.copyfile(args.db, existing_path)
+        else:
+            shutil.copyfile(f"{workdir}/fresh-0.db", existing_path)
+        results["existing"] = summarize([measure(f"sqlite:///{existing_path}") for _ in range(args.runs)])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'case':<10} {'import(ms)':>11} {'ready(ms)':>10}")
+    for case, result in results.items():
+        print(f"{case:<10} {result['import_ms']:>11.1f} {result['ready_ms']:>10.1f}")
+
+    if args.budget_ms and results["existing"]["ready_ms"] > args.budget_ms:
+        print(f"FAIL existing ready time {results['existing']['ready_ms']:.1f}ms exceeds budget {args.budget_ms}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="앱 시작 시간 측정")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db", help="existing 측정에 사용할 DB 파일 (기본값: fresh 측정에서 만든 DB)")
+    parser.add_argument("--budget-ms", type=float, default=0, help="existing의 ready 시간 상한 (0이면 검사하지 않음)")
+    sys.exit(main(parser.parse_args()))
@@ -6,12 +6,16 @@
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # 테스트할 FastAPI 애플리케이션과 데이터베이스 관련 모듈을 가져옵니다.
 from app.main import app
-from app.database import Base, get_db
+from app.batching import PostWriteBatcher, get_post_batcher
+from app.cache import LRUCache, get_cache
+from app.config import settings
+from app.database import Base, create_db_engine, get_db, get_read_db
 
 # 테스트용 인메모리 SQLite 데이터베이스 설정
 # 실제 DB 파일('myapp.db') 대신 메모리에서 실행되는 SQLite를 사용합니다.
@@ -19,11 +23,9 @@ from app.database import Base, get_db
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
 # 테스트용 데이터베이스 엔진 생성
-# connect_args={"check_same_thread": False}는 SQLite를 사용할 때만 필요하며,
-# FastAPI가 여러 스레드에서 데이터베이스와 상호작용할 수 있도록 허용합니다.
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# 운영과 같은 create_db_engine을 사용하여 PRAGMA(외래 키 검사 등) 설정을 동일하게 적용합니다.
+# 인메모리 DB는 연결마다 별도의 DB가 생기므로, StaticPool로 모든 스레드가 하나의 연결을 공유하게 합니다.
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, poolclass=StaticPool)
 # 테스트용 데이터베이스 세션 생성기
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -37,9 +39,14 @@ def override_get_db():
     finally:
         db.close()
 
+# 테이블은 client fixture가 테스트용 DB에 만들므로, 앱 시작(lifespan) 시 운영 DB의 스키마를 확인하지 않습니다.
+settings.migrate_on_startup = False
+
 # FastAPI 앱의 의존성을 위에서 정의한 override_get_db 함수로 교체합니다.
 # 이제부터 앱의 모든 API 요청은 테스트용 데이터베이스를 사용하게 됩니다.
 app.dependency_overrides[get_db] = override_get_db
+# 조회 API의 읽기 전용 세션도 같은 테스트용 DB를 사용합니다. (인메모리 DB는 연결 하나를 공유하므로 읽기 전용으로 바꾸지 않습니다)
+app.dependency_overrides[get_read_db] = override_get_db
 
 # pytest의 fixture를 사용하여 테스트용 클라이언트를 설정합니다.
 # scope="function"은 이 fixture가 각 테스트 함수마다 실행됨을 의미합니다.
@@ -53,6 +60,9 @@ def client():
     """
     # 테스트 시작 전: SQLAlchemy 모델에 정의된 모든 테이블을 테스트용 DB에 생성합니다.
     Base.metadata.create_all(bind=engine)
+    # 테스트마다 DB를 새로 만들기 때문에, 이전 테스트의 응답이 남지 않도록 캐시도 새로 만듭니다.
+    cache = LRUCache()
+    app.dependency_overrides[get_cache] = lambda: cache
 
     # TestClient를 생성하여 API에 요청을 보낼 수 있게 합니다.
     # with 문을 사용하면 테스트가 끝난 후 자동으로 정리(shutdown)됩니다.
@@ -61,3 +71,53 @@ def client():
 
     # 테스트 종료 후: 생성했던 모든 테이블을 DB에서 삭제하여 다음 테스트에 영향을 주지 않도록 합니다.
     Base.metadata.drop_all(bind=engine)
+
+
+# 요청 하나가 실행하는 SQL 문장 수를 세기 위한 fixture입니다.
+# 엔진의 before_cursor_execute 이벤트에 리스너를 등록하고, 실행된 SQL 문장을 리스트에 기록합니다.
+@pytest.fixture(scope="function")
+def queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+# 요청 하나가 실행하는 SELECT 문장마다 SQLite의 실행 계획(EXPLAIN QUERY PLAN)을 기록하는 fixture입니다.
+# 인덱스를 사용하는지(SEARCH ... USING INDEX), 테이블 전체를 훑는지(SCAN) 확인할 때 사용합니다.
+# 각 항목은 (SQL 문장, 실행 계획 설명 목록)입니다.
+@pytest.fixture(scope="function")
+def query_plans():
+    plans = []
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            rows = cursor.connection.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            plans.append((statement, [row[-1] for row in rows]))
+
+    event.listen(engine, "before_cursor_execute", explain)
+    yield plans
+    event.remove(engine, "before_cursor_execute", explain)
+
+
+# 게시물 그룹 커밋 모드를 켜는 fixture입니다. 전용 스레드도 테스트용 DB 세션을 사용합니다.
+# 동시에 보낸 요청이 한 묶음으로 모이도록 대기 시간을 넉넉히 둡니다.
+@pytest.fixture(scope="function")
+def post_batcher(client):
+    batcher = PostWriteBatcher(TestingSessionLocal, max_rows=100, max_delay_ms=200)
+    app.dependency_overrides[get_post_batcher] = lambda: batcher
+    yield batcher
+    del app.dependency_overrides[get_post_batcher]
+    batcher.close()
+
+
+# 테스트에서 DB를 직접 조회하거나 수정하기 위한 세션 fixture입니다. (API를 거치지 않는 검증용)
+@pytest.fixture(scope="function")
+def db(client):
+    session = TestingSessionLocal()
+    yield session
+    session.close()
@@ -0,0 +1,120 @@
+# tests/test_async_routes.py
+# ASYNC_DB=1일 때 사용하는 비동기 API(routers/async_routes.py)를 테스트합니다.
+# 비동기 엔진(aiosqlite)은 인메모리 DB의 연결을 동기 엔진과 공유할 수 없으므로, 임시 파일 DB를 사용합니다.
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+from app import migrate  # noqa: E402
+from app.cache import LRUCache, get_cache  # noqa: E402
+from app.database import (  # noqa: E402
+    AsyncSessionLocal, create_async_db_engine, create_db_engine, get_async_db, get_async_read_db, get_db, get_read_db,
+)
+from app.routers import async_routes, posts, users  # noqa: E402
+
+
+# 비동기 라우터를 동기 라우터보다 먼저 등록한 앱(main.py의 ASYNC_DB=1과 같은 구성)과,
+# 비교용으로 동기 라우터만 등록한 앱을 같은 DB 파일에 연결하여 반환합니다.
+@pytest.fixture
+def apps(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_db_engine(url)
+    migrate.upgrade(engine)
+    async_engine = create_async_db_engine(url)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        db = AsyncSessionLocal(bind=async_engine)
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    def build(*routers) -> FastAPI:
+        app = FastAPI()
+        for router in routers:
+            app.include_router(router)
+        cache = LRUCache()
+        app.dependency_overrides.update({
+            get_db: override_get_db,
+            get_read_db: override_get_db,
+            get_async_db: override_get_async_db,
+            get_async_read_db: override_get_async_db,
+            get_cache: lambda: cache,
+        })
+        return app
+
+    built = [build(async_routes.router, users.router, posts.router), build(users.router, posts.router)]
+
+    with TestClient(built[0]) as async_client, TestClient(built[1]) as sync_client:
+        yield async_client, sync_client, async_engine
+        async_client.portal.call(async_engine.dispose)
+    engine.dispose()
+
+
+def test_async_routes_match_sync_routes(apps):
+    """
+    비동기 API가 동기 API와 같은 응답 본문과 ETag를 반환하고, 게시물 작성 후 사용자 캐시를 무효화하는지 테스트합니다.
+    """
+    async_client, sync_client, _ = apps
+    user_no = async_client.post("/users/", json={"id": "a", "email": "a@example.com", "user_name": "A"}).json()["user_no"]
+
+    response = async_client.post("/posts/", json={"title": "t", "content": "c", "user_no": user_no})
+    assert response.status_code == 200
+    post_no = response.json()["post_no"]
+    assert async_client.post("/posts/", json={"title": "t", "content": "c", "user_no": 999}).status_code == 404
+
+    for path in (f"/users/{user_no}", f"/posts/{post_no}"):
+        expected = sync_client.get(path)
+        response = async_client.get(path)
+        assert response.status_code == 200
+        assert response.json() == expected.json()
+        assert response.headers["ETag"] == expected.headers["ETag"]
+
+    # 캐시에 저장된 사용자 응답이 게시물 작성으로 무효화됩니다.
+    async_client.post("/posts/", json={"title": "t2", "content": "c2", "user_no": user_no})
+    assert len(async_client.get(f"/users/{user_no}").json()["posts"]) == 2
+
+    assert async_client.get("/users/999").status_code == 404
+    assert async_client.get("/posts/999").status_code == 404
+    # 숫자가 아닌 경로는 기존 동기 라우트가 처리합니다.
+    assert async_client.get("/users/export").status_code == 200
+    assert async_client.get("/posts/search", params={"q": "t"}).status_code == 200
+
+
+def test_async_read_user_conditional_get_skips_posts(apps):
+    """
+    캐시에 없는 사용자의 조건부 요청은 비동기 API에서도 게시물 목록을 읽지 않고 304를 반환하는지 테스트합니다.
+    """
+    async_client, sync_client, async_engine = apps
+    user_no = sync_client.post("/users/", json={"id": "b", "email": "b@example.com", "user_name": "B"}).json()["user_no"]
+    sync_client.post("/posts/", json={"title": "t", "content": "c", "user_no": user_no})
+    etag = sync_client.get(f"/users/{user_no}").headers["ETag"]
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # 비동기 엔진의 이벤트는 감싸고 있는 동기 엔진에 등록합니다.
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = async_client.get(f"/users/{user_no}", headers={"If-None-Match": etag})
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert statements and not any("FROM posts" in statement for statement in statements)
@@ -0,0 +1,163 @@
+# tests/test_cache.py
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.cache import LRUCache, RedisCache, get_cache, user_key
+from app.main import app
+
+
+class FakeRedis:
+    """
+    테스트용 Redis 대체 객체입니다. RedisCache가 사용하는 get/set/delete/incr/expire/scan_iter만 구현합니다.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def expire(self, key, seconds):
+        pass
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return [key for key in self.data if key.startswith(prefix)]
+
+
+def test_lru_cache_eviction_and_ttl():
+    """
+    LRU 캐시가 최대 개수를 넘으면 가장 오래 사용되지 않은 항목을 지우고, 만료된 항목은 반환하지 않는지 테스트합니다.
+    """
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"  # a를 최근에 사용한 항목으로 만듭니다.
+    cache.set("c", b"3")  # 가장 오래 사용되지 않은 b가 지워집니다.
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+    assert cache.stats() == {"backend": "memory", "size": 2, "hits": 2, "misses": 1, "evictions": 1}
+
+    expired = LRUCache(ttl=-1)
+    expired.set("a", b"1")
+    assert expired.get("a") is None
+
+
+def test_redis_cache_with_stand_in():
+    """
+    RedisCache가 prefix를 붙여 저장하고, clear()는 자신의 키만 지우는지 테스트합니다.
+    """
+    client = FakeRedis()
+    client.set("other:key", b"keep")
+    cache = RedisCache(client, prefix="test:")
+    cache.set("user:1", b"{}")
+    assert client.data["test:user:1"] == b"{}"
+    assert cache.get("user:1") == b"{}"
+    cache.delete("user:1")
+    assert cache.get("user:1") is None
+    cache.set("user:2", b"{}")
+    cache.clear()
+    assert client.data == {"other:key": b"keep"}
+    assert cache.stats()["hits"] == 1
+
+
+def test_lru_cache_skips_set_after_invalidation():
+    """
+    세대 번호를 받은 뒤 무효화된 키는 저장하지 않고, 무효화 기록이 maxsize를 넘어 밀려나도
+    오래된 세대로는 저장하지 않는지 테스트합니다.
+    """
+    cache = LRUCache(maxsize=2)
+    generation = cache.generation("a")
+    cache.delete("a")  # DB를 읽는 동안 수정 API가 캐시를 지운 상황입니다.
+    cache.set("a", b"stale", generation=generation)
+    assert cache.get("a") is None
+    cache.set("a", b"fresh", generation=cache.generation("a"))
+    assert cache.get("a") == b"fresh"
+
+    generation = cache.generation("b")
+    cache.delete("b")
+    cache.delete("c", "d")  # b의 무효화 기록이 밀려납니다.
+    cache.set("b", b"stale", generation=generation)
+    assert cache.get("b") is None
+
+
+def test_redis_cache_skips_set_after_invalidation():
+    """
+    RedisCache도 세대 번호를 받은 뒤 무효화된 키는 저장하지 않는지 테스트합니다.
+    """
+    client = FakeRedis()
+    cache = RedisCache(client, prefix="test:")
+    generation = cache.generation("user:1")
+    cache.delete("user:1")
+    cache.set("user:1", b"stale", generation=generation)
+    assert cache.get("user:1") is None
+    cache.set("user:1", b"fresh", generation=cache.generation("user:1"))
+    assert cache.get("user:1") == b"fresh"
+
+
+def test_read_user_does_not_cache_body_invalidated_while_reading(client: TestClient, db):
+    """
+    사용자 조회가 DB를 읽는 동안 수정 API가 캐시를 지우면, 읽은(수정 전) 응답을 캐시에 저장하지 않는지 테스트합니다.
+    """
+    user_no = client.post("/users/", json={"id": "racer", "email": "racer@example.com", "user_name": "Racer"}).json()["user_no"]
+    cache = app.dependency_overrides[get_cache]()
+
+    # 사용자를 읽는 SELECT가 실행된 직후, 동시에 들어온 수정 요청의 무효화를 흉내 냅니다.
+    def invalidate(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            cache.delete(user_key(user_no))
+
+    engine = db.get_bind()
+    event.listen(engine, "after_cursor_execute", invalidate)
+    try:
+        assert client.get(f"/users/{user_no}").status_code == 200
+    finally:
+        event.remove(engine, "after_cursor_execute", invalidate)
+    assert cache.get(user_key(user_no)) is None
+
+    # 무효화가 없으면 다음 조회 결과는 저장됩니다.
+    client.get(f"/users/{user_no}")
+    assert cache.get(user_key(user_no)) is not None
+
+
+def test_read_user_cache_invalidation(client: TestClient, queries: list):
+    """
+    사용자 조회 응답이 캐시되어 두 번째 조회는 DB를 사용하지 않고,
+    게시물 생성/수정으로 캐시가 무효화되어 최신 내용이 반환되는지 테스트합니다.
+    """
+    user_no = client.post(
+        "/users/",
+        json={"id": "cacheuser", "email": "cache@example.com", "user_name": "Cache User"},
+    ).json()["user_no"]
+
+    assert client.get(f"/users/{user_no}").json()["posts"] == []
+    queries.clear()
+    assert client.get(f"/users/{user_no}").status_code == 200
+    assert queries == []  # 캐시 적중: DB 조회 없음
+
+    # 게시물을 만들면 소유자의 캐시가 무효화되어 새 게시물이 보여야 합니다.
+    post_no = client.post(
+        "/posts/", json={"title": "Cached", "content": "content", "user_no": user_no}
+    ).json()["post_no"]
+    assert [post["title"] for post in client.get(f"/users/{user_no}").json()["posts"]] == ["Cached"]
+    assert client.get(f"/posts/{post_no}").json()["title"] == "Cached"
+
+    # 게시물을 수정하면 게시물과 소유자의 캐시가 모두 무효화되어야 합니다.
+    client.put(f"/posts/{post_no}", json={"title": "Updated", "content": "content"})
+    assert client.get(f"/posts/{post_no}").json()["title"] == "Updated"
+    assert client.get(f"/users/{user_no}").json()["posts"][0]["title"] == "Updated"
+
+    stats = client.get("/cache/stats").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 5
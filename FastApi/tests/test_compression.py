@@ -0,0 +1,95 @@
+# tests/test_compression.py
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.compression import accepted_encodings
+
+
+def create_large_post(client: TestClient):
+    """
+    압축 최소 크기(COMPRESSION_MIN_SIZE)보다 큰 본문을 가진 게시물을 만듭니다.
+    """
+    user_no = client.post("/users/", json={"id": "zip", "email": "zip@example.com", "user_name": "Zip"}).json()["user_no"]
+    client.post("/posts/", json={"title": "Large", "content": "압축 테스트 " * 2000, "user_no": user_no})
+
+
+def test_gzip_compression(client: TestClient):
+    """
+    Accept-Encoding: gzip 요청에는 큰 응답을 gzip으로 압축하고, 작은 응답은 압축하지 않는지 테스트합니다.
+    """
+    create_large_post(client)
+
+    response = client.get("/posts/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    # TestClient(httpx)는 압축을 자동으로 풀어 주므로, 압축 전 크기와 전송된 크기를 비교합니다.
+    assert int(response.headers["content-length"]) < len(response.content) / 10
+    assert response.json()[0]["title"] == "Large"
+
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/posts/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+def test_compressed_response_has_weak_etag(client: TestClient):
+    """
+    압축한 응답은 압축하지 않은 응답과 본문 바이트가 다르므로 약한(W/) ETag를 받고,
+    그 ETag로 보낸 조건부 요청에도 304 응답을 받는지 테스트합니다.
+    """
+    create_large_post(client)
+    etag = client.get("/posts/", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    assert not etag.startswith("W/")
+
+    weak_etag = client.get("/posts/", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    assert weak_etag == f"W/{etag}"
+
+    response = client.get("/posts/", headers={"Accept-Encoding": "gzip", "If-None-Match": weak_etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == weak_etag
+    assert "Accept-Encoding" in response.headers["vary"]
+
+    response = client.get("/posts/", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_export_stream_compression(client: TestClient):
+    """
+    스트리밍 응답(내보내기 API)도 조각마다 압축되어, 압축을 풀면 원래 내용과 같은지 테스트합니다.
+    """
+    create_large_post(client)
+    with client.stream("GET", "/posts/export", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+    assert b"Large" in gzip.decompress(raw)
+
+
+def test_brotli_compression(client: TestClient):
+    """
+    brotli 패키지가 설치되어 있으면, br과 gzip을 모두 허용하는 요청에 br을 우선 사용하는지 테스트합니다.
+    """
+    brotli = pytest.importorskip("brotli")
+    create_large_post(client)
+
+    with client.stream("GET", "/posts/", headers={"Accept-Encoding": "gzip, br"}) as response:
+        assert response.headers["content-encoding"] == "br"
+        raw = b"".join(response.iter_raw())
+    assert b"Large" in brotli.decompress(raw)
+
+    # 클라이언트가 br을 거부하면(q=0) gzip을 사용합니다.
+    response = client.get("/posts/", headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_accepted_encodings():
+    """
+    Accept-Encoding 헤더에서 q=0으로 거부한 방식을 제외하고 허용된 방식을 찾는지 테스트합니다.
+    """
+    assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert accepted_encodings("GZIP;q=0.5, br;q=0") == {"gzip"}
+    assert accepted_encodings("br;q=0.0, gzip;q=1.0") == {"gzip"}
+    assert accepted_encodings("") == set()
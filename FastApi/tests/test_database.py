@@ -0,0 +1,245 @@
+# tests/test_database.py
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from app import database, migrate, models
+from app.database import READ_YOUR_WRITES_HEADER, create_db_engine, read_engine_for
+from app.search import search_posts
+
+
+def test_production_profile_pragmas(tmp_path):
+    """
+    production 프로필로 만든 엔진의 새 연결마다 WAL 모드, 외래 키 검사 등의 PRAGMA가 적용되는지 테스트합니다.
+    """
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", profile="production", pool_size=2)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+    # 커넥션 풀 크기가 설정한 값으로 적용되었는지 확인합니다.
+    assert engine.pool.size() == 2
+    engine.dispose()
+
+
+def test_default_profile_enables_foreign_keys(tmp_path):
+    """
+    default 프로필은 저널 모드를 바꾸지 않고 외래 키 검사만 켜는지 테스트합니다.
+    """
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", profile="default")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    engine.dispose()
+
+
+def test_upgrade_skips_when_schema_version_matches(tmp_path):
+    """
+    upgrade()가 스키마 버전(user_version)을 기록하고, 버전이 같으면 PRAGMA user_version만 읽고 끝나는지 테스트합니다.
+    """
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", pool_size=1)
+    assert migrate.upgrade(engine) is True
+    with engine.connect() as conn:
+        assert migrate.schema_version(conn) == migrate.SCHEMA_VERSION
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    assert migrate.upgrade(engine) is False
+    assert statements == ["PRAGMA user_version"]
+
+    # force=True이면 버전이 같아도 테이블/인덱스를 다시 확인합니다.
+    assert migrate.upgrade(engine, force=True) is True
+    engine.dispose()
+
+
+def test_import_does_not_touch_database(tmp_path):
+    """
+    app.main을 import만 할 때는 DB 파일을 만들거나 연결하지 않는지 테스트합니다.
+    DB 폴더가 없어도(/data를 마운트하지 않은 경우) import는 성공해야 합니다.
+    """
+    database_path = tmp_path / "missing" / "app.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database_path}"}
+    code = "import app.main, app.database; assert app.database._engine is None"
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert not database_path.parent.exists()
+
+
+def test_upgrade_backfills_user_stats(tmp_path):
+    """
+    통계 테이블이 없던 기존 DB(스키마 버전 1)를 upgrade()하면 통계 테이블과 트리거를 만들고,
+    기존 게시물로 통계를 채우는지 테스트합니다.
+    """
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", pool_size=1)
+    migrate.upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, email, user_name, reg_date) VALUES ('a', 'a@example.com', 'A', '2024-01-01')"))
+        conn.execute(text("INSERT INTO posts (title, content, user_no, reg_date) VALUES ('t', 'c', 1, '2024-01-02')"))
+        conn.execute(text("INSERT INTO posts (title, content, user_no, reg_date) VALUES ('t', 'c', 1, '2024-01-03')"))
+        # 통계 기능이 없던 버전의 DB를 흉내 냅니다.
+        conn.execute(text("DROP TABLE user_stats"))
+        for name in ("user_stats_ai", "user_stats_ad", "user_stats_au"):
+            conn.execute(text(f"DROP TRIGGER {name}"))
+        conn.execute(text("PRAGMA user_version = 1"))
+
+    assert migrate.upgrade(engine) is True
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT post_count, last_post_at FROM user_stats")).one() == (2, "2024-01-03")
+        # 트리거도 다시 만들어져 새 게시물이 통계에 반영됩니다.
+        conn.execute(text("INSERT INTO posts (title, content, user_no, reg_date) VALUES ('t', 'c', 1, '2024-01-04')"))
+        assert conn.execute(text("SELECT post_count FROM user_stats")).scalar() == 3
+    engine.dispose()
+
+
+def test_upgrade_creates_search_index_for_existing_posts(tmp_path):
+    """
+    전문 검색 색인(posts_fts)이 없던 기존 DB(스키마 버전 1, 게시물 있음)를 upgrade()하면
+    색인 테이블과 트리거를 만들고 기존 게시물을 색인하여, 검색이 동작하는지 테스트합니다.
+    """
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", pool_size=1)
+    migrate.upgrade(engine)
+    with engine.begin() as conn:
+        # 색인 기능이 없던 버전의 DB를 흉내 냅니다.
+        for name in ("posts_fts_ai", "posts_fts_ad", "posts_fts_au"):
+            conn.execute(text(f"DROP TRIGGER {name}"))
+        conn.execute(text("DROP TABLE posts_fts"))
+        conn.execute(text("INSERT INTO users (id, email, user_name, reg_date) VALUES ('a', 'a@example.com', 'A', '2024-01-01')"))
+        conn.execute(text("INSERT INTO posts (title, content, user_no, reg_date) VALUES ('SQLite tuning', 'WAL mode', 1, '2024-01-02')"))
+        conn.execute(text("PRAGMA user_version = 1"))
+
+    assert migrate.upgrade(engine) is True
+    with Session(engine) as db:
+        assert [row["title"] for row in search_posts(db, "wal", 0, 10)] == ["SQLite tuning"]
+        # 트리거도 다시 만들어져 새 게시물이 바로 색인됩니다.
+        db.execute(text("INSERT INTO posts (title, content, user_no, reg_date) VALUES ('Other', 'WAL again', 1, '2024-01-03')"))
+        db.commit()
+        assert len(search_posts(db, "wal", 0, 10)) == 2
+    engine.dispose()
+
+
+def test_upgrade_adds_autoincrement_to_existing_tables(tmp_path):
+    """
+    AUTOINCREMENT 없이 만들어진 기존 DB(이전 models.py의 create_all, 스키마 버전 3)를 upgrade()하면
+    users/posts 테이블을 AUTOINCREMENT로 다시 만들면서 행과 기본 키, 트리거를 유지하고,
+    가장 큰 번호의 게시물을 지운 뒤에도 그 번호를 다시 사용하지 않는지 테스트합니다.
+    """
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", pool_size=1)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE users (user_no INTEGER NOT NULL, id VARCHAR NOT NULL, email VARCHAR NOT NULL, "
+            "phone_number VARCHAR, user_sex VARCHAR, user_name VARCHAR NOT NULL, reg_date DATETIME NOT NULL, "
+            "PRIMARY KEY (user_no), UNIQUE (id), UNIQUE (email), UNIQUE (phone_number))"
+        ))
+        conn.execute(text(
+            "CREATE TABLE posts (post_no INTEGER NOT NULL, title VARCHAR NOT NULL, content TEXT NOT NULL, "
+            "reg_date DATETIME NOT NULL, user_no INTEGER NOT NULL, PRIMARY KEY (post_no), "
+            "FOREIGN KEY(user_no) REFERENCES users (user_no) ON DELETE CASCADE)"
+        ))
+    # 나머지 테이블과 posts의 트리거(user_stats_*)는 이전 버전과 같이 create_all()이 만듭니다.
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, email, user_name, reg_date) VALUES ('a', 'a@example.com', 'A', '2024-01-01')"))
+        for day in (2, 3):
+            conn.execute(text(f"INSERT INTO posts (title, content, user_no, reg_date) VALUES ('t', 'c', 1, '2024-01-0{day}')"))
+        conn.execute(text("PRAGMA user_version = 3"))
+
+    assert migrate.upgrade(engine) is True
+    with engine.begin() as conn:
+        assert migrate.missing_autoincrement(conn) == []
+        assert conn.execute(text("SELECT post_no FROM posts ORDER BY post_no")).scalars().all() == [1, 2]
+        assert conn.execute(text("SELECT post_count FROM user_stats")).scalar() == 2
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+        # 가장 큰 번호의 게시물을 지워도 새 게시물은 다음 번호를 받고, 트리거가 통계를 계속 갱신합니다.
+        conn.execute(text("DELETE FROM posts WHERE post_no = 2"))
+        conn.execute(text("INSERT INTO posts (title, content, user_no, reg_date) VALUES ('t', 'c', 1, '2024-01-04')"))
+        assert conn.execute(text("SELECT max(post_no) FROM posts")).scalar() == 3
+        assert conn.execute(text("SELECT post_count FROM user_stats")).scalar() == 2
+    engine.dispose()
+
+
+def test_upgrade_adds_version_columns(tmp_path):
+    """
+    버전 컬럼이 없는 기존 DB(스키마 버전 4)를 upgrade()하면 posts.version, user_stats.posts_version 컬럼을 추가하고
+    트리거를 다시 만들어, 이후 게시물 추가/수정/삭제마다 버전이 올라가는지 테스트합니다.
+    """
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", pool_size=1)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE users (user_no INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, id VARCHAR NOT NULL UNIQUE, "
+            "email VARCHAR NOT NULL UNIQUE, phone_number VARCHAR UNIQUE, user_sex VARCHAR, user_name VARCHAR NOT NULL, "
+            "reg_date DATETIME NOT NULL)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE posts (post_no INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, title VARCHAR NOT NULL, "
+            "content TEXT NOT NULL, reg_date DATETIME NOT NULL, "
+            "user_no INTEGER NOT NULL REFERENCES users (user_no) ON DELETE CASCADE)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE user_stats (user_no INTEGER NOT NULL PRIMARY KEY REFERENCES users (user_no) ON DELETE CASCADE, "
+            "post_count INTEGER NOT NULL, last_post_at DATETIME)"
+        ))
+        # 이전 버전의 게시물 추가 트리거입니다. (posts_version을 올리지 않음)
+        conn.execute(text(
+            "CREATE TRIGGER user_stats_ai AFTER INSERT ON posts BEGIN "
+            "INSERT INTO user_stats(user_no, post_count, last_post_at) VALUES (new.user_no, 1, new.reg_date) "
+            "ON CONFLICT(user_no) DO UPDATE SET post_count = post_count + 1, last_post_at = excluded.last_post_at; END"
+        ))
+        conn.execute(text("INSERT INTO users (id, email, user_name, reg_date) VALUES ('a', 'a@example.com', 'A', '2024-01-01')"))
+        conn.execute(text("INSERT INTO posts (title, content, user_no, reg_date) VALUES ('t', 'c', 1, '2024-01-02')"))
+        conn.execute(text("PRAGMA user_version = 4"))
+
+    assert migrate.upgrade(engine) is True
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT version FROM posts")).scalar() == 1
+        assert conn.execute(text("SELECT posts_version FROM user_stats")).scalar() == 0
+
+        conn.execute(text("UPDATE posts SET title = 'new' WHERE post_no = 1"))
+        assert conn.execute(text("SELECT version FROM posts")).scalar() == 2
+        assert conn.execute(text("SELECT posts_version FROM user_stats")).scalar() == 1
+        conn.execute(text("INSERT INTO posts (title, content, user_no, reg_date) VALUES ('t', 'c', 1, '2024-01-03')"))
+        conn.execute(text("DELETE FROM posts WHERE post_no = 1"))
+        assert conn.execute(text("SELECT post_count, posts_version FROM user_stats")).one() == (1, 3)
+    engine.dispose()
+
+
+def test_read_only_engine(tmp_path):
+    """
+    읽기 전용 엔진이 쓰기용 엔진이 커밋한 데이터를 바로 읽고, 쓰기 쿼리는 거부하는지 테스트합니다.
+    """
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_db_engine(url, pool_size=1)
+    read_engine = create_db_engine(url, read_only=True, pool_size=1)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (name TEXT)"))
+        conn.execute(text("INSERT INTO items VALUES ('a')"))
+
+    with read_engine.connect() as conn:
+        assert conn.execute(text("SELECT name FROM items")).scalars().all() == ["a"]
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO items VALUES ('b')"))
+    read_engine.dispose()
+    engine.dispose()
+
+
+def test_read_your_writes_header(monkeypatch):
+    """
+    X-Read-Your-Writes 헤더가 있는 조회 요청은 읽기 전용 엔진 대신 쓰기용 엔진을 사용하는지 테스트합니다.
+    """
+    monkeypatch.setattr(database, "_engine", "primary")
+    monkeypatch.setattr(database, "_read_engine", "replica")
+
+    def request(headers):
+        return Request({"type": "http", "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]})
+
+    assert read_engine_for(request({})) == "replica"
+    assert read_engine_for(request({READ_YOUR_WRITES_HEADER: "true"})) == "primary"
+    assert read_engine_for(request({READ_YOUR_WRITES_HEADER: "0"})) == "replica"
@@ -0,0 +1,74 @@
+# tests/test_metrics.py
+import logging
+
+from sqlalchemy import text
+
+from app import metrics
+from app.config import settings
+from app.database import create_db_engine
+from app.metrics import bind_shape
+
+
+def test_metrics_endpoint_reports_route_templates(client):
+    """
+    /metrics가 실제 경로(/users/1)가 아닌 경로 템플릿(/users/{user_no})별로 요청 수와 응답 시간을 보여주는지 테스트합니다.
+    """
+    client.get("/users/1")
+    client.get("/users/2")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/users/{user_no}",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/users/{user_no}",le="+Inf"}' in body
+    assert "/users/1" not in body
+    assert "threadpool_threads_total 40" in body
+    assert "db_queries_total" in body
+
+
+def test_server_timing_header_counts_queries(client, queries):
+    """
+    응답의 Server-Timing 헤더에 요청 하나가 실행한 SQL 문장 수가 들어가는지 테스트합니다.
+    """
+    client.post("/users/", json={"id": "timing", "email": "timing@example.com", "user_name": "Timing"})
+    queries.clear()
+
+    response = client.get("/users/", params={"include": ""})
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert f'desc="{len(queries)} queries"' in timing
+    assert timing.startswith("db;dur=")
+    assert "app;dur=" in timing
+
+
+def test_slow_query_log(tmp_path, monkeypatch, caplog):
+    """
+    SLOW_QUERY_MS 이상 걸린 SQL 문장을 바인딩 값 없이 문장과 값의 타입만 로그에 남기는지 테스트합니다.
+    """
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", pool_size=1)
+    slow_before = metrics.DB_SLOW_QUERIES.value()
+    waits_before = metrics.DB_POOL_WAIT_SECONDS.count()
+
+    with caplog.at_level(logging.WARNING, logger="app.sql"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :no, :name"), {"no": 1, "name": "secret"})
+    engine.dispose()
+
+    assert metrics.DB_SLOW_QUERIES.value() > slow_before
+    # 커넥션 풀에서 커넥션을 꺼낼 때마다 대기 시간이 기록됩니다.
+    assert metrics.DB_POOL_WAIT_SECONDS.count() > waits_before
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("SELECT ?, ?" in message and "(int, str)" in message for message in messages)
+    assert not any("secret" in message for message in messages)
+
+
+def test_bind_shape():
+    """
+    바인딩 값의 형태가 위치 인자, 이름 인자, executemany에 따라 요약되는지 테스트합니다.
+    """
+    assert bind_shape((1, "a", None)) == "(int, str, NoneType)"
+    assert bind_shape({"user_no": 1}) == "{'user_no': int}"
+    assert bind_shape([(1, "a"), (2, "b")], executemany=True) == "2 x (int, str)"
+    assert bind_shape(tuple(range(25))).endswith(", ... +5)")
@@ -1,5 +1,16 @@
 # tests/test_posts.py
+import csv
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from app import batching, schemas
 
 # `client`는 conftest.py에 정의된 fixture입니다.
 # 이 fixture 덕분에 각 테스트 함수는 API에 요청을 보낼 수 있는 TestClient 객체를 인자로 받습니다.
@@ -46,4 +57,368 @@ def test_create_post_for_nonexistent_user(client: TestClient):
     # 응답 상태 코드가 404 (Not Found)인지 확인합니다.
     assert response.status_code == 404
     # 응답 메시지가 예상대로 "Owner User not found"인지 확인합니다.
-    assert response.json() == {"detail": "Owner User not found"}
\ No newline at end of file
+    assert response.json() == {"detail": "Owner User not found"}
+
+def test_read_posts_cursor_pagination(client: TestClient):
+    """
+    커서 방식 페이지네이션('/posts/?cursor=')이 모든 게시물을 중복 없이 순서대로 반환하고,
+    조회 도중 새 게시물이 추가되어도 이미 지나간 페이지가 흔들리지 않는지 테스트합니다.
+    """
+    user_no = client.post(
+        "/users/",
+        json={"id": "cursoruser", "email": "cursor@example.com", "user_name": "Cursor User"},
+    ).json()["user_no"]
+    for i in range(5):
+        client.post("/posts/", json={"title": f"Post {i}", "content": "content", "user_no": user_no})
+
+    # 첫 페이지는 빈 커서로 요청합니다.
+    response = client.get("/posts/", params={"cursor": "", "limit": 2})
+    assert response.status_code == 200
+    first_page = [post["post_no"] for post in response.json()]
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    # 페이지를 넘기는 도중에 새 게시물을 추가합니다.
+    client.post("/posts/", json={"title": "New Post", "content": "content", "user_no": user_no})
+
+    seen = list(first_page)
+    while next_cursor:
+        response = client.get("/posts/", params={"cursor": next_cursor, "limit": 2})
+        assert response.status_code == 200
+        seen.extend(post["post_no"] for post in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+
+    # 중복이나 누락 없이 오름차순으로 6개(기존 5개 + 새 게시물 1개)를 모두 받아야 합니다.
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == 6
+
+    # 기존 skip/limit 방식도 그대로 동작해야 합니다.
+    response = client.get("/posts/", params={"skip": 2, "limit": 2})
+    assert [post["post_no"] for post in response.json()] == seen[2:4]
+
+    # 잘못된 커서는 400 에러를 반환합니다.
+    response = client.get("/posts/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("params", [
+    {"cursor": "", "limit": 0},
+    {"cursor": "", "limit": -1},
+    {"limit": 1001},
+    {"skip": -1},
+])
+def test_list_endpoints_reject_invalid_page_size(client: TestClient, params: dict):
+    """
+    목록 조회 API가 범위를 벗어난 limit/skip을 500 에러 대신 422 에러로 거부하는지 테스트합니다.
+    (limit=0인 커서 요청은 빈 페이지의 마지막 행을 읽으려다 IndexError가 발생했습니다)
+    """
+    user_no = client.post("/users/", json={"id": "limit", "email": "limit@example.com", "user_name": "Limit"}).json()["user_no"]
+    client.post("/posts/", json={"title": "Post", "content": "content", "user_no": user_no})
+
+    for path in ["/posts/", "/users/", f"/users/{user_no}/posts", "/posts/search"]:
+        response = client.get(path, params={**params, "q": "content"})
+        assert response.status_code == 422, path
+
+
+def test_create_posts_bulk(client: TestClient, queries: list):
+    """
+    게시물 대량 생성 API('/posts/bulk')가 JSON 배열을 한 번의 소유자 조회와 한 번의 커밋으로 저장하고,
+    존재하지 않는 소유자나 잘못된 항목은 항목별 에러로 돌려주는지 테스트합니다.
+    """
+    user_no = client.post(
+        "/users/",
+        json={"id": "bulkuser", "email": "bulk@example.com", "user_name": "Bulk User"},
+    ).json()["user_no"]
+
+    items = [{"title": f"Post {i}", "content": "content", "user_no": user_no} for i in range(100)]
+    items[10]["user_no"] = 999  # 존재하지 않는 소유자
+    items[20] = {"title": "No content", "user_no": user_no}  # content 누락
+
+    queries.clear()
+    response = client.post("/posts/bulk", json=items)
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["index"] for result in results] == list(range(100))
+    assert results[10]["status_code"] == 404
+    assert results[20]["status_code"] == 422
+    created = [result for result in results if result["status_code"] == 201]
+    assert len(created) == 98
+    assert all(result["post_no"] for result in created)
+    # 소유자 확인 SELECT는 항목 수와 무관하게 한 번만 실행되어야 합니다.
+    assert len([q for q in queries if q.lstrip().upper().startswith("SELECT")]) == 1
+
+    # 생성된 게시물을 단건 조회로 확인합니다.
+    response = client.get(f"/posts/{created[0]['post_no']}")
+    assert response.json()["title"] == "Post 0"
+
+
+def test_create_posts_bulk_statement_count(client: TestClient, queries: list, db):
+    """
+    게시물 대량 생성이 행마다 INSERT를 실행하지 않고 여러 행 INSERT(최대 1000행씩)로 저장되며,
+    각 항목이 자기 게시물의 post_no를 돌려받는지 테스트합니다.
+    """
+    user_no = client.post("/users/", json={"id": "many", "email": "many@example.com", "user_name": "Many"}).json()["user_no"]
+    # 가장 큰 번호의 게시물을 지워, 삭제된 번호가 다시 사용되지 않는 상태에서도 순서가 맞는지 확인합니다.
+    post_no = client.post("/posts/", json={"title": "first", "content": "c", "user_no": user_no}).json()["post_no"]
+    client.delete(f"/posts/{post_no}")
+
+    items = [{"title": f"Post {i}", "content": "content", "user_no": user_no} for i in range(2500)]
+    queries.clear()
+    results = client.post("/posts/bulk", json=items).json()
+
+    inserts = [q for q in queries if q.lstrip().upper().startswith("INSERT INTO POSTS")]
+    assert len(inserts) == 3
+    titles = dict(db.execute(text("SELECT post_no, title FROM posts")).all())
+    assert [titles[result["post_no"]] for result in results] == [item["title"] for item in items]
+    assert min(titles) > post_no
+
+
+def test_create_posts_bulk_owner_deleted_concurrently(client: TestClient, db):
+    """
+    소유자 확인 이후 저장 전에 소유자가 삭제되면(외래 키 위반) 500 대신 409 에러를 반환하고,
+    아무 게시물도 저장하지 않는지 테스트합니다.
+    """
+    user_no = client.post("/users/", json={"id": "gone", "email": "gone@example.com", "user_name": "Gone"}).json()["user_no"]
+
+    # INSERT 직전에 같은 연결에서 소유자를 삭제하여, 동시에 들어온 삭제 요청을 흉내 냅니다.
+    def delete_owner(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO POSTS"):
+            cursor.connection.execute("DELETE FROM users WHERE user_no = ?", (user_no,))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", delete_owner)
+    try:
+        response = client.post("/posts/bulk", json=[{"title": "T", "content": "C", "user_no": user_no}])
+    finally:
+        event.remove(engine, "before_cursor_execute", delete_owner)
+
+    assert response.status_code == 409
+    assert response.json() == {"detail": "Owner User deleted concurrently, please retry"}
+    assert client.get("/posts/").json() == []
+
+
+def test_create_posts_bulk_ndjson(client: TestClient):
+    """
+    NDJSON(한 줄에 JSON 객체 하나) 형식의 대량 생성 요청을 처리하는지 테스트합니다.
+    """
+    user_no = client.post(
+        "/users/",
+        json={"id": "ndjsonuser", "email": "ndjson@example.com", "user_name": "NDJSON User"},
+    ).json()["user_no"]
+    body = "\n".join(
+        f'{{"title": "Post {i}", "content": "content", "user_no": {user_no}}}' for i in range(3)
+    )
+    response = client.post("/posts/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert [result["status_code"] for result in response.json()] == [201, 201, 201]
+
+    # 잘못된 JSON 줄이 있으면 400 에러를 반환합니다.
+    response = client.post("/posts/bulk", content="{not json}", headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 400
+
+
+def test_search_posts(client: TestClient):
+    """
+    게시물 전문 검색 API('/posts/search')가 트리거로 갱신된 색인을 사용하여
+    일치하는 게시물만 관련도 순으로 반환하고, 수정/삭제된 게시물을 반영하는지 테스트합니다.
+    """
+    user_no = client.post(
+        "/users/",
+        json={"id": "searchuser", "email": "search@example.com", "user_name": "Search User"},
+    ).json()["user_no"]
+    fastapi_post = client.post(
+        "/posts/",
+        json={"title": "FastAPI tips", "content": "FastAPI makes building APIs with Python fast.", "user_no": user_no},
+    ).json()
+    client.post(
+        "/posts/",
+        json={"title": "Docker notes", "content": "Running SQLite inside Docker.", "user_no": user_no},
+    )
+    sqlite_post = client.post(
+        "/posts/",
+        json={"title": "SQLite tuning", "content": "WAL mode and FastAPI workers.", "user_no": user_no},
+    ).json()
+
+    response = client.get("/posts/search", params={"q": "fastapi"})
+    assert response.status_code == 200
+    results = response.json()
+    # 제목과 내용 모두에 검색어가 있는 게시물이 먼저 나와야 합니다.
+    assert [result["post_no"] for result in results] == [fastapi_post["post_no"], sqlite_post["post_no"]]
+    assert "<mark>" in results[0]["snippet"]
+
+    # 여러 단어는 모두 포함하는 게시물만 찾고, FTS5 연산자 문자도 문법 에러 없이 처리합니다.
+    response = client.get("/posts/search", params={"q": "sqlite docker"})
+    assert [result["title"] for result in response.json()] == ["Docker notes"]
+    response = client.get("/posts/search", params={"q": 'AND "unbalanced'})
+    assert response.status_code == 200
+
+    # 수정/삭제한 게시물이 색인에 반영되는지 확인합니다.
+    client.put(f"/posts/{sqlite_post['post_no']}", json={"title": "SQLite tuning", "content": "WAL mode only."})
+    client.delete(f"/posts/{fastapi_post['post_no']}")
+    response = client.get("/posts/search", params={"q": "fastapi"})
+    assert response.json() == []
+
+
+def test_export_posts(client: TestClient):
+    """
+    게시물 내보내기 API('/posts/export')가 모든 게시물을 NDJSON과 CSV 형식으로 스트리밍하는지 테스트합니다.
+    """
+    user_no = client.post(
+        "/users/",
+        json={"id": "exportuser", "email": "export@example.com", "user_name": "Export User"},
+    ).json()["user_no"]
+    client.post("/posts/bulk", json=[
+        {"title": f"Post {i}", "content": f"content, \"{i}\"", "user_no": user_no} for i in range(2500)
+    ])
+
+    response = client.get("/posts/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert len(lines) == 2500
+    first = json.loads(lines[0])
+    assert first["title"] == "Post 0"
+    # 날짜 형식은 단건 조회 API의 응답과 같아야 합니다.
+    assert first["reg_date"] == client.get(f"/posts/{first['post_no']}").json()["reg_date"]
+
+    response = client.get("/posts/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["post_no", "title", "content", "reg_date", "user_no"]
+    assert len(rows) == 2501
+    assert rows[1][2] == 'content, "0"'
+
+
+def test_read_posts_content_preview(client: TestClient, queries: list):
+    """
+    content_preview=N을 보내면 게시물 본문을 SQL의 substr로 앞 N글자만 조회하여 반환하는지 테스트합니다.
+    """
+    user_no = client.post("/users/", json={"id": "preview", "email": "preview@example.com", "user_name": "Preview"}).json()["user_no"]
+    client.post("/posts/", json={"title": "긴 글", "content": "가나다라마바사" * 1000, "user_no": user_no})
+    queries.clear()
+
+    response = client.get("/posts/", params={"content_preview": 5})
+    assert response.status_code == 200
+    assert response.json()[0]["content"] == "가나다라마"
+    assert response.json()[0]["title"] == "긴 글"
+    # 본문 컬럼 자체는 조회하지 않습니다.
+    assert "substr(posts.content" in queries[0]
+    assert "posts.content AS" not in queries[0]
+
+    # 같은 옵션을 사용자별 게시물 목록에도 사용할 수 있습니다.
+    response = client.get(f"/users/{user_no}/posts", params={"content_preview": 2})
+    assert response.json()[0]["content"] == "가나"
+    assert client.get("/posts/", params={"content_preview": -1}).status_code == 422
+    assert len(client.get("/posts/").json()[0]["content"]) == 7000
+
+
+def test_read_posts_conditional_get_skips_content(client: TestClient, queries: list):
+    """
+    게시물 목록의 조건부 요청은 (post_no, version)만 조회하여 ETag를 비교하고, 일치하면 본문을 읽지 않고 304를 반환하며,
+    게시물이 수정되면 새 ETag로 200을 반환하는지 테스트합니다.
+    """
+    user_no = client.post("/users/", json={"id": "cond", "email": "cond@example.com", "user_name": "Cond"}).json()["user_no"]
+    post_no = client.post("/posts/", json={"title": "t", "content": "c" * 1000, "user_no": user_no}).json()["post_no"]
+    etag = client.get("/posts/").headers["ETag"]
+    preview_etag = client.get("/posts/", params={"content_preview": 5}).headers["ETag"]
+    # 같은 게시물이라도 응답 형식이 다르면 ETag가 다릅니다.
+    assert preview_etag != etag
+
+    queries.clear()
+    response = client.get("/posts/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert len(queries) == 1
+    assert "posts.content" not in queries[0]
+
+    client.patch(f"/posts/{post_no}", json={"title": "changed"})
+    response = client.get("/posts/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "changed"
+    assert response.headers["ETag"] != etag
+    assert client.get("/posts/", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_patch_post(client: TestClient, queries: list):
+    """
+    게시물 부분 수정 API(PATCH '/posts/{post_no}')가 제목만 보내면 본문은 다시 쓰지 않고
+    UPDATE ... RETURNING 한 문장으로 수정하며, 캐시된 게시물도 무효화하는지 테스트합니다.
+    """
+    user_no = client.post("/users/", json={"id": "patch", "email": "patch@example.com", "user_name": "Patch"}).json()["user_no"]
+    post_no = client.post(
+        "/posts/", json={"title": "Old title", "content": "Long body " * 100, "user_no": user_no}
+    ).json()["post_no"]
+    # 수정 전에 조회하여 캐시에 넣어 둡니다.
+    assert client.get(f"/posts/{post_no}").json()["title"] == "Old title"
+    queries.clear()
+
+    response = client.patch(f"/posts/{post_no}", json={"title": "New title"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "New title"
+    assert response.json()["content"] == "Long body " * 100
+    statements = [q for q in queries if not q.lstrip().upper().startswith(("BEGIN", "COMMIT"))]
+    assert len(statements) == 1
+    set_clause = statements[0].split("SET", 1)[1].split("WHERE", 1)[0]
+    assert "title" in set_clause and "content" not in set_clause
+
+    assert client.get(f"/posts/{post_no}").json()["title"] == "New title"
+    assert client.patch(f"/posts/{post_no}", json={"content": None}).status_code == 422
+    assert client.patch("/posts/99999", json={"title": "X"}).status_code == 404
+
+
+def test_create_post_group_commit(client: TestClient, post_batcher, queries: list):
+    """
+    그룹 커밋 모드에서 동시에 보낸 게시물 생성 요청들이 한 트랜잭션으로 저장되고,
+    각 요청이 자기 post_no 또는 에러(없는 소유자)를 따로 받는지 테스트합니다.
+    """
+    user_no = client.post("/users/", json={"id": "batch", "email": "batch@example.com", "user_name": "Batch"}).json()["user_no"]
+    payloads = [{"title": f"Post {i}", "content": f"Content {i}", "user_no": user_no} for i in range(10)]
+    payloads.append({"title": "Orphan", "content": "No owner", "user_no": 99999})
+    batches_before = batching.POST_BATCH_ROWS.count()
+
+    with ThreadPoolExecutor(max_workers=len(payloads)) as pool:
+        responses = list(pool.map(lambda payload: client.post("/posts/", json=payload), payloads))
+
+    created = [response.json() for response in responses[:-1]]
+    assert [response.status_code for response in responses[:-1]] == [200] * 10
+    assert [post["title"] for post in created] == [f"Post {i}" for i in range(10)]
+    assert len({post["post_no"] for post in created}) == 10
+    assert responses[-1].status_code == 404
+    assert responses[-1].json()["detail"] == "Owner User not found"
+    # 요청마다 커밋하지 않고 몇 번의 묶음으로 저장되었는지 확인합니다.
+    batches = batching.POST_BATCH_ROWS.count() - batches_before
+    assert batches < len(payloads)
+    # 묶음마다 INSERT 문장도 하나만 실행되어야 합니다. (행마다 INSERT하지 않음)
+    inserts = [q for q in queries if q.lstrip().upper().startswith("INSERT INTO POSTS")]
+    assert len(inserts) <= batches
+
+    # 저장된 게시물을 단건 조회 API로 다시 읽을 수 있어야 합니다.
+    post = created[0]
+    assert client.get(f"/posts/{post['post_no']}").json() == post
+
+
+def test_post_batcher_rejects_when_queue_is_full():
+    """
+    저장이 밀려 큐가 가득 차면 기다리지 않고 503(back-pressure) 에러를 발생시키는지 테스트합니다.
+    """
+    release = threading.Event()
+    started = threading.Event()
+
+    # 첫 묶음을 저장하는 동안 전용 스레드를 멈춰 두는 세션 생성 함수입니다.
+    def blocked_session():
+        started.set()
+        release.wait()
+        raise RuntimeError("database unavailable")
+
+    batcher = batching.PostWriteBatcher(blocked_session, max_rows=1, max_delay_ms=0, queue_size=1)
+    post = schemas.PostCreate(title="t", content="c", user_no=1)
+    first = batcher.submit(post)  # 전용 스레드가 꺼내서 저장을 시작합니다.
+    assert started.wait(timeout=5)
+    batcher.submit(post)  # 큐에 대기합니다.
+    with pytest.raises(HTTPException) as exc_info:
+        batcher.submit(post)
+    assert exc_info.value.status_code == 503
+
+    release.set()
+    with pytest.raises(RuntimeError):
+        first.result(timeout=5)
+    batcher.close()
@@ -0,0 +1,70 @@
+# tests/test_responses.py
+import datetime
+import logging
+
+from fastapi.testclient import TestClient
+
+from app import models, responses, schemas
+from app.main import app
+from app.config import settings
+from app.responses import render_json, render_json_list
+
+
+def make_user():
+    """
+    DB에 저장하지 않은 테스트용 사용자(게시물 2개 포함) ORM 객체를 만듭니다.
+    """
+    reg_date = datetime.datetime(2026, 1, 2, 3, 4, 5, 678900)
+    user = models.User(
+        user_no=1, id="fastuser", email="fast@example.com", phone_number=None,
+        user_sex="M", user_name="Fast \"User\" 한글", reg_date=reg_date,
+    )
+    user.posts = [
+        models.Post(post_no=i, title=f"Post {i}", content="내용\n" * 3, reg_date=reg_date, user_no=1)
+        for i in range(2)
+    ]
+    return user
+
+
+def test_fast_renderer_matches_pydantic(monkeypatch):
+    """
+    빠른 경로(JSON_RENDERER=orjson)가 Pydantic 경로와 바이트 단위로 같은 JSON을 만드는지 테스트합니다.
+    """
+    user = make_user()
+    expected_user = render_json(schemas.User, user)
+    expected_list = render_json_list(schemas.Post, user.posts)
+    expected_summary = render_json(schemas.UserSummary, user)
+
+    monkeypatch.setattr(settings, "json_renderer", "orjson")
+    assert render_json(schemas.User, user) == expected_user
+    assert render_json_list(schemas.Post, user.posts) == expected_list
+    assert render_json(schemas.UserSummary, user) == expected_summary
+    assert render_json_list(schemas.Post, []) == b"[]"
+
+
+def test_fast_renderer_reads_content_preview(monkeypatch):
+    """
+    content_preview 응답 모델(schemas.PostPreview)에서 빠른 경로도 content 필드를
+    본문 대신 content_preview 속성에서 읽어, Pydantic 경로와 같은 JSON을 만드는지 테스트합니다.
+    """
+    user = make_user()
+    for post in user.posts:
+        post.content_preview = "내용"
+    expected = render_json(schemas.UserWithPostPreviews, user)
+    assert '"content":"내용"'.encode() in expected
+    assert b"\\n" not in expected
+
+    monkeypatch.setattr(settings, "json_renderer", "orjson")
+    assert render_json(schemas.UserWithPostPreviews, user) == expected
+
+
+def test_warns_when_orjson_renderer_is_missing(monkeypatch, caplog):
+    """
+    JSON_RENDERER=orjson인데 orjson 패키지가 없으면, 앱 시작 시 표준 json 모듈을 사용한다는 경고를 남기는지 테스트합니다.
+    """
+    monkeypatch.setattr(settings, "json_renderer", "orjson")
+    monkeypatch.setattr(responses, "orjson", None)
+    with caplog.at_level(logging.WARNING, logger="app.main"):
+        with TestClient(app):
+            pass
+    assert "orjson package is not installed" in caplog.text
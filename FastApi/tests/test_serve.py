@@ -0,0 +1,29 @@
+# tests/test_serve.py
+from app import serve
+from app.config import settings
+
+
+def test_uvicorn_options():
+    """
+    서버 실행 옵션이 워커 수(0이면 CPU 코어 수)와 설치된 패키지에 맞는 이벤트 루프/HTTP 파서를 고르는지 테스트합니다.
+    """
+    options = serve.uvicorn_options(workers=3, port=9000)
+    assert options["workers"] == 3
+    assert options["port"] == 9000
+    assert options["loop"] in ("uvloop", "asyncio")
+    assert options["http"] in ("httptools", "h11")
+    assert options["timeout_graceful_shutdown"] > 0
+
+    assert serve.worker_count(0) >= 1
+
+
+def test_worker_environment_disables_memory_cache(monkeypatch):
+    """
+    워커가 여러 개이면 워커마다 따로 있는 memory 캐시를 끄고, 워커가 하나이거나 공유 캐시(redis)를 쓰면 그대로 두는지 테스트합니다.
+    """
+    monkeypatch.setattr(settings, "cache_backend", "memory")
+    assert serve.worker_environment(4) == {"CACHE_BACKEND": "none"}
+    assert serve.worker_environment(1) == {}
+
+    monkeypatch.setattr(settings, "cache_backend", "redis")
+    assert serve.worker_environment(4) == {}
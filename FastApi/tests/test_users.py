@@ -1,5 +1,11 @@
 # tests/test_users.py
+import datetime
+
 from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from app import jobs, models
 
 # `client`는 conftest.py에 정의된 fixture입니다.
 # 이 fixture 덕분에 각 테스트 함수는 API에 요청을 보낼 수 있는 TestClient 객체를 인자로 받습니다.
@@ -84,4 +90,478 @@ def test_read_user(client: TestClient):
     data = response.json()
     # 응답 데이터가 생성했던 사용자의 정보와 일치하는지 확인합니다.
     assert data["id"] == "testuser"
-    assert data["user_no"] == user_no
\ No newline at end of file
+    assert data["user_no"] == user_no
+
+def test_read_users_query_count(client: TestClient, queries: list):
+    """
+    사용자 목록 조회가 사용자 수와 무관하게 일정한 수의 쿼리만 실행하는지 테스트합니다.
+    게시물을 포함하면 사용자 조회 1번 + 게시물 일괄(selectin) 조회 1번,
+    include= 로 게시물을 제외하면 사용자 조회 1번만 실행되어야 합니다.
+    """
+    # 게시물을 가진 사용자 여러 명을 생성합니다.
+    for i in range(5):
+        user_no = client.post(
+            "/users/",
+            json={"id": f"user{i}", "email": f"user{i}@example.com", "phone_number": f"010-0000-000{i}", "user_name": f"User {i}"},
+        ).json()["user_no"]
+        for j in range(3):
+            client.post("/posts/", json={"title": f"Post {j}", "content": "content", "user_no": user_no})
+
+    # 게시물을 포함한 기본 조회: 쿼리 2번 (users 1번 + posts IN 조회 1번)
+    queries.clear()
+    response = client.get("/users/")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 5
+    assert all(len(user["posts"]) == 3 for user in data)
+    assert len([q for q in queries if q.lstrip().upper().startswith("SELECT")]) == 2
+
+    # 게시물을 제외한 조회: posts 테이블에 접근하지 않고 쿼리 1번만 실행
+    queries.clear()
+    response = client.get("/users/", params={"include": ""})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 5
+    assert all("posts" not in user for user in data)
+    assert len(queries) == 1
+    assert "posts" not in queries[0]
+
+
+def test_create_users_bulk(client: TestClient):
+    """
+    사용자 대량 생성 API('/users/bulk')가 요청 내부의 중복과 이미 등록된 값을 항목별 400 에러로 처리하는지 테스트합니다.
+    """
+    client.post(
+        "/users/",
+        json={"id": "existing", "email": "existing@example.com", "user_name": "Existing User"},
+    )
+    items = [
+        {"id": "bulk1", "email": "bulk1@example.com", "user_name": "Bulk 1"},
+        {"id": "bulk2", "email": "bulk2@example.com", "user_name": "Bulk 2"},
+        {"id": "bulk1", "email": "other@example.com", "user_name": "Duplicate ID"},
+        {"id": "bulk3", "email": "existing@example.com", "user_name": "Registered Email"},
+    ]
+    response = client.post("/users/bulk", json=items)
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["status_code"] for result in results] == [201, 201, 400, 400]
+    assert results[2]["detail"] == "ID already registered"
+    assert results[3]["detail"] == "Email already registered"
+
+    # 전화번호가 없는 사용자 여러 명은 중복으로 처리되지 않아야 합니다.
+    response = client.get("/users/", params={"include": ""})
+    assert len(response.json()) == 3
+
+
+def test_create_users_bulk_statement_count(client: TestClient, queries: list, db):
+    """
+    사용자 대량 생성이 행마다 INSERT를 실행하지 않고 여러 행 INSERT(최대 1000행씩)로 저장되며,
+    각 항목이 자기 사용자의 user_no를 돌려받는지 테스트합니다.
+    """
+    items = [{"id": f"user{i}", "email": f"user{i}@example.com", "user_name": f"User {i}"} for i in range(2500)]
+    queries.clear()
+    results = client.post("/users/bulk", json=items).json()
+
+    inserts = [q for q in queries if q.lstrip().upper().startswith("INSERT INTO USERS")]
+    assert len(inserts) == 3
+    ids = dict(db.query(models.User.user_no, models.User.id).all())
+    assert [ids[result["user_no"]] for result in results] == [item["id"] for item in items]
+
+
+def test_create_user_statement_count(client: TestClient, queries: list):
+    """
+    회원 가입이 중복 확인 SELECT나 저장 후 재조회 없이 INSERT ... RETURNING 한 번으로 처리되고,
+    중복된 이메일/전화번호는 DB의 UNIQUE 제약으로 400 에러가 되는지 테스트합니다.
+    """
+    queries.clear()
+    response = client.post(
+        "/users/",
+        json={"id": "testuser", "email": "test@example.com", "phone_number": "010-1234-5678", "user_name": "Test User"},
+    )
+    assert response.status_code == 200
+    assert response.json()["posts"] == []
+    assert len(queries) == 1
+    assert queries[0].lstrip().upper().startswith("INSERT")
+
+    response = client.post(
+        "/users/",
+        json={"id": "other", "email": "test@example.com", "user_name": "Other User"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Email already registered"}
+
+    response = client.post(
+        "/users/",
+        json={"id": "other", "email": "other@example.com", "phone_number": "010-1234-5678", "user_name": "Other User"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Phone number already registered"}
+
+
+def test_update_user(client: TestClient):
+    """
+    사용자 정보 수정 API('/users/{user_no}')가 값을 변경하고, 다른 사용자의 ID로 바꾸려 하면 400 에러를 반환하는지 테스트합니다.
+    """
+    client.post("/users/", json={"id": "first", "email": "first@example.com", "user_name": "First"})
+    user_no = client.post(
+        "/users/", json={"id": "second", "email": "second@example.com", "user_name": "Second"}
+    ).json()["user_no"]
+
+    response = client.put(
+        f"/users/{user_no}",
+        json={"id": "second", "email": "changed@example.com", "user_name": "Changed"},
+    )
+    assert response.status_code == 200
+    assert response.json()["email"] == "changed@example.com"
+    assert response.json()["user_name"] == "Changed"
+
+    response = client.put(
+        f"/users/{user_no}",
+        json={"id": "first", "email": "changed@example.com", "user_name": "Changed"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "ID already registered"}
+
+    response = client.put("/users/999", json={"id": "x", "email": "x@example.com", "user_name": "X"})
+    assert response.status_code == 404
+
+
+def test_patch_user(client: TestClient, queries: list):
+    """
+    사용자 부분 수정 API(PATCH '/users/{user_no}')가 보낸 필드만 UPDATE 한 문장으로 수정하고,
+    바꾼 값이 다른 사용자와 겹칠 때만 400 에러를 반환하는지 테스트합니다.
+    """
+    client.post("/users/", json={"id": "first", "email": "first@example.com", "user_name": "First"})
+    user_no = client.post(
+        "/users/", json={"id": "second", "email": "second@example.com", "phone_number": "010-2", "user_name": "Second"}
+    ).json()["user_no"]
+    queries.clear()
+
+    response = client.patch(f"/users/{user_no}", json={"user_name": "Renamed"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["user_name"] == "Renamed"
+    assert data["email"] == "second@example.com"
+    assert data["phone_number"] == "010-2"
+    # 수정은 UPDATE ... RETURNING 한 문장이며, SET에는 보낸 컬럼만 들어갑니다.
+    updates = [q for q in queries if q.lstrip().upper().startswith("UPDATE")]
+    assert len(updates) == 1
+    set_clause = updates[0].split("SET", 1)[1].split("WHERE", 1)[0]
+    assert "user_name" in set_clause
+    assert "email" not in set_clause and "phone_number" not in set_clause
+    assert "RETURNING" in updates[0]
+
+    # null을 보내 값을 지울 수 있는 필드와, null을 허용하지 않는 필드
+    assert client.patch(f"/users/{user_no}", json={"phone_number": None}).json()["phone_number"] is None
+    assert client.patch(f"/users/{user_no}", json={"email": None}).status_code == 422
+
+    response = client.patch(f"/users/{user_no}", json={"email": "first@example.com"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Email already registered"}
+
+    # 수정할 필드가 없으면 현재 값을 그대로 반환합니다.
+    response = client.patch(f"/users/{user_no}", json={})
+    assert response.status_code == 200
+    assert response.json()["user_name"] == "Renamed"
+
+    assert client.patch("/users/999", json={"user_name": "X"}).status_code == 404
+    assert client.patch("/users/999", json={}).status_code == 404
+
+
+def test_read_user_etag(client: TestClient, queries: list):
+    """
+    사용자 조회 응답에 ETag가 붙고, If-None-Match가 일치하면 본문 없이 304를 반환하며
+    (캐시 적중 시 DB 조회 없음), 데이터가 바뀌면 새 ETag로 200을 반환하는지 테스트합니다.
+    """
+    user_no = client.post(
+        "/users/",
+        json={"id": "etaguser", "email": "etag@example.com", "user_name": "ETag User"},
+    ).json()["user_no"]
+
+    response = client.get(f"/users/{user_no}")
+    etag = response.headers["ETag"]
+
+    queries.clear()
+    response = client.get(f"/users/{user_no}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert queries == []
+
+    client.post("/posts/", json={"title": "New", "content": "content", "user_no": user_no})
+    response = client.get(f"/users/{user_no}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # 목록 조회도 ETag를 지원합니다.
+    response = client.get("/users/")
+    response = client.get("/users/", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+
+
+def test_read_user_conditional_get_without_cache(client: TestClient, queries: list):
+    """
+    캐시를 끈 배포(NullCache)에서도 If-None-Match가 일치하면 게시물 목록을 읽지 않고 304를 반환하며,
+    게시물이 수정되면 ETag가 바뀌는지 테스트합니다. (사용자 목록 조회도 같음)
+    """
+    from app.cache import NullCache, get_cache
+    from app.main import app
+
+    app.dependency_overrides[get_cache] = NullCache
+    user_no = client.post("/users/", json={"id": "nocache", "email": "nocache@example.com", "user_name": "NoCache"}).json()["user_no"]
+    post_no = client.post("/posts/", json={"title": "t", "content": "c", "user_no": user_no}).json()["post_no"]
+
+    etag = client.get(f"/users/{user_no}").headers["ETag"]
+    list_etag = client.get("/users/").headers["ETag"]
+    queries.clear()
+    response = client.get(f"/users/{user_no}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert client.get("/users/", headers={"If-None-Match": list_etag}).status_code == 304
+    assert len(queries) == 2
+    assert not any("FROM posts" in statement for statement in queries)
+
+    # 게시물 본문만 바뀌어도 사용자 응답의 ETag가 바뀝니다.
+    client.patch(f"/posts/{post_no}", json={"content": "changed"})
+    response = client.get(f"/users/{user_no}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["posts"][0]["content"] == "changed"
+    assert response.headers["ETag"] != etag
+    response = client.get("/users/", headers={"If-None-Match": list_etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != list_etag
+
+
+def test_export_users(client: TestClient):
+    """
+    사용자 내보내기 API('/users/export')가 사용자가 없을 때도 CSV 헤더를 보내고, 사용자 정보를 NDJSON으로 스트리밍하는지 테스트합니다.
+    """
+    response = client.get("/users/export", params={"format": "csv"})
+    assert response.text.splitlines() == ["user_no,id,email,phone_number,user_sex,user_name,reg_date"]
+
+    client.post("/users/", json={"id": "testuser", "email": "test@example.com", "user_name": "Test User"})
+    response = client.get("/users/export")
+    assert response.status_code == 200
+    assert '"id": "testuser"' in response.text
+    assert "posts" not in response.text
+
+
+def test_read_user_posts_uses_index(client: TestClient, query_plans: list):
+    """
+    특정 사용자의 게시물 목록 API('/users/{user_no}/posts')가 기간 조건과 페이지네이션을 처리하고,
+    posts 테이블 전체를 훑지 않고 (user_no, post_no) 인덱스를 사용하는지 EXPLAIN QUERY PLAN으로 테스트합니다.
+    """
+    users = [
+        client.post(
+            "/users/", json={"id": f"user{i}", "email": f"user{i}@example.com", "user_name": f"User {i}"}
+        ).json()["user_no"]
+        for i in range(2)
+    ]
+    for user_no in users:
+        client.post("/posts/bulk", json=[
+            {"title": f"Post {i}", "content": "content", "user_no": user_no} for i in range(5)
+        ])
+
+    query_plans.clear()
+    response = client.get(f"/users/{users[1]}/posts", params={"limit": 3, "since": "2000-01-01T00:00:00"})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 3
+    assert all(post["user_no"] == users[1] for post in data)
+
+    # 게시물 조회 쿼리는 posts 전체를 훑지(SCAN) 않고 인덱스로 검색(SEARCH)해야 하며, 별도 정렬도 없어야 합니다.
+    [(statement, plan)] = [(s, p) for s, p in query_plans if "FROM posts" in s]
+    assert any("USING INDEX ix_posts_user_no_post_no" in detail for detail in plan), plan
+    assert not any(detail.startswith("SCAN") or "TEMP B-TREE" in detail for detail in plan), plan
+
+    # 기간 밖의 게시물은 반환하지 않고, 커서 방식으로도 모두 조회할 수 있어야 합니다.
+    response = client.get(f"/users/{users[1]}/posts", params={"until": "2000-01-01T00:00:00"})
+    assert response.json() == []
+    response = client.get(f"/users/{users[1]}/posts", params={"cursor": "", "limit": 3})
+    response = client.get(f"/users/{users[1]}/posts", params={"cursor": response.headers["X-Next-Cursor"]})
+    assert len(response.json()) == 2
+
+    assert client.get("/users/999/posts").status_code == 404
+
+
+def test_delete_user_cascades_posts(client: TestClient, queries: list):
+    """
+    사용자 삭제 API가 게시물을 한 건씩 지우지 않고 DELETE 한 문장(ON DELETE CASCADE)으로 처리하고,
+    삭제된 게시물 수를 요약으로 반환하는지 테스트합니다.
+    """
+    user_no = client.post(
+        "/users/", json={"id": "deleteuser", "email": "delete@example.com", "user_name": "Delete User"}
+    ).json()["user_no"]
+    post_nos = [
+        result["post_no"] for result in client.post("/posts/bulk", json=[
+            {"title": f"Post {i}", "content": "content", "user_no": user_no} for i in range(50)
+        ]).json()
+    ]
+    # 캐시된 게시물도 삭제 후에는 조회되지 않아야 합니다.
+    assert client.get(f"/posts/{post_nos[0]}").status_code == 200
+
+    queries.clear()
+    response = client.delete(f"/users/{user_no}")
+    assert response.status_code == 200
+    assert response.json() == {"user_no": user_no, "deleted_posts": 50}
+    assert len([q for q in queries if q.lstrip().upper().startswith("DELETE")]) == 1
+
+    assert client.get(f"/users/{user_no}").status_code == 404
+    assert client.get(f"/posts/{post_nos[0]}").status_code == 404
+    assert client.get("/posts/").json() == []
+    assert client.delete(f"/users/{user_no}").status_code == 404
+
+
+def test_delete_user_in_background(client: TestClient):
+    """
+    background=true로 요청하면 202 Accepted와 작업 ID를 반환하고,
+    백그라운드 작업이 끝나면 작업 상태 조회 API에서 완료(done)와 삭제된 게시물 수를 확인할 수 있는지 테스트합니다.
+    """
+    user_no = client.post(
+        "/users/", json={"id": "biguser", "email": "big@example.com", "user_name": "Big User"}
+    ).json()["user_no"]
+    client.post("/posts/bulk", json=[
+        {"title": f"Post {i}", "content": "content", "user_no": user_no} for i in range(20)
+    ])
+
+    response = client.delete(f"/users/{user_no}", params={"background": True})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.headers["Location"] == f"/users/jobs/{job_id}"
+
+    # TestClient는 응답을 돌려주기 전에 백그라운드 작업을 실행하므로, 작업은 이미 끝난 상태입니다.
+    job = client.get(f"/users/jobs/{job_id}").json()
+    assert job["status"] == "done"
+    assert job["deleted_posts"] == 20
+    assert client.get(f"/users/{user_no}").status_code == 404
+    assert client.get("/users/jobs/unknown").status_code == 404
+
+
+def test_jobs_are_stored_in_database(client: TestClient, db):
+    """
+    작업 상태가 프로세스 메모리가 아닌 jobs 테이블에 저장되어, 다른 세션(다른 워커)에서도 조회되는지 테스트합니다.
+    """
+    job = jobs.create_job(db, "delete_user", user_no=1, deleted_posts=0)
+    db.commit()
+
+    # 작업을 만든 세션과 다른 세션에서 갱신하고 조회합니다.
+    with sessionmaker(bind=db.get_bind())() as other:
+        jobs.update_job(other, job["job_id"], status="running", deleted_posts=5)
+        other.commit()
+    assert client.get(f"/users/jobs/{job['job_id']}").json() == {**job, "status": "running", "deleted_posts": 5}
+
+
+def test_old_jobs_are_pruned(client: TestClient, db, monkeypatch):
+    """
+    새 작업을 만들 때 최근 MAX_JOBS개보다 오래된 작업을 jobs 테이블에서 지우는지 테스트합니다.
+    """
+    monkeypatch.setattr(jobs, "MAX_JOBS", 2)
+    created = []
+    for i in range(4):
+        job = jobs.create_job(db, "delete_user", user_no=i)
+        db.execute(update(models.Job).where(models.Job.job_id == job["job_id"]).values(
+            created_at=datetime.datetime(2026, 1, 1, 0, 0, i)
+        ))
+        created.append(job["job_id"])
+    jobs.create_job(db, "delete_user", user_no=4)
+    db.commit()
+
+    remaining = {job_id for (job_id,) in db.query(models.Job.job_id)}
+    assert created[0] not in remaining and created[1] not in remaining
+    assert len(remaining) == 3
+
+
+def test_user_stats_maintained_by_triggers(client: TestClient, query_plans: list):
+    """
+    게시물 생성/대량 생성/삭제 시 트리거가 사용자별 게시물 수와 마지막 작성일을 갱신하고,
+    통계 API('/users/{user_no}/stats')가 posts 테이블을 읽지 않고 통계 행 하나만 조회하는지 테스트합니다.
+    """
+    user_no = client.post(
+        "/users/", json={"id": "statsuser", "email": "stats@example.com", "user_name": "Stats User"}
+    ).json()["user_no"]
+    assert client.get(f"/users/{user_no}/stats").json() == {"user_no": user_no, "post_count": 0, "last_post_at": None}
+
+    client.post("/posts/", json={"title": "First", "content": "content", "user_no": user_no})
+    client.post("/posts/bulk", json=[{"title": f"Post {i}", "content": "content", "user_no": user_no} for i in range(3)])
+    latest = client.get(f"/users/{user_no}/posts").json()[-1]
+
+    query_plans.clear()
+    stats = client.get(f"/users/{user_no}/stats").json()
+    assert stats["post_count"] == 4
+    assert stats["last_post_at"] == latest["reg_date"]
+    assert not any("posts" in detail for _, plan in query_plans for detail in plan), query_plans
+
+    # 가장 최근 게시물을 지우면 그 전 게시물의 작성일이 마지막 작성일이 됩니다.
+    client.delete(f"/posts/{latest['post_no']}")
+    previous = client.get(f"/users/{user_no}/posts").json()[-1]
+    stats = client.get(f"/users/{user_no}/stats").json()
+    assert stats["post_count"] == 3
+    assert stats["last_post_at"] == previous["reg_date"]
+
+    assert client.get("/users/999/stats").status_code == 404
+
+
+def test_read_users_include_stats(client: TestClient, queries: list):
+    """
+    목록 API에 include=stats를 지정하면 사용자마다 post_count/last_post_at이 추가되고,
+    include를 지정하지 않은 기존 응답에는 통계 필드가 없는지 테스트합니다.
+    """
+    for i in range(2):
+        user_no = client.post(
+            "/users/", json={"id": f"user{i}", "email": f"user{i}@example.com", "user_name": f"User {i}"}
+        ).json()["user_no"]
+        client.post("/posts/bulk", json=[{"title": "t", "content": "c", "user_no": user_no} for _ in range(i * 2)])
+
+    queries.clear()
+    data = client.get("/users/", params={"include": "stats"}).json()
+    assert [user["post_count"] for user in data] == [0, 2]
+    assert data[0]["last_post_at"] is None and data[1]["last_post_at"] is not None
+    assert "posts" not in data[0]
+    # 통계는 사용자 조회 쿼리에 JOIN되므로 추가 쿼리가 없습니다.
+    assert len(queries) == 1
+
+    data = client.get("/users/", params={"include": "posts,stats"}).json()
+    assert len(data[1]["posts"]) == data[1]["post_count"] == 2
+    assert "post_count" not in client.get("/users/").json()[0]
+
+
+def test_read_users_content_preview(client: TestClient):
+    """
+    사용자 목록 조회에서 content_preview=N을 보내면 포함된 게시물의 본문이 앞 N글자만 반환되는지 테스트합니다.
+    """
+    user_no = client.post("/users/", json={"id": "preview", "email": "preview@example.com", "user_name": "Preview"}).json()["user_no"]
+    client.post("/posts/", json={"title": "Long", "content": "x" * 10000, "user_no": user_no})
+
+    users = client.get("/users/", params={"content_preview": 10}).json()
+    assert users[0]["posts"][0]["content"] == "x" * 10
+    users = client.get("/users/", params={"content_preview": 10, "include": "posts,stats"}).json()
+    assert users[0]["posts"][0]["content"] == "x" * 10
+    assert users[0]["post_count"] == 1
+    # 게시물을 포함하지 않으면 content_preview는 아무 영향이 없습니다.
+    assert "posts" not in client.get("/users/", params={"content_preview": 10, "include": ""}).json()[0]
+
+
+def test_user_stats_rebuild(client: TestClient, db):
+    """
+    통계가 실제 게시물과 어긋났을 때 drift()가 찾아내고, rebuild()로 다시 계산되는지 테스트합니다.
+    """
+    from sqlalchemy import text
+
+    from app import stats
+
+    user_no = client.post(
+        "/users/", json={"id": "drift", "email": "drift@example.com", "user_name": "Drift"}
+    ).json()["user_no"]
+    client.post("/posts/bulk", json=[{"title": "t", "content": "c", "user_no": user_no} for _ in range(3)])
+    conn = db.connection()
+    assert stats.drift(conn) == 0
+
+    conn.execute(text("UPDATE user_stats SET post_count = 99"))
+    assert stats.drift(conn) == 1
+    # 다시 계산해도 ETag에 쓰이는 posts_version은 처음부터 다시 세지 않고 올라갑니다.
+    posts_version = conn.execute(text("SELECT posts_version FROM user_stats")).scalar()
+    assert stats.rebuild(conn) == 1
+    assert conn.execute(text("SELECT posts_version FROM user_stats")).scalar() > posts_version
+    db.commit()
+    assert stats.drift(db.connection()) == 0
+    assert client.get(f"/users/{user_no}/stats").json()["post_count"] == 3
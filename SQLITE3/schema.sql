@@ -10,7 +10,7 @@ CREATE TABLE IF NOT EXISTS users (
     reg_date  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')) -- 가입일자 (현재 시간으로 자동 설정)
 );
 
-CREATE INDEX users_IDX ON users (id);
+-- users.id는 UNIQUE 제약이 자동으로 인덱스를 만들므로 별도의 인덱스가 필요하지 않습니다.
 
 -- 게시판 게시글을 저장하는 'posts' 테이블
 CREATE TABLE IF NOT EXISTS posts (
@@ -19,10 +19,99 @@ CREATE TABLE IF NOT EXISTS posts (
     content TEXT NOT NULL,                -- 게시글 내용 (필수 값)
     reg_date TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')), -- 작성일자 (현재 시간으로 자동 설정)
     user_no INTEGER NOT NULL,             -- 작성자 번호 (필수 값)
+    version INTEGER NOT NULL DEFAULT 1,   -- 수정할 때마다 트리거가 1씩 올리는 버전 번호 (ETag 계산용)
     -- 외래 키(FOREIGN KEY) 설정: posts.user_id가 users.id를 참조합니다.
     -- ON DELETE CASCADE: 참조하는 사용자가 삭제되면, 해당 사용자가 작성한 모든 게시글도 함께 삭제됩니다.
     -- ON DELETE CASCADE: 참조하는 사용자가 삭제되면, 해당 사용자가 작성한 모든 게시글도 함께 삭제됩니다. (SQLAlchemy 모델에서 ondelete="CASCADE"로 구현)
     FOREIGN KEY (user_no) REFERENCES users (user_no) ON DELETE CASCADE
 );
 
-CREATE INDEX posts_IDX ON posts (post_no);
+-- post_no는 rowid(INTEGER PRIMARY KEY)이므로 별도의 인덱스가 필요하지 않습니다.
+-- 특정 사용자의 게시물 조회와 ON DELETE CASCADE가 posts 전체를 훑지 않도록 (user_no, post_no) 인덱스를 만듭니다.
+CREATE INDEX IF NOT EXISTS ix_posts_user_no_post_no ON posts (user_no, post_no);
+-- 작성일 기간 조회를 위한 인덱스
+CREATE INDEX IF NOT EXISTS ix_posts_reg_date ON posts (reg_date);
+
+-- 게시글 전문 검색(Full-Text Search)을 위한 FTS5 색인 테이블
+-- content='posts': 본문을 중복 저장하지 않고 posts 테이블을 참조합니다. (external content)
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts
+USING fts5(title, content, content='posts', content_rowid='post_no');
+
+-- posts 테이블이 변경될 때 색인을 자동으로 갱신하는 트리거
+CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts(rowid, title, content) VALUES (new.post_no, new.title, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.post_no, old.title, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+    INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.post_no, old.title, old.content);
+    INSERT INTO posts_fts(rowid, title, content) VALUES (new.post_no, new.title, new.content);
+END;
+
+-- 사용자별 게시글 통계 테이블 (게시글 수, 가장 최근 게시글의 작성일)
+-- 게시글 수를 알기 위해 posts를 세지 않고 이 테이블의 한 행만 읽습니다. 값은 아래 트리거가 갱신합니다.
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_no INTEGER NOT NULL PRIMARY KEY,  -- 사용자 번호
+    post_count INTEGER NOT NULL DEFAULT 0, -- 게시글 수
+    last_post_at TEXT,                     -- 가장 최근 게시글(post_no가 가장 큰 게시글)의 작성일
+    posts_version INTEGER NOT NULL DEFAULT 0, -- 게시글이 추가/수정/삭제될 때마다 1씩 오르는 번호 (ETag 계산용)
+    FOREIGN KEY (user_no) REFERENCES users (user_no) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS user_stats_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO user_stats(user_no, post_count, last_post_at, posts_version) VALUES (new.user_no, 1, new.reg_date, 1)
+    ON CONFLICT(user_no) DO UPDATE SET
+        post_count = post_count + 1, last_post_at = excluded.last_post_at, posts_version = posts_version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_stats_ad AFTER DELETE ON posts BEGIN
+    UPDATE user_stats SET
+        post_count = post_count - 1,
+        last_post_at = (SELECT reg_date FROM posts WHERE user_no = old.user_no ORDER BY post_no DESC LIMIT 1),
+        posts_version = posts_version + 1
+    WHERE user_no = old.user_no;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_stats_au AFTER UPDATE OF user_no ON posts BEGIN
+    UPDATE user_stats SET
+        post_count = post_count - 1,
+        last_post_at = (SELECT reg_date FROM posts WHERE user_no = old.user_no ORDER BY post_no DESC LIMIT 1),
+        posts_version = posts_version + 1
+    WHERE user_no = old.user_no;
+    INSERT INTO user_stats(user_no, post_count, last_post_at, posts_version)
+    VALUES (new.user_no, 1, (SELECT reg_date FROM posts WHERE user_no = new.user_no ORDER BY post_no DESC LIMIT 1), 1)
+    ON CONFLICT(user_no) DO UPDATE SET
+        post_count = post_count + 1, last_post_at = excluded.last_post_at, posts_version = posts_version + 1;
+END;
+
+-- 게시글이 수정되면 게시글의 version과 작성자의 posts_version을 1씩 올립니다.
+CREATE TRIGGER IF NOT EXISTS posts_version_au AFTER UPDATE OF title, content, reg_date, user_no ON posts BEGIN
+    UPDATE posts SET version = old.version + 1 WHERE post_no = new.post_no;
+    UPDATE user_stats SET posts_version = posts_version + 1 WHERE user_no = new.user_no;
+END;
+
+-- 백그라운드 작업(게시글이 많은 사용자 삭제 등)의 상태 테이블
+-- 여러 워커 프로세스가 같은 작업 상태를 조회할 수 있도록 DB에 저장합니다.
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT NOT NULL PRIMARY KEY,      -- 작업 ID
+    kind TEXT NOT NULL,                    -- 작업 종류 (delete_user)
+    status TEXT NOT NULL,                  -- pending, running, done, failed
+    detail TEXT,                           -- 실패 시 에러 메시지
+    user_no INTEGER,                       -- 대상 사용자 번호 (삭제 후에도 남도록 외래 키 없음)
+    deleted_posts INTEGER,                 -- 삭제된 게시글 수
+    created_at TEXT NOT NULL DEFAULT (CURRENT_TIMESTAMP)
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_created_at ON jobs (created_at);
+
+-- 이미 게시글이 있는 DB에 통계 테이블을 추가한 경우, 기존 게시글로 통계를 채웁니다.
+-- (FastApi 폴더에서 python -m app.stats rebuild 명령으로도 실행할 수 있습니다.)
+-- INSERT OR REPLACE INTO user_stats(user_no, post_count, last_post_at)
+-- SELECT p.user_no, count(*), (SELECT reg_date FROM posts WHERE user_no = p.user_no ORDER BY post_no DESC LIMIT 1)
+-- FROM posts AS p GROUP BY p.user_no;
+
+-- 이미 게시글이 있는 DB에 색인을 추가한 경우, 아래 명령으로 기존 게시글을 한 번에 색인합니다.
+-- (FastApi 폴더에서 python -m app.search reindex 명령으로도 실행할 수 있습니다.)
+-- INSERT INTO posts_fts(posts_fts) VALUES ('rebuild');